@@ -10,4 +10,90 @@ class Settings(BaseSettings):
     AUTH_JWT_SECRET: str = Field(default="devsecret-change-me")
     AUTH_JWT_ALG: str = "HS256"
 
+    # pool de connexions (engines sync et async ; ignoré pour SQLite)
+    DB_POOL_SIZE: int = Field(default=10)
+    DB_MAX_OVERFLOW: int = Field(default=20)
+    DB_POOL_TIMEOUT: int = Field(default=30)
+    DB_POOL_RECYCLE: int = Field(default=1800)
+
+    # SQLite (local) : WAL = les lectures ne sont plus bloquées par une écriture
+    SQLITE_WAL: bool = Field(default=True)
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000)
+
+    # cache des JWT vérifiés (LRU) : nb d'entrées max, durée max (s) même si `exp` est plus loin
+    JWT_CACHE_SIZE: int = Field(default=4096)
+    JWT_CACHE_MAX_TTL: int = Field(default=300)
+
+    # cache email → (user id, profils) des routes authentifiées ; 0 = désactivé
+    IDENTITY_CACHE_TTL: int = Field(default=300)
+
+    # règles compagnies (frais UM, bagages, tarifs enfants) ; vide = carriers.rules.json du backend.
+    # Fichier absent ou invalide au démarrage → l'app refuse de démarrer. Relu à chaud toutes les N s (0 = jamais)
+    CARRIER_RULES_PATH: str = Field(default="")
+    CARRIER_RULES_RELOAD_INTERVAL: int = Field(default=30)
+
+    # devises : offres demandées et mises en cache dans la devise de base, converties à la
+    # réponse via une table de taux locale (vide = fx_rates.json du backend), relue toutes les N s
+    FX_BASE_CURRENCY: str = Field(default="EUR")
+    FX_RATES_PATH: str = Field(default="")
+    FX_RELOAD_INTERVAL: int = Field(default=300)
+
+    # TTL des entrées DAY:/CAL: : "adaptive" (proximité du départ, résultat, popularité,
+    # volatilité ; ttl_policy.py) ou "fixed" (CACHE_TTL_DAY / CACHE_TTL_CALENDAR partout).
+    # Échec provider (cache négatif) et résultat vide plafonnés ; TTL max absolu
+    TTL_POLICY: str = Field(default="adaptive")
+    CACHE_TTL_ERROR: int = Field(default=60)
+    CACHE_TTL_EMPTY: int = Field(default=600)
+    CACHE_TTL_MAX: int = Field(default=21600)
+
+    # instrumentation (core/tracing.py) : en-tête Server-Timing sur toutes les requêtes (dev
+    # uniquement : expose les noms d'étapes internes ; sinon seulement avec un X-Profile-Token
+    # valide) ; spans OTLP/JSON échantillonnés (taux 0..1, ou traceparent entrant) exportés vers
+    # un fichier JSONL et/ou un collecteur OTLP/HTTP (vides = pas d'export)
+    SERVER_TIMING: bool = Field(default=False)
+    TRACE_SAMPLE_RATE: float = Field(default=0.0)
+    TRACE_EXPORT_PATH: str = Field(default="")
+    TRACE_EXPORT_URL: str = Field(default="")
+    TRACE_SERVICE_NAME: str = Field(default="comparateur-backend")
+
+    # profilage à la demande (core/profiling.py, /api/admin) : vide = désactivé ; période
+    # d'échantillonnage, profils gardés en mémoire, copie sur disque (vide = non) ;
+    # tracemalloc au lancement avec N frames (0 = à la demande via /api/admin/memory?start=1)
+    PROFILING_SECRET: str = Field(default="")
+    PROFILING_INTERVAL_MS: float = Field(default=1.0)
+    PROFILING_KEEP: int = Field(default=20)
+    PROFILING_DIR: str = Field(default="")
+    TRACEMALLOC_FRAMES: int = Field(default=0)
+
+    # budget d'appels providers des tâches de fond (seau à jetons partagé)
+    BACKGROUND_QUOTA_PER_MIN: int = Field(default=60)
+    BACKGROUND_QUOTA_BURST: int = Field(default=30)
+
+    # évaluation des alertes prix : intervalle (s, 0 = désactivée), alertes chargées par lot
+    ALERTS_EVAL_INTERVAL: int = Field(default=900)
+    ALERTS_BATCH_SIZE: int = Field(default=1000)
+
+    # préchauffage depuis les recherches sauvegardées : intervalle (s, 0 = désactivé),
+    # appels provider max par passage, rafraîchir les entrées expirant dans moins de N s
+    WARMER_INTERVAL: int = Field(default=300)
+    WARMER_BUDGET: int = Field(default=120)
+    WARMER_REFRESH_WITHIN: int = Field(default=360)
+
+    # popularité des clés /calendar et /search (count-min sketch) et préchauffage des top-N :
+    # intervalle (s, 0 = désactivé), appels provider max par passage, décroissance par passage
+    POPULARITY_SKETCH_WIDTH: int = Field(default=2048)
+    POPULARITY_SKETCH_DEPTH: int = Field(default=4)
+    POPULARITY_DECAY: float = Field(default=0.5)
+    PREFETCH_INTERVAL: int = Field(default=120)
+    PREFETCH_TOP_N: int = Field(default=20)
+    PREFETCH_BUDGET: int = Field(default=60)
+    PREFETCH_REFRESH_WITHIN: int = Field(default=180)
+
+    # préchargement spéculatif après /calendar (M+1, jours les moins chers) : opt-in ;
+    # annulé dès que le budget des tâches de fond descend sous la réserve
+    SPECULATIVE_PREFETCH: bool = Field(default=False)
+    SPECULATIVE_DAYS: int = Field(default=3)
+    SPECULATIVE_QUOTA_RESERVE: int = Field(default=10)
+    SPECULATIVE_MAX_PENDING: int = Field(default=64)
+
 settings = Settings()
\ No newline at end of file
@@ -1,16 +1,80 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import settings
 
+_IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+
+def _pool_kwargs() -> dict:
+    if _IS_SQLITE:
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Réglages par connexion SQLite : WAL (lecteurs non bloqués par l'écrivain),
+    synchronous=NORMAL (sûr en WAL), attente sur verrou au lieu d'un "database is locked"
+    immédiat, tables temporaires en mémoire.
+    """
+    cur = dbapi_connection.cursor()
+    try:
+        if settings.SQLITE_WAL:
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cur.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cur.close()
+
+
 # Engine compatible SQLite (local) et Postgres
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {},
+    connect_args={"check_same_thread": False} if _IS_SQLITE else {},
+    **_pool_kwargs(),
 )
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+
+def async_database_url(url: str) -> str:
+    """
+    Variante asyncio de DATABASE_URL : aiosqlite en local, asyncpg pour Postgres.
+    Un driver async déjà explicite est conservé tel quel.
+    """
+    scheme, sep, rest = url.partition("://")
+    if not sep or ("+" in scheme and scheme.split("+", 1)[1] in ("aiosqlite", "asyncpg")):
+        return url
+    base = scheme.split("+", 1)[0]
+    if base == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if base in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+# Engine asyncio (routes users / profiles / quote) : les attentes DB ne consomment plus
+# de threads du pool anyio, laissés aux appels providers bloquants.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    **_pool_kwargs(),
+)
+
+if _IS_SQLITE:
+    event.listen(engine, "connect", _sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 class Base(DeclarativeBase):
     pass
 
@@ -21,8 +85,17 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def init_db():
     # import tardif pour éviter les import cycles
     from ..models.user import User
     from ..models.traveler_profile import TravelerProfile
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from ..models.price_alert import PriceAlert
+    from ..models.saved_search import SavedSearch
+    from .migrations import upgrade
+    Base.metadata.create_all(bind=engine)
+    # index ajoutés après coup sur une base existante (create_all ne les crée pas)
+    upgrade(engine, Base.metadata)
@@ -0,0 +1,38 @@
+# backend/app/core/http_cache.py
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import Response
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compare l'en-tête If-None-Match (liste séparée par des virgules, '*' accepté)
+    à l'ETag courant. Comparaison faible (RFC 9110 §13.1.2) : on ignore le préfixe W/.
+    """
+    if not if_none_match:
+        return False
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == wanted:
+            return True
+    return False
+
+
+def set_validators(response: Response, etag: str, max_age: int) -> None:
+    """Pose ETag + Cache-Control alignés sur le TTL restant de l'entrée de cache."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"public, max-age={max(0, int(max_age))}"
+
+
+def not_modified(etag: str, max_age: int) -> Response:
+    """Réponse 304 sans corps, avec les mêmes validateurs qu'un 200."""
+    resp = Response(status_code=304)
+    set_validators(resp, etag, max_age)
+    return resp
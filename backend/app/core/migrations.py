@@ -0,0 +1,71 @@
+# backend/app/core/migrations.py
+"""
+Migrations légères, idempotentes, appliquées au démarrage (init_db).
+
+`create_all` crée les tables manquantes mais ne touche pas aux tables existantes :
+les colonnes et index ajoutés aux modèles après coup ne seraient jamais créés sur une
+base déjà en service. `upgrade()` les rattrape (ALTER TABLE ADD COLUMN pour les colonnes
+nullables sans défaut serveur, CREATE INDEX s'il manque, DROP + CREATE si ses colonnes ont
+changé dans le modèle), puis laisse SQLite
+rafraîchir ses statistiques (PRAGMA optimize).
+"""
+from __future__ import annotations
+
+import logging
+from typing import List
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+
+log = logging.getLogger(__name__)
+
+
+def _ensure_columns(conn: Connection, metadata) -> List[str]:
+    insp = inspect(conn)
+    added: List[str] = []
+    for table in metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name in existing:
+                continue
+            if not col.nullable or col.server_default is not None:
+                # exigerait une valeur pour les lignes existantes : migration manuelle
+                log.warning("migrations: colonne %s.%s absente, non ajoutée", table.name, col.name)
+                continue
+            ddl_type = col.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {ddl_type}")
+            added.append(f"{table.name}.{col.name}")
+    return added
+
+
+def _ensure_indexes(conn: Connection, metadata) -> List[str]:
+    insp = inspect(conn)
+    created: List[str] = []
+    for table in metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {ix["name"]: ix["column_names"] for ix in insp.get_indexes(table.name)}
+        for index in table.indexes:
+            columns = [c.name for c in index.columns]
+            if existing.get(index.name) == columns:
+                continue
+            if index.name in existing:
+                index.drop(conn)  # même nom, autres colonnes : index redéfini dans le modèle
+            index.create(conn)
+            created.append(index.name)
+    return created
+
+
+def upgrade(engine: Engine, metadata) -> None:
+    """Amène une base existante au niveau des modèles (colonnes, index). Sans effet si déjà à jour."""
+    with engine.begin() as conn:
+        added = _ensure_columns(conn, metadata)
+        created = _ensure_indexes(conn, metadata)
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA optimize")
+    if added:
+        log.info("migrations: colonnes ajoutées %s", ", ".join(added))
+    if created:
+        log.info("migrations: index créés %s", ", ".join(created))
@@ -0,0 +1,255 @@
+# backend/app/core/profiling.py
+"""
+Profilage à la demande d'une requête réelle (/search, /calendar, /api/quote), sans redéploiement.
+
+Déclenchement : en-tête `X-Profile-Token: <PROFILING_SECRET>` (désactivé si le secret est vide),
+mode via `X-Profile: sample|cprofile` (défaut sample). Jeton invalide → 403.
+La réponse normale est renvoyée avec `X-Profile-Id` ; le profil est conservé en mémoire
+(PROFILING_KEEP derniers) et, si PROFILING_DIR est défini, écrit sur disque.
+Consultation : /api/admin/profiles (routers/admin.py).
+
+- sample  : échantillonneur interne (un thread relève la pile du handler toutes les
+  PROFILING_INTERVAL_MS) → piles repliées « a;b;c N », format d'entrée de flamegraph.pl /
+  speedscope. Seules les piles qui passent par le handler profilé sont gardées : les autres
+  requêtes servies en même temps par le même thread (boucle async) n'y apparaissent pas.
+- cprofile : profileur déterministe (cProfile) du handler ; texte pstats + fichier .prof.
+  Handler async (boucle partagée) → repli sur sample.
+
+Seul le handler est profilé (pas l'encodage de la réponse, visible dans Server-Timing).
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import hmac
+import inspect
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+from fastapi import Header, HTTPException
+
+from .config import settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+MODES = ("sample", "cprofile")
+
+
+@dataclass
+class Profile:
+    id: str
+    method: str
+    path: str
+    mode: str
+    started_at: float
+    duration_ms: float = 0.0
+    samples: int = 0
+    folded: Counter = field(default_factory=Counter)  # mode sample
+    stats_text: str = ""                              # mode cprofile
+    note: str = ""
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "method": self.method, "path": self.path, "mode": self.mode,
+            "startedAt": self.started_at, "durationMs": round(self.duration_ms, 2),
+            "samples": self.samples, "note": self.note,
+        }
+
+    def render(self) -> str:
+        if self.mode == "cprofile":
+            return self.stats_text
+        return "".join(f"{stack} {n}\n" for stack, n in self.folded.most_common())
+
+
+class ProfileStore:
+    def __init__(self, keep: int, directory: str) -> None:
+        self._items: Deque[Profile] = deque(maxlen=max(1, keep))
+        self._lock = threading.Lock()
+        self.directory = directory
+
+    def add(self, profile: Profile, raw: Optional[cProfile.Profile] = None) -> None:
+        with self._lock:
+            self._items.append(profile)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, profile.id)
+            if raw is not None:
+                raw.dump_stats(base + ".prof")
+            with open(base + (".txt" if profile.mode == "cprofile" else ".folded"), "w", encoding="utf-8") as fh:
+                fh.write(profile.render())
+
+    def get(self, pid: str) -> Optional[Profile]:
+        with self._lock:
+            return next((p for p in self._items if p.id == pid), None)
+
+    def list(self) -> List[Profile]:
+        with self._lock:
+            return list(reversed(self._items))
+
+
+store = ProfileStore(settings.PROFILING_KEEP, settings.PROFILING_DIR)
+
+_session: ContextVar[Optional[Profile]] = ContextVar("profile", default=None)
+
+
+def _frame_label(f: FrameType) -> str:
+    code = f.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Sampler:
+    """Relève la pile du thread `tid` ; ne garde que la partie au-dessus de `anchor` (le handler)."""
+
+    def __init__(self, profile: Profile, tid: int, anchor: FrameType, interval_s: float) -> None:
+        self.profile = profile
+        self.tid = tid
+        self.anchor = anchor
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def __enter__(self) -> "_Sampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.tid)
+            stack: List[str] = []
+            while frame is not None and frame is not self.anchor:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if frame is None or not stack:
+                continue  # thread occupé ailleurs (autre requête, handler suspendu)
+            stack.append(_frame_label(self.anchor))
+            self.profile.folded[";".join(reversed(stack))] += 1
+            self.profile.samples += 1
+
+
+def _finish(profile: Profile, t0: float, raw: Optional[cProfile.Profile] = None) -> None:
+    profile.duration_ms = (time.perf_counter() - t0) * 1000
+    if raw is not None:
+        out = io.StringIO()
+        stats = pstats.Stats(raw, stream=out)
+        stats.sort_stats("cumulative").print_stats(60)
+        profile.stats_text = out.getvalue()
+        profile.samples = stats.total_calls  # appels de fonctions mesurés
+    store.add(profile, raw)
+
+
+def profiled(fn: F) -> F:
+    """Handler profilable : ne fait rien tant que la requête courante n'a pas demandé de profil."""
+    interval = lambda: max(0.0002, settings.PROFILING_INTERVAL_MS / 1000)  # noqa: E731
+    # annotations résolues dans le module du handler (FastAPI les évaluerait dans celui-ci)
+    signature = inspect.signature(fn, eval_str=True)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            profile = _session.get()
+            if profile is None:
+                return await fn(*args, **kwargs)
+            if profile.mode == "cprofile":
+                profile.mode, profile.note = "sample", "handler async : cprofile remplacé par sample"
+            t0 = time.perf_counter()
+            try:
+                with _Sampler(profile, threading.get_ident(), sys._getframe(), interval()):
+                    return await fn(*args, **kwargs)
+            finally:
+                _finish(profile, t0)
+        async_wrapper.__signature__ = signature  # type: ignore[attr-defined]
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        profile = _session.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        t0 = time.perf_counter()
+        if profile.mode == "cprofile":
+            raw = cProfile.Profile()
+            try:
+                return raw.runcall(fn, *args, **kwargs)
+            finally:
+                _finish(profile, t0, raw)
+        try:
+            with _Sampler(profile, threading.get_ident(), sys._getframe(), interval()):
+                return fn(*args, **kwargs)
+        finally:
+            _finish(profile, t0)
+    wrapper.__signature__ = signature  # type: ignore[attr-defined]
+    return wrapper  # type: ignore[return-value]
+
+
+def token_ok(token: Optional[str]) -> bool:
+    """Jeton X-Profile-Token valide (PROFILING_SECRET configuré) : requête d'administration."""
+    secret = settings.PROFILING_SECRET
+    return bool(secret) and token is not None and hmac.compare_digest(token.encode(), secret.encode())
+
+
+def require_admin(x_profile_token: Optional[str] = Header(None)) -> None:
+    """Dépendance des routes /api/admin : 404 si le profilage est désactivé, 403 si jeton invalide."""
+    if not settings.PROFILING_SECRET:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token_ok(x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+
+class ProfilingMiddleware:
+    """Active le profil de la requête si X-Profile-Token est valide ; pose X-Profile-Id."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not settings.PROFILING_SECRET:
+            await self.app(scope, receive, send)
+            return
+        token = mode = None
+        for k, v in scope.get("headers") or []:
+            if k == b"x-profile-token":
+                token = v.decode("latin-1")
+            elif k == b"x-profile":
+                mode = v.decode("latin-1").strip().lower()
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+        if not token_ok(token) or (mode or "sample") not in MODES:
+            status, body = (403, b'{"detail":"Invalid profile token"}') if not token_ok(token) \
+                else (400, b'{"detail":"X-Profile invalide, attendu sample|cprofile"}')
+            await send({"type": "http.response.start", "status": status,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        profile = Profile(
+            id=uuid.uuid4().hex[:12], method=scope["method"], path=scope["path"],
+            mode=mode or "sample", started_at=time.time(),
+        )
+        ctx = _session.set(profile)
+
+        async def send_tagged(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and store.get(profile.id) is not None:
+                message = dict(message, headers=list(message.get("headers") or []) + [
+                    (b"x-profile-id", profile.id.encode()),
+                ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tagged)
+        finally:
+            _session.reset(ctx)
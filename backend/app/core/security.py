@@ -1,13 +1,84 @@
+# backend/app/core/security.py
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
 from fastapi import HTTPException, status, Request
 from jose import jwt, JWTError
 from ..core.config import settings
 
+
+class VerifiedTokenCache:
+    """
+    LRU borné des JWT déjà vérifiés : digest sha256(token) → (payload, expire_à).
+    Une entrée vit jusqu'au `exp` du token, plafonné à max_ttl secondes. Thread-safe
+    (les endpoints sync tournent dans le threadpool d'anyio).
+    Le payload renvoyé est partagé entre requêtes : à traiter en lecture seule.
+    """
+
+    def __init__(self, maxsize: int, max_ttl: int) -> None:
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._store: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            hit = self._store.get(key)
+            if hit is None:
+                return None
+            payload, expires_at = hit
+            if expires_at <= now:
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return payload
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        if self.maxsize <= 0 or self.max_ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.max_ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._store[key] = (payload, expires_at)
+            self._store.move_to_end(key)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+token_cache = VerifiedTokenCache(settings.JWT_CACHE_SIZE, settings.JWT_CACHE_MAX_TTL)
+
+
 def decode_bearer_token(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.AUTH_JWT_SECRET, algorithms=[settings.AUTH_JWT_ALG])
-        return payload
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    token_cache.put(token, payload)
+    return payload
 
 async def get_current_user_email(request: Request) -> str:
     auth = request.headers.get("Authorization", "")
@@ -0,0 +1,345 @@
+# backend/app/core/tracing.py
+"""
+Instrumentation légère du pipeline de requête (/calendar, /search, /api/...).
+
+- `span("cache.get")` / `@traced("criteria")` : mesure un bloc ; hors requête instrumentée
+  (tâches de fond, scripts) → no-op, une simple lecture de ContextVar.
+- Par requête : durées cumulées par nom → en-tête Server-Timing, seulement si SERVER_TIMING
+  est activé (dev) ou si la requête porte un X-Profile-Token valide : les noms d'étapes
+  (providers, cache…) ne sont pas exposés à n'importe quel client
+  (ex: `provider.amadeus;dur=812.4, amadeus.http;dur=790.1, cache.get;dur=0.4;desc="31x", total;dur=830.2`).
+  Les spans imbriqués se recouvrent (provider.amadeus contient amadeus.token + amadeus.http).
+- Échantillonnage (TRACE_SAMPLE_RATE, ou `traceparent` W3C entrant avec le drapeau sampled) :
+  spans complets (ids, parent, début/fin, attributs) au format OTLP/JSON, exportés hors chemin
+  de requête par un thread vers un fichier JSONL (TRACE_EXPORT_PATH) et/ou un collecteur
+  OTLP/HTTP (TRACE_EXPORT_URL, ex: http://localhost:4318/v1/traces).
+"""
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from fastapi.responses import JSONResponse
+
+from .config import settings
+from .profiling import token_ok
+
+log = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Trace:
+    """État d'une requête instrumentée (partagé avec le threadpool via le contexte copié)."""
+
+    __slots__ = ("trace_id", "parent_id", "sampled", "timings", "spans", "stack", "epoch0", "perf0")
+
+    def __init__(self, trace_id: str, sampled: bool, parent_id: Optional[str] = None) -> None:
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.timings: Dict[str, List[int]] = {}  # nom → [durée ns cumulée, nb]
+        self.spans: List[Dict[str, Any]] = []
+        self.stack: List[str] = []
+        self.epoch0 = time.time_ns()
+        self.perf0 = time.perf_counter_ns()
+
+    def add(self, name: str, dur_ns: int) -> None:
+        t = self.timings.get(name)
+        if t is None:
+            self.timings[name] = [dur_ns, 1]
+        else:
+            t[0] += dur_ns
+            t[1] += 1
+
+    def epoch_ns(self, perf_ns: int) -> int:
+        return self.epoch0 + (perf_ns - self.perf0)
+
+    def server_timing(self, total_ns: int) -> str:
+        parts = []
+        for name, (dur, n) in self.timings.items():
+            part = f"{name};dur={dur / 1e6:.2f}"
+            if n > 1:
+                part += f';desc="{n}x"'
+            parts.append(part)
+        parts.append(f"total;dur={total_ns / 1e6:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def _span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class _Span:
+    __slots__ = ("trace", "name", "attrs", "start", "span_id")
+
+    def __init__(self, trace: Trace, name: str, attrs: Dict[str, Any]) -> None:
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> "_Span":
+        if self.trace.sampled:
+            self.span_id = _span_id()
+            self.trace.stack.append(self.span_id)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter_ns()
+        trace = self.trace
+        trace.add(self.name, end - self.start)
+        if trace.sampled:
+            trace.stack.pop()
+            trace.spans.append({
+                "spanId": self.span_id,
+                "parentSpanId": trace.stack[-1] if trace.stack else None,
+                "name": self.name,
+                "start": trace.epoch_ns(self.start),
+                "end": trace.epoch_ns(end),
+                "attrs": dict(self.attrs, error=exc_type.__name__) if exc_type else self.attrs,
+            })
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attrs: Any):
+    """Mesure un bloc `with span("nom"):` dans la requête courante ; no-op hors requête."""
+    trace = _current.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, attrs)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Décorateur : la fonction entière mesurée sous `name`."""
+    def deco(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            trace = _current.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with _Span(trace, name, {}):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return deco
+
+
+class TimedJSONResponse(JSONResponse):
+    """Réponse JSON par défaut de l'app : l'encodage du corps apparaît comme span `encode`."""
+
+    def render(self, content: Any) -> bytes:
+        with span("encode"):
+            return super().render(content)
+
+
+# ---------------------------------------------------------------------------
+# Export OTLP/JSON (fichier JSONL et/ou collecteur HTTP), thread dédié
+# ---------------------------------------------------------------------------
+
+def _otlp_attrs(attrs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    out = []
+    for k, v in attrs.items():
+        if isinstance(v, bool):
+            val = {"boolValue": v}
+        elif isinstance(v, int):
+            val = {"intValue": str(v)}
+        elif isinstance(v, float):
+            val = {"doubleValue": v}
+        else:
+            val = {"stringValue": str(v)}
+        out.append({"key": k, "value": val})
+    return out
+
+
+def to_otlp(traces: List[Trace]) -> Dict[str, Any]:
+    """Requête ExportTraceServiceRequest (OTLP/JSON) pour un lot de traces."""
+    spans = []
+    for tr in traces:
+        for s in tr.spans:
+            root = s["parentSpanId"] is None
+            parent = tr.parent_id if root else s["parentSpanId"]
+            span_out = {
+                "traceId": tr.trace_id,
+                "spanId": s["spanId"],
+                "name": s["name"],
+                "kind": 2 if root else 1,  # SERVER | INTERNAL
+                "startTimeUnixNano": str(s["start"]),
+                "endTimeUnixNano": str(s["end"]),
+                "attributes": _otlp_attrs(s["attrs"]),
+            }
+            if parent:
+                span_out["parentSpanId"] = parent
+            spans.append(span_out)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attrs({"service.name": settings.TRACE_SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+
+
+class SpanExporter:
+    """File bornée + thread d'export par lots ; file pleine → trace abandonnée (jamais bloquant)."""
+
+    def __init__(self, path: str, url: str, max_queue: int = 1000, batch: int = 64) -> None:
+        self.path = path
+        self.url = url
+        self.batch = batch
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path or self.url)
+
+    def submit(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="trace-export", daemon=True)
+                    self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            traces = [self._queue.get()]
+            while len(traces) < self.batch:
+                try:
+                    traces.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.export(traces)
+            except Exception as e:
+                log.warning("[tracing] export échoué (%d traces): %s", len(traces), e)
+
+    def export(self, traces: List[Trace]) -> None:
+        body = to_otlp(traces)
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(body, separators=(",", ":")) + "\n")
+        if self.url:
+            import requests  # dépendance déjà requise par les providers
+
+            requests.post(self.url, json=body, timeout=5)
+
+
+exporter = SpanExporter(settings.TRACE_EXPORT_PATH, settings.TRACE_EXPORT_URL)
+
+
+# ---------------------------------------------------------------------------
+# Middleware ASGI
+# ---------------------------------------------------------------------------
+
+def _wants_timing(headers: List[Tuple[bytes, bytes]]) -> bool:
+    if settings.SERVER_TIMING:
+        return True
+    for k, v in headers:
+        if k == b"x-profile-token":
+            return token_ok(v.decode("latin-1"))
+    return False
+
+
+def _start_trace(headers: List[Tuple[bytes, bytes]]) -> Trace:
+    if not exporter.enabled:
+        return Trace("", False)  # Server-Timing seul : ni ids ni lecture de traceparent
+    incoming = None
+    for k, v in headers:
+        if k == b"traceparent":
+            incoming = _TRACEPARENT.match(v.decode("latin-1").strip().lower())
+            break
+    if incoming:
+        trace_id, parent_id, flags = incoming.groups()
+        sampled = bool(int(flags, 16) & 1)
+    else:
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+        rate = settings.TRACE_SAMPLE_RATE
+        sampled = rate > 0 and random.random() < rate
+    return Trace(trace_id, sampled, parent_id)
+
+
+class TracingMiddleware:
+    """Ouvre une Trace par requête HTTP, pose Server-Timing, exporte les traces échantillonnées."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timing = _wants_timing(scope.get("headers") or [])
+        if not (timing or exporter.enabled):
+            await self.app(scope, receive, send)
+            return
+        trace = _start_trace(scope.get("headers") or [])
+        token = _current.set(trace)
+        root_id = _span_id() if trace.sampled else ""
+        if trace.sampled:
+            trace.stack.append(root_id)
+        start = time.perf_counter_ns()
+        status = 0
+
+        async def send_timed(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timing:
+                    headers = list(message.get("headers") or [])
+                    value = trace.server_timing(time.perf_counter_ns() - start)
+                    headers.append((b"server-timing", value.encode("latin-1")))
+                    message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _current.reset(token)
+            if trace.sampled:
+                end = time.perf_counter_ns()
+                trace.spans.append({
+                    "spanId": root_id,
+                    "parentSpanId": None,
+                    "name": f"{scope['method']} {scope['path']}",
+                    "start": trace.epoch_ns(start),
+                    "end": trace.epoch_ns(end),
+                    "attrs": {
+                        "http.method": scope["method"],
+                        "http.target": scope["path"],
+                        "http.status_code": status,
+                    },
+                })
+                exporter.submit(trace)
@@ -1,19 +1,31 @@
 # backend/app/main.py
+import tracemalloc
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .core.config import settings
 from .core.db import init_db
+from .core.profiling import ProfilingMiddleware
+from .core.tracing import TimedJSONResponse, TracingMiddleware
+from .services.alerts import run_price_alerts
+from .services.background import scheduler
+from .services.carrier_rules import carrier_rules
+from .services.fx import fx_rates
+from .services.popularity import prefetch_popular
+from .services.warmer import run_saved_search_warmer
 
 from .routers.ping import router as ping_router
 from .routers.users import router as users_router
 from .routers.profiles import router as profiles_router
 from .routers.quote import router as quote_router
+from .routers.admin import router as admin_router
 
 # nouveaux
 from .routers.calendar import router as calendar_router
 from .routers.search import router as search_router
 
-app = FastAPI(title="Comparateur Backend", version="0.1.0")
+app = FastAPI(title="Comparateur Backend", version="0.1.0", default_response_class=TimedJSONResponse)
 
 # Origines explicites (local) + regex pour couvrir les déploiements Vercel
 ALLOWED_ORIGINS = [
@@ -32,17 +44,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # lisible par le JS du front seulement si SERVER_TIMING est activé (dev)
+    expose_headers=["Server-Timing"] if settings.SERVER_TIMING else [],
 )
+# ajouté en dernier = le plus externe : Server-Timing couvre toute la requête (CORS compris)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
 
 @app.on_event("startup")
 def _startup():
+    if not carrier_rules.loaded:
+        # sans règles, les prix servis perdraient frais et tarifs compagnie sans que rien ne le signale
+        raise RuntimeError(f"règles compagnies introuvables ou invalides : {carrier_rules.path}")
     init_db()
+    if settings.TRACEMALLOC_FRAMES > 0:
+        tracemalloc.start(settings.TRACEMALLOC_FRAMES)
+    # tâches de fond (intervalle 0 = désactivée)
+    scheduler.add("carrier-rules-reload", settings.CARRIER_RULES_RELOAD_INTERVAL, carrier_rules.reload_if_changed)
+    scheduler.add("fx-reload", settings.FX_RELOAD_INTERVAL, fx_rates.reload_if_changed)
+    scheduler.add("price-alerts", settings.ALERTS_EVAL_INTERVAL, run_price_alerts)
+    scheduler.add("saved-search-warmer", settings.WARMER_INTERVAL, run_saved_search_warmer)
+    scheduler.add("popular-prefetch", settings.PREFETCH_INTERVAL, prefetch_popular)
+    scheduler.start()
+
+@app.on_event("shutdown")
+def _shutdown():
+    scheduler.stop()
 
 # === Branchements ===
 app.include_router(ping_router)       # /api/ping
 app.include_router(users_router)      # /api/users/...
 app.include_router(profiles_router)   # /api/profiles/...
 app.include_router(quote_router)      # /api/quote
+app.include_router(admin_router)      # /api/admin/... (PROFILING_SECRET)
 
 # sans /api (pour matcher le proxy Next qui appelle /calendar et /search)
 app.include_router(calendar_router)   # /calendar
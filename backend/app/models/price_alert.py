@@ -1,14 +1,23 @@
-from sqlalchemy import Column, Boolean, Integer, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Index, func
 from sqlalchemy.types import JSON
 from ..core.db import Base
 import uuid
 
 class PriceAlert(Base):
     __tablename__ = "price_alerts"
+    __table_args__ = (
+        # alertes d'un user ; alertes actives (évaluation)
+        Index("ix_price_alerts_user_active", "user_id", "active"),
+        Index("ix_price_alerts_active", "active"),
+    )
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     profile_id = Column(String, ForeignKey("traveler_profiles.id", ondelete="SET NULL"))
     query = Column(JSON, nullable=False)
     target_price_cents = Column(Integer, nullable=False)
     active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # renseignés par l'évaluateur (services/alerts.py)
+    last_price_cents = Column(Integer, nullable=True)
+    last_checked_at = Column(DateTime(timezone=True), nullable=True)
+    triggered_at = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
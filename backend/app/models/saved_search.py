@@ -1,10 +1,13 @@
-from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, func
 from sqlalchemy.types import JSON
 from ..core.db import Base
 import uuid
 
 class SavedSearch(Base):
     __tablename__ = "saved_searches"
+    __table_args__ = (
+        Index("ix_saved_searches_user", "user_id"),
+    )
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     profile_id = Column(String, ForeignKey("traveler_profiles.id", ondelete="SET NULL"))
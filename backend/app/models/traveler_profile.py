@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.types import JSON
 from ..core.db import Base
 from datetime import datetime
@@ -9,6 +9,12 @@ def gen_uuid() -> str:
 
 class TravelerProfile(Base):
     __tablename__ = "traveler_profiles"
+    __table_args__ = (
+        # liste des profils d'un user (WHERE user_id ORDER BY created_at) ;
+        # profil par défaut (WHERE user_id AND default_for_search, par created_at)
+        Index("ix_traveler_profiles_user_created", "user_id", "created_at"),
+        Index("ix_traveler_profiles_user_default", "user_id", "default_for_search", "created_at"),
+    )
     id = Column(String, primary_key=True, default=gen_uuid, nullable=False)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
@@ -0,0 +1,43 @@
+# backend/app/routers/admin.py
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from ..core.config import settings
+from ..core.profiling import require_admin, store
+from ..services.cache import cache
+from ..services.memory import memory_report
+
+# protégé par PROFILING_SECRET (en-tête X-Profile-Token) ; 404 si non configuré
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+def list_profiles() -> List[Dict[str, Any]]:
+    """Profils récents (plus récent d'abord), déclenchés par X-Profile-Token sur une requête."""
+    return [p.summary() for p in store.list()]
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str) -> str:
+    """
+    mode sample : piles repliées « a;b;c N » (flamegraph.pl, speedscope, inferno…) ;
+    mode cprofile : statistiques pstats triées par temps cumulé.
+    """
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profil inconnu ou expiré")
+    return profile.render()
+
+
+@router.get("/memory")
+def get_memory(
+    depth: int = Query(3, ge=1, le=6, description="segments de clé par préfixe (DAY:PAR:BCN = 3)"),
+    top: int = Query(20, ge=1, le=200),
+    start: int = Query(0, description="1 = démarrer tracemalloc s'il ne tourne pas"),
+) -> Dict[str, Any]:
+    """Mémoire du cache par préfixe de clé + instantané tracemalloc (et croissance depuis le précédent)."""
+    return memory_report(cache, depth, top, bool(start), settings.TRACEMALLOC_FRAMES or 1)
@@ -1,11 +1,20 @@
 # backend/app/routers/calendar.py
 from __future__ import annotations
 
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Header, Response
 from typing import Dict, Any
+import logging
 
+from ..core.profiling import profiled
+from ..core.http_cache import etag_matches, not_modified, set_validators
+from ..services.cache import cache, cal_key, entry_etag
 from ..services.normalize import normalize_criteria
 from ..services.calendar_aggregator import build_month
+from ..services.fx import base_criteria, convert_calendar, fx_info, resolve as resolve_currency
+from ..services.popularity import popularity
+from ..services.speculative import speculative
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="", tags=["calendar"])  # pas de /api (proxy Next attend /calendar)
 
@@ -20,7 +29,9 @@ def _valid_month(month: str) -> bool:
 
 
 @router.get("/calendar")
+@profiled
 def get_calendar(
+    response: Response,
     # obligatoires
     origin: str = Query(..., min_length=3, max_length=3),
     destination: str = Query(..., min_length=3, max_length=3),
@@ -38,17 +49,29 @@ def get_calendar(
     direct: int | None = Query(None),             # 0/1
     fareType: str | None = Query(None),
     resident: int | None = Query(None),           # 0/1
+    currency: str | None = Query(None, description="ISO 4217 (défaut: devise de base)"),
+    if_none_match: str | None = Header(None),
 ):
     """
     Renvoie un calendrier *cohérent jour ↔ jour* :
-      { "calendar": { "YYYY-MM-DD": { "prix": int|None, "disponible": bool }, ... } }
+      { "calendar": { "YYYY-MM-DD": { "prix": int|None, "disponible": bool }, ... },
+        "currency": str, "fx": { base, currency, rate, version } }
 
     - Source de vérité = agrégation *jour par jour* via les providers actifs (Amadeus en priorité, sinon dummy).
     - Prix invalides (<=0/NaN) exclus.
     - Le min de /calendar pour un jour correspondra au 1er résultat de /search le même jour (grâce au cache DAY:/CAL: côté services).
+    - ETag fort (clé CAL: + version d'entrée) ; If-None-Match correspondant → 304 sans recalcul.
+      Cache-Control max-age = TTL restant de l'entrée CAL:.
+    - currency : CAL: en devise de base, converti à la réponse (version des taux dans `fx`/ETag).
+    - SPECULATIVE_PREFETCH : M+1 puis (sur un HIT) les jours les moins chers sont préchauffés en tâche de fond.
     """
     if not _valid_month(month):
         raise HTTPException(status_code=400, detail="Paramètre month invalide, attendu YYYY-MM.")
+    try:
+        cur, table, rate = resolve_currency(currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Paramètre currency invalide: {e}")
+    variant = f"{cur}@{table.version}"
 
     criteria: Dict[str, Any] = normalize_criteria({
         "adults": adults,
@@ -65,7 +88,26 @@ def get_calendar(
         "resident": resident,
     })
 
-    # Agrégation *jour par jour* (utilise le cache DAY en interne, puis compose CAL)
-    calendar = build_month(origin=origin, destination=destination, month_ym=month, criteria=criteria)
+    popularity.record("cal", origin, destination, month, criteria)
+    # CAL: est stocké sous les critères en devise de base (build_month), pas en EUR fixe
+    ckey = cal_key(origin, destination, month, base_criteria(criteria))
+    entry = cache.get_entry(ckey)
+    if entry is None:
+        # Agrégation *jour par jour* (utilise le cache DAY en interne, puis compose CAL)
+        out = build_month(origin=origin, destination=destination, month_ym=month, criteria=criteria)
+        entry = cache.get_entry(ckey)
+        if entry is None:
+            # entrée déjà évincée/expirée : réponse servie telle quelle, sans validateurs
+            logger.warning("[calendar] CAL absent après build_month : %s", ckey[:80])
+            response.headers["Cache-Control"] = "no-store"
+            calendar = out if cur == table.base else convert_calendar(out, rate)
+            return {"calendar": calendar, "currency": cur, "fx": fx_info(cur, table)}
+        speculative.after_calendar(origin, destination, month, criteria, entry.value, hit=False)
+    else:
+        speculative.after_calendar(origin, destination, month, criteria, entry.value, hit=True)
+        if etag_matches(if_none_match, entry_etag(ckey, entry, variant)):
+            return not_modified(entry_etag(ckey, entry, variant), entry.ttl_remaining())
 
-    return {"calendar": calendar}
\ No newline at end of file
+    set_validators(response, entry_etag(ckey, entry, variant), entry.ttl_remaining())
+    calendar = entry.value if cur == table.base else convert_calendar(entry.value, rate)
+    return {"calendar": calendar, "currency": cur, "fx": fx_info(cur, table)}
\ No newline at end of file
@@ -3,12 +3,13 @@
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.security import get_current_user_email
-from ..core.db import get_db
-from ..models.user import User
+from ..core.db import get_async_db
 from ..models.traveler_profile import TravelerProfile
+from ..services.identity import get_identity, invalidate_identity
 
 router = APIRouter(prefix="/api", tags=["profiles"])
 
@@ -55,15 +56,26 @@ class ProfileOut(BaseModel):
 
 # ---------- Helpers ----------
 
-def _ensure_user(db: Session, email: str) -> User:
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        # création "à la volée" si le user n'existe pas encore
-        user = User(email=email)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    return user
+async def _user_id(db: AsyncSession, email: str) -> str:
+    # user créé "à la volée" s'il n'existe pas encore ; id servi par le cache d'identité
+    return (await get_identity(db, email)).user_id
+
+
+async def _get_owned_profile(db: AsyncSession, profile_id: str, user_id: str) -> Optional[TravelerProfile]:
+    return (
+        await db.execute(
+            select(TravelerProfile)
+            .where(TravelerProfile.id == profile_id, TravelerProfile.user_id == user_id)
+        )
+    ).scalars().first()
+
+
+async def _clear_defaults(db: AsyncSession, user_id: str) -> None:
+    await db.execute(
+        update(TravelerProfile)
+        .where(TravelerProfile.user_id == user_id)
+        .values(default_for_search=False)
+    )
 
 
 def _apply_payload_to_instance(p: TravelerProfile, payload: ProfileIn) -> None:
@@ -98,59 +110,51 @@ def _apply_payload_to_instance(p: TravelerProfile, payload: ProfileIn) -> None:
 # ---------- Endpoints ----------
 
 @router.get("/profiles", response_model=List[ProfileOut])
-def list_profiles(
+async def list_profiles(
     email: str = Depends(get_current_user_email),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = _ensure_user(db, email)
-    profs = (
-        db.query(TravelerProfile)
-        .filter(TravelerProfile.user_id == user.id)
-        .order_by(TravelerProfile.created_at.asc())
-        .all()
-    )
-    return profs
+    ident = await get_identity(db, email)
+    return [
+        {"id": pid, "label": label, "default_for_search": dfs}
+        for (pid, label, dfs) in ident.profiles
+    ]
 
 
 @router.post("/profiles", response_model=ProfileOut)
-def create_profile(
+async def create_profile(
     payload: ProfileIn,
     email: str = Depends(get_current_user_email),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = _ensure_user(db, email)
+    user_id = await _user_id(db, email)
 
-    prof = TravelerProfile(user_id=user.id, label=payload.label)
+    prof = TravelerProfile(user_id=user_id, label=payload.label)
     _apply_payload_to_instance(prof, payload)
 
     # Si on le crée par défaut → mettre les autres à False
     if bool(payload.default_for_search):
-        db.query(TravelerProfile).filter(
-            TravelerProfile.user_id == user.id
-        ).update({TravelerProfile.default_for_search: False})
+        await _clear_defaults(db, user_id)
 
         prof.default_for_search = True
 
     db.add(prof)
-    db.commit()
-    db.refresh(prof)
+    await db.commit()
+    invalidate_identity(email)
+    await db.refresh(prof)
     return prof
 
 
 @router.put("/profiles/{profile_id}", response_model=ProfileOut)
-def update_profile(
+async def update_profile(
     profile_id: str,
     payload: ProfileIn,
     email: str = Depends(get_current_user_email),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = _ensure_user(db, email)
+    user_id = await _user_id(db, email)
 
-    prof = (
-        db.query(TravelerProfile)
-        .filter(TravelerProfile.id == profile_id, TravelerProfile.user_id == user.id)
-        .first()
-    )
+    prof = await _get_owned_profile(db, profile_id, user_id)
     if not prof:
         raise HTTPException(status_code=404, detail="Profile not found")
 
@@ -160,84 +164,83 @@ def update_profile(
 
     # Gestion du "par défaut"
     if payload.default_for_search is True:
-        db.query(TravelerProfile).filter(
-            TravelerProfile.user_id == user.id
-        ).update({TravelerProfile.default_for_search: False})
+        await _clear_defaults(db, user_id)
         prof.default_for_search = True
     elif payload.default_for_search is False and previous_default:
         # empêcher de se retrouver sans aucun profil par défaut :
         prof.default_for_search = False
         # S'il n'en reste aucun, on remet celui-ci par défaut
-        remains = db.query(TravelerProfile).filter(
-            TravelerProfile.user_id == user.id,
-            TravelerProfile.default_for_search == True,  # noqa: E712
-        ).count()
+        remains = (
+            await db.execute(
+                select(func.count())
+                .select_from(TravelerProfile)
+                .where(
+                    TravelerProfile.user_id == user_id,
+                    TravelerProfile.default_for_search == True,  # noqa: E712
+                )
+            )
+        ).scalar_one()
         if remains == 0:
             prof.default_for_search = True
 
-    db.commit()
-    db.refresh(prof)
+    await db.commit()
+    invalidate_identity(email)
+    await db.refresh(prof)
     return prof
 
 
 @router.delete("/profiles/{profile_id}", response_model=Dict[str, bool])
-def delete_profile(
+async def delete_profile(
     profile_id: str,
     email: str = Depends(get_current_user_email),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = _ensure_user(db, email)
+    user_id = await _user_id(db, email)
 
-    prof = (
-        db.query(TravelerProfile)
-        .filter(TravelerProfile.id == profile_id, TravelerProfile.user_id == user.id)
-        .first()
-    )
+    prof = await _get_owned_profile(db, profile_id, user_id)
     if not prof:
         raise HTTPException(status_code=404, detail="Profile not found")
 
     was_default = bool(prof.default_for_search)
 
-    db.delete(prof)
-    db.commit()
+    await db.delete(prof)
+    await db.commit()
+    invalidate_identity(email)
 
     # Si on a supprimé le profil par défaut, on tente d’en mettre un autre
     if was_default:
         other = (
-            db.query(TravelerProfile)
-            .filter(TravelerProfile.user_id == user.id)
-            .order_by(TravelerProfile.created_at.asc())
-            .first()
-        )
+            await db.execute(
+                select(TravelerProfile)
+                .where(TravelerProfile.user_id == user_id)
+                .order_by(TravelerProfile.created_at.asc())
+            )
+        ).scalars().first()
         if other:
             other.default_for_search = True
-            db.commit()
+            await db.commit()
+            invalidate_identity(email)
 
     return {"ok": True}
 
 
 @router.patch("/profiles/{profile_id}/default", response_model=ProfileOut)
-def set_default_profile(
+async def set_default_profile(
     profile_id: str,
     email: str = Depends(get_current_user_email),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = _ensure_user(db, email)
+    user_id = await _user_id(db, email)
 
     # d'abord désactiver tous les autres
-    db.query(TravelerProfile).filter(
-        TravelerProfile.user_id == user.id
-    ).update({TravelerProfile.default_for_search: False})
-
-    prof = (
-        db.query(TravelerProfile)
-        .filter(TravelerProfile.id == profile_id, TravelerProfile.user_id == user.id)
-        .first()
-    )
+    await _clear_defaults(db, user_id)
+
+    prof = await _get_owned_profile(db, profile_id, user_id)
     if not prof:
         raise HTTPException(status_code=404, detail="Profile not found")
 
     prof.default_for_search = True
-    db.commit()
-    db.refresh(prof)
+    await db.commit()
+    invalidate_identity(email)
+    await db.refresh(prof)
     return prof
\ No newline at end of file
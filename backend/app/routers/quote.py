@@ -1,12 +1,13 @@
 # backend/app/routers/quote.py
+from functools import lru_cache
+from typing import List, Tuple
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.profiling import profiled
 from ..core.security import get_current_user_email
-from ..core.db import get_db
-from ..models.user import User
-from ..models.traveler_profile import TravelerProfile
-import json
+from ..core.db import get_async_db
+from ..services.identity import NO_PROFILE, ProfileSnapshot, get_identity
 
 router = APIRouter(prefix="/api", tags=["quote"])
 
@@ -22,78 +23,89 @@ class QuoteOut(BaseModel):
     currency: str = "EUR"
     breakdown: dict
 
-# ====== helpers ======
+class QuoteBatchIn(BaseModel):
+    items: List[QuoteIn] = Field(..., min_length=1, max_length=200)
 
-def _as_dict(v):
-    """Normalize db JSON fields that might come back as str/None."""
-    if v is None:
-        return {}
-    if isinstance(v, dict):
-        return v
-    if isinstance(v, str):
-        try:
-            return json.loads(v)
-        except Exception:
-            return {}
-    return {}
-
-# ====== route ======
+class QuoteBatchItemOut(QuoteOut):
+    origin: str
+    destination: str
+    date: str
 
-@router.post("/quote", response_model=QuoteOut)
-def get_quote(
-    payload: QuoteIn,
-    email: str = Depends(get_current_user_email),
-    db: Session = Depends(get_db),
-):
-    # Auto-provision user if needed
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        user = User(email=email)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-
-    # Default profile (first created or explicit default)
-    prof = (
-        db.query(TravelerProfile)
-        .filter(TravelerProfile.user_id == user.id)
-        .filter(TravelerProfile.default_for_search == True)  # noqa: E712
-        .order_by(TravelerProfile.created_at.asc())
-        .first()
-    )
+class QuoteBatchOut(BaseModel):
+    quotes: List[QuoteBatchItemOut]
 
+# ====== helpers ======
+
+async def _load_default_profile(db: AsyncSession, email: str) -> ProfileSnapshot:
+    # user auto-provisionné + profil par défaut, servis par le cache d'identité
+    return (await get_identity(db, email)).default_profile
+
+@lru_cache(maxsize=4096)
+def _price(snap: ProfileSnapshot, origin: str, destination: str, date: str) -> Tuple[Tuple[str, int], ...]:
+    """
+    Pricing d'un trajet pour un profil. Mémoïsé par (version du profil, trajet, date) :
+    toute modification du profil change updated_at, donc la clé.
+    """
     # --- toy pricing logic (deterministic but looks “real”) ---
     base = 79
     breakdown = {"base": base}
 
     # simple zone adjust: different first letter of IATA => +10
-    if payload.origin[0] != payload.destination[0]:
+    if origin[0] != destination[0]:
         breakdown["zone_adjust"] = 10
 
-    if prof:
-        student = bool(getattr(prof, "student", False))
-        youth = bool(getattr(prof, "youth", False))
-        senior = bool(getattr(prof, "senior", False))
-        has_disability = bool(getattr(prof, "has_disability", False))
-
-        baggage = _as_dict(getattr(prof, "baggage", None))
-        pet = _as_dict(getattr(prof, "pet", None))
-        discount_cards = getattr(prof, "discount_cards", None) or []
-
-        if senior:
+    if snap != NO_PROFILE:
+        if snap.senior:
             breakdown["senior_discount"] = -8
-        if student or youth:
+        if snap.student or snap.youth:
             breakdown["youth_discount"] = -5
-        if (baggage.get("checked") or 0) > 0:
+        if snap.checked_bags > 0:
             breakdown["checked_bag"] = 25
-        if (baggage.get("cabin") or 0) > 0:
+        if snap.cabin_bags > 0:
             breakdown["cabin_bag"] = 10
-        if pet.get("type"):
+        if snap.pet_type:
             breakdown["pet_fee"] = 35
-        if has_disability:
+        if snap.has_disability:
             breakdown["assistance"] = 0
-        if discount_cards:
+        if snap.has_discount_cards:
             breakdown["cards_rebate"] = -7
 
+    return tuple(breakdown.items())
+
+def _quote(snap: ProfileSnapshot, item: QuoteIn) -> QuoteOut:
+    breakdown = dict(_price(snap, item.origin, item.destination, item.date))
     total = int(sum(breakdown.values()))
-    return QuoteOut(total=total, currency="EUR", breakdown=breakdown)
\ No newline at end of file
+    return QuoteOut(total=total, currency="EUR", breakdown=breakdown)
+
+# ====== routes ======
+
+@router.post("/quote", response_model=QuoteOut)
+@profiled
+async def get_quote(
+    payload: QuoteIn,
+    email: str = Depends(get_current_user_email),
+    db: AsyncSession = Depends(get_async_db),
+):
+    snap = await _load_default_profile(db, email)
+    return _quote(snap, payload)
+
+@router.post("/quote/batch", response_model=QuoteBatchOut)
+@profiled
+async def get_quote_batch(
+    payload: QuoteBatchIn,
+    email: str = Depends(get_current_user_email),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Prix de plusieurs (origin, destination, date) pour le profil par défaut :
+    user + profil chargés une seule fois, puis pricing de chaque item en une passe.
+    """
+    snap = await _load_default_profile(db, email)
+    quotes = [
+        QuoteBatchItemOut(
+            origin=item.origin, destination=item.destination, date=item.date,
+            **_quote(snap, item).model_dump(),
+        )
+        for item in payload.items
+    ]
+    return QuoteBatchOut(quotes=quotes)
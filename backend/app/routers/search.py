@@ -1,11 +1,19 @@
 # backend/app/routers/search.py
 from __future__ import annotations
 
-from fastapi import APIRouter, Query, HTTPException
-from typing import Dict, Any, List
+from fastapi import APIRouter, Query, HTTPException, Header, Response
+from datetime import date as dt_date
+from typing import Dict, Any
 
-from ..services.normalize import normalize_criteria, normalize_flight, sanitize_price
-from ..services.providers import build_providers
+from ..core.profiling import profiled
+from ..core.http_cache import etag_matches, not_modified, set_validators
+from ..services.cache import day_key, entry_etag
+from ..services.calendar_aggregator import get_day_entry
+from ..services.normalize import normalize_criteria
+from ..services.popularity import popularity
+from ..services.day_index import DayFilters, parse_carriers, parse_hhmm
+from ..services.fx import convert_flights, fx_info, resolve as resolve_currency, to_base_bounds
+from ..services.results import InvalidCursor, paginate
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,20 +21,47 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="", tags=["search"])  # pas de /api (proxy Next attend /search)
 
 def _valid_date(d: str) -> bool:
-    return (
+    # forme YYYY-MM-DD *et* date réelle (2031-02-30 refusé avant tout appel provider)
+    if not (
         len(d) == 10
         and d[4] == "-"
         and d[7] == "-"
         and d[:4].isdigit()
         and d[5:7].isdigit()
         and d[8:10].isdigit()
-    )
+    ):
+        return False
+    try:
+        dt_date.fromisoformat(d)
+    except ValueError:
+        return False
+    return True
 
-# Instancie la chaîne de providers une seule fois au chargement du module
-_PROVIDERS = build_providers()
+def _parse_filters(
+    dep_from: str | None, dep_to: str | None, arr_from: str | None, arr_to: str | None,
+    carriers: str | None, exclude_carriers: str | None,
+    max_stops: int | None, max_duration: int | None, min_price: int | None, max_price: int | None,
+) -> DayFilters:
+    try:
+        return DayFilters(
+            dep_from=parse_hhmm(dep_from),
+            dep_to=parse_hhmm(dep_to),
+            arr_from=parse_hhmm(arr_from),
+            arr_to=parse_hhmm(arr_to),
+            carriers=parse_carriers(carriers),
+            exclude_carriers=parse_carriers(exclude_carriers),
+            max_stops=max_stops,
+            max_duration=max_duration,
+            min_price=min_price,
+            max_price=max_price,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/search")
+@profiled
 def search_flights(
+    response: Response,
     # obligatoires
     origin: str = Query(..., min_length=3, max_length=3),
     destination: str = Query(..., min_length=3, max_length=3),
@@ -44,19 +79,51 @@ def search_flights(
     direct: int | None = Query(None),             # 0/1
     fareType: str | None = Query(None),
     resident: int | None = Query(None),           # 0/1
-    # tri demandé par le front (mais on renvoie déjà trié prix asc)
-    sort: str | None = Query(None),
+    currency: str | None = Query(None, description="ISO 4217 (défaut: devise de base)"),
+    # tri / pagination
+    sort: str | None = Query(None, description="price|duration|departure|stops|best"),
+    limit: int | None = Query(None, ge=1, le=200),
+    cursor: str | None = Query(None, description="nextCursor de la page précédente"),
+    # filtres fins (résolus sur les index de l'entrée DAY:)
+    depFrom: str | None = Query(None, description="HH:MM"),
+    depTo: str | None = Query(None, description="HH:MM"),
+    arrFrom: str | None = Query(None, description="HH:MM"),
+    arrTo: str | None = Query(None, description="HH:MM"),
+    carriers: str | None = Query(None, description="CSV codes compagnie à garder (ex: AF,U2)"),
+    excludeCarriers: str | None = Query(None, description="CSV codes compagnie à exclure"),
+    maxStops: int | None = Query(None, ge=0),
+    maxDuration: int | None = Query(None, ge=1, description="minutes"),
+    minPrice: int | None = Query(None, ge=0, description="dans la devise demandée"),
+    maxPrice: int | None = Query(None, ge=0, description="dans la devise demandée"),
+    mode: str | None = Query(None, description="all (défaut) | pareto"),
+    if_none_match: str | None = Header(None),
 ):
     """
     Renvoie:
-      { "results": [ { prix, compagnie, escales, um_ok, animal_ok, departISO, arriveeISO, duree|duree_minutes }, ... ] }
+      { "results": [ { prix, compagnie, escales, um_ok, animal_ok, departISO, arriveeISO, duree|duree_minutes }, ... ],
+        "total": int, "nextCursor": str|None,
+        "currency": str, "fx": { base, currency, rate, version } }
 
     - Essaie les providers dans l’ordre (Amadeus si dispo, sinon dummy).
     - Prix invalides (<=0/NaN) filtrés.
-    - Résultats triés par prix croissant.
+    - Tri `sort` (prix croissant par défaut) ; `limit` + `cursor` pour paginer.
+      Ordre calculé une fois par entrée DAY: et réutilisé entre les pages ; 1re page en top-K.
+    - Filtres fins (fenêtres horaires départ/arrivée, compagnies, escales, durée, prix)
+      répondus par les index secondaires de l'entrée DAY:, pas par un parcours linéaire.
+    - mode=pareto : seulement les vols non dominés en (prix, durée, escales).
+    - Liste partagée avec /calendar via le cache DAY: ; ETag fort (clé DAY: + version),
+      If-None-Match correspondant → 304 sans appel provider.
+    - currency : offres en cache dans la devise de base, page convertie à la réponse
+      (table de taux locale, version dans `fx` et dans l'ETag) → changer de devise = 0 appel provider.
     """
     if not _valid_date(date):
         raise HTTPException(status_code=400, detail="Paramètre date invalide, attendu YYYY-MM-DD.")
+    if mode not in (None, "", "all", "pareto"):
+        raise HTTPException(status_code=400, detail="Paramètre mode invalide, attendu all|pareto.")
+    try:
+        cur, table, rate = resolve_currency(currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Paramètre currency invalide: {e}")
 
     criteria: Dict[str, Any] = normalize_criteria({
         "adults": adults,
@@ -73,34 +140,30 @@ def search_flights(
         "resident": resident,
     })
 
-    # Essaie les providers dans l'ordre configuré
-    raw: List[Dict[str, Any]] = []
-    for p in _PROVIDERS:
-        try:
-            got = p.get_day_flights(origin, destination, date, criteria)  # type: ignore[attr-defined]
-        except Exception as e:
-            logger.warning("Provider %s a échoué: %s", getattr(p, "name", "?"), e)
-            got = []
-        if got:
-            raw = got
-            break
-    # Si tous vides, on renvoie liste vide
-    if not raw:
-        return {"results": []}
+    # bornes de prix exprimées dans la devise demandée → devise de base (celle du cache)
+    if cur != table.base:
+        minPrice, maxPrice = to_base_bounds(minPrice, maxPrice, rate)
+    filters = _parse_filters(
+        depFrom, depTo, arrFrom, arrTo, carriers, excludeCarriers,
+        maxStops, maxDuration, minPrice, maxPrice,
+    )
+
+    popularity.record("day", origin, destination, date, criteria)
+    # pipeline jour partagé avec /calendar (cache DAY:, providers seulement sur un MISS)
+    entry = get_day_entry(origin, destination, date, criteria)
+    etag = entry_etag(day_key(origin, destination, date, criteria), entry, f"{cur}@{table.version}")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, entry.ttl_remaining())
 
-    # Normalisation + filtre prix
-    results = []
-    for r in raw:
-        f = normalize_flight(r, criteria)
-        if f is None:
-            continue
-        prix_ok = sanitize_price(f.get("prix"))
-        if prix_ok is None:
-            continue
-        f["prix"] = prix_ok
-        results.append(f)
+    try:
+        page = paginate(entry, sort=sort, limit=limit, cursor=cursor, filters=filters, pareto=(mode == "pareto"))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=f"Paramètre cursor invalide: {e}")
+    if cur != table.base:
+        page["results"] = convert_flights(page["results"], cur, rate)
+    page["currency"] = cur
+    page["fx"] = fx_info(cur, table)
 
-    # Tri prix asc (garantit cohérence avec min de /calendar)
-    results.sort(key=lambda x: x.get("prix", 10**9))
+    set_validators(response, etag, entry.ttl_remaining())
+    return page
 
-    return {"results": results}
\ No newline at end of file
@@ -1,10 +1,9 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
-from ..core.db import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.db import get_async_db
 from ..core.security import get_current_user_email
-from ..models.user import User
-from ..models.traveler_profile import TravelerProfile
+from ..services.identity import get_identity
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -13,18 +12,9 @@ class MeResponse(BaseModel):
     profiles: list[dict]
 
 @router.get("/me", response_model=MeResponse)
-def get_me(email: str = Depends(get_current_user_email), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        user = User(email=email)
-        db.add(user); db.commit(); db.refresh(user)
-    profs = (
-        db.query(TravelerProfile.id, TravelerProfile.label, TravelerProfile.default_for_search)
-        .filter(TravelerProfile.user_id == user.id)
-        .order_by(TravelerProfile.created_at.asc())
-        .all()
-    )
+async def get_me(email: str = Depends(get_current_user_email), db: AsyncSession = Depends(get_async_db)):
+    ident = await get_identity(db, email)  # aucun SQL si l'identité est en cache
     return MeResponse(
-        email=user.email,
-        profiles=[{"id": pid, "label": label, "default_for_search": dfs} for (pid, label, dfs) in profs]
+        email=ident.email,
+        profiles=[{"id": pid, "label": label, "default_for_search": dfs} for (pid, label, dfs) in ident.profiles]
     )
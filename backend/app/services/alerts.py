@@ -0,0 +1,140 @@
+# backend/app/services/alerts.py
+"""
+Évaluation par lots des alertes prix (PriceAlert).
+
+PriceAlert.query = mêmes paramètres que /search :
+  { "origin": "PAR", "destination": "BCN", "date": "YYYY-MM-DD", "adults": 1, "cabin": "eco", ... }
+
+- les alertes actives sont chargées par pages (colonnes utiles seulement) ;
+- regroupées par (route, date, critères normalisés) : un seul appel provider par requête
+  distincte, quel que soit le nombre d'alertes qui la partagent ;
+- le jour passe par le pipeline DAY: (cache partagé avec /search et /calendar) : un jour
+  déjà en cache ne coûte rien, sinon un jeton du budget des tâches de fond ; sans jeton,
+  le groupe est reporté au passage suivant (les groupes les plus suivis d'abord) ;
+- résultats écrits en une seule passe (UPDATE par clé primaire, executemany).
+- prix du cache en devise de base ; cible et dernier prix dans la devise de l'alerte
+  (query.currency), conversion locale (fx.py) : la devise ne scinde pas les groupes.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date as dt_date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.db import SessionLocal
+from ..models.price_alert import PriceAlert
+from .cache import cache, day_key
+from .calendar_aggregator import get_day_entry
+from .fx import base_criteria, resolve as resolve_currency
+from .normalize import Criteria, criteria_from_query
+from .quota import TokenBucket, background_quota
+
+log = logging.getLogger(__name__)
+
+GroupKey = Tuple[str, str, str, Criteria]
+
+
+def query_key(query: Any) -> Optional[GroupKey]:
+    """(origin, destination, date, critères normalisés) d'une requête d'alerte ; None si invalide."""
+    if not isinstance(query, dict):
+        return None
+    origin = str(query.get("origin") or "").strip().upper()
+    destination = str(query.get("destination") or "").strip().upper()
+    date = str(query.get("date") or "").strip()
+    if len(origin) != 3 or len(destination) != 3:
+        return None
+    try:
+        dt_date.fromisoformat(date)
+    except ValueError:
+        return None
+    return origin, destination, date, criteria_from_query(query)
+
+
+def _load_active(db: Session, batch_size: int):
+    """Alertes actives (id, query, cible) par pages ordonnées par id."""
+    last_id = ""
+    while True:
+        rows = db.execute(
+            select(PriceAlert.id, PriceAlert.query, PriceAlert.target_price_cents)
+            .where(PriceAlert.active == True, PriceAlert.id > last_id)  # noqa: E712
+            .order_by(PriceAlert.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1].id
+
+
+def evaluate_alerts(
+    db: Session,
+    quota: TokenBucket = background_quota,
+    today: Optional[dt_date] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """Évalue toutes les alertes actives ; renvoie les compteurs du passage."""
+    today = today or dt_date.today()
+    now = datetime.now(timezone.utc)
+    stats = {"alerts": 0, "groups": 0, "cached": 0, "fetched": 0, "deferred": 0,
+             "matched": 0, "expired": 0, "invalid": 0}
+
+    groups: Dict[GroupKey, List[Tuple[str, int, float]]] = {}
+    expired: List[str] = []
+    for row in _load_active(db, batch_size or settings.ALERTS_BATCH_SIZE):
+        stats["alerts"] += 1
+        key = query_key(row.query)
+        if key is None:
+            stats["invalid"] += 1
+            continue
+        try:
+            _, _, rate = resolve_currency(row.query.get("currency"))
+        except ValueError:
+            stats["invalid"] += 1
+            continue
+        if dt_date.fromisoformat(key[2]) < today:
+            expired.append(row.id)
+            continue
+        groups.setdefault(key, []).append((row.id, int(row.target_price_cents), rate))
+    stats["groups"] = len(groups)
+
+    updates: List[Dict[str, Any]] = []
+    for (origin, destination, date, criteria), alerts in sorted(groups.items(), key=lambda kv: -len(kv[1])):
+        # DAY: est indexé en devise de base (get_day_entry) : même clé, sinon chaque groupe
+        # passerait pour absent et consommerait un jeton de quota
+        if cache.get_entry(day_key(origin, destination, date, base_criteria(criteria))) is not None:
+            stats["cached"] += 1
+        elif quota.try_acquire():
+            stats["fetched"] += 1
+        else:
+            stats["deferred"] += len(alerts)
+            continue
+        flights = get_day_entry(origin, destination, date, criteria).value
+        for alert_id, target, rate in alerts:
+            price_cents = round(flights[0]["prix"] * rate * 100) if flights else None
+            row = {"id": alert_id, "last_price_cents": price_cents, "last_checked_at": now}
+            if price_cents is not None and price_cents <= target:
+                row.update(active=False, triggered_at=now)
+                stats["matched"] += 1
+            updates.append(row)
+
+    if updates:
+        db.execute(update(PriceAlert), updates)
+    if expired:
+        db.execute(update(PriceAlert).where(PriceAlert.id.in_(expired)).values(active=False))
+        stats["expired"] = len(expired)
+    db.commit()
+    log.info("[alerts] %s", stats)
+    return stats
+
+
+def run_price_alerts() -> Dict[str, int]:
+    """Point d'entrée de la tâche périodique (session dédiée)."""
+    db = SessionLocal()
+    try:
+        return evaluate_alerts(db)
+    finally:
+        db.close()
@@ -0,0 +1,69 @@
+# backend/app/services/background.py
+"""
+Tâches périodiques du process (thread daemon par tâche).
+
+Volontairement minimal : pas de file ni de persistance, chaque worker uvicorn exécute
+ses propres tâches. Une exception est journalisée et n'arrête pas la tâche.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+log = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    def __init__(self, name: str, interval_s: float, fn: Callable[[], Any]) -> None:
+        self.name = name
+        self.interval_s = interval_s
+        self.fn = fn
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> Any:
+        try:
+            return self.fn()
+        except Exception:
+            log.exception("[jobs] %s a échoué", self.name)
+            return None
+
+    def _loop(self) -> None:
+        # premier passage après un intervalle : le démarrage de l'app reste léger
+        while not self._stop.wait(self.interval_s):
+            self.run_once()
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval_s <= 0:
+            return
+        self._thread = threading.Thread(target=self._loop, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+class JobScheduler:
+    def __init__(self) -> None:
+        self.jobs: Dict[str, PeriodicJob] = {}
+
+    def add(self, name: str, interval_s: float, fn: Callable[[], Any]) -> PeriodicJob:
+        """interval_s <= 0 : tâche enregistrée (run_once possible) mais jamais planifiée."""
+        job = PeriodicJob(name, interval_s, fn)
+        self.jobs[name] = job
+        return job
+
+    def start(self) -> None:
+        for job in self.jobs.values():
+            job.start()
+        active: List[str] = [n for n, j in self.jobs.items() if j.interval_s > 0]
+        if active:
+            log.info("[jobs] démarrées: %s", ", ".join(active))
+
+    def stop(self) -> None:
+        for job in self.jobs.values():
+            job.stop()
+
+
+scheduler = JobScheduler()
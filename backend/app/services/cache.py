@@ -1,12 +1,17 @@
 # backend/app/services/cache.py
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from time import time
-from typing import Any, Dict, Optional
-import json
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import itertools
 import hashlib
 import os
 import logging
+import uuid
+
+from ..core.tracing import traced
+from .carrier_rules import rules_version
+from .normalize import Criteria
 
 log = logging.getLogger(__name__)
 
@@ -23,19 +28,43 @@ CACHE_TTL_DAY_DEFAULT = 900        # 15 min
 CACHE_TTL_CALENDAR = _env_int("CACHE_TTL_CALENDAR", CACHE_TTL_CALENDAR_DEFAULT)
 CACHE_TTL_DAY = _env_int("CACHE_TTL_DAY", CACHE_TTL_DAY_DEFAULT)
 
+# Identifiant d'instance : deux workers peuvent attribuer la même version à des contenus
+# différents, l'ETag doit donc aussi dépendre du process qui a produit l'entrée.
+_INSTANCE_ID = uuid.uuid4().hex
+
 @dataclass
 class CacheEntry:
     value: Any
     expires_at: float
+    version: int = 0
+    # vues dérivées de `value` (tris, index…) : vivent et expirent avec l'entrée
+    derived: Dict[str, Any] = field(default_factory=dict)
+
+    def ttl_remaining(self) -> int:
+        """Secondes restantes avant expiration (0 si déjà expirée)."""
+        return max(0, int(self.expires_at - time()))
+
+    def derive(self, name: str, build: Callable[[Any], Any]) -> Any:
+        """Vue dérivée mémoïsée : build(value) n'est appelé qu'une fois par version."""
+        try:
+            return self.derived[name]
+        except KeyError:
+            out = build(self.value)
+            self.derived[name] = out
+            return out
 
 class InMemoryCache:
     """
     Cache mémoire *très* simple (process-local).
+    Chaque entrée porte une version, qui ne change que si la valeur stockée change
+    (sert de base aux ETag de /calendar et /search).
     """
     def __init__(self) -> None:
         self._store: Dict[str, CacheEntry] = {}
+        self._versions = itertools.count(1)
 
-    def get(self, key: str) -> Optional[Any]:
+    @traced("cache.get")
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
         now = time()
         e = self._store.get(key)
         if not e:
@@ -46,11 +75,37 @@ class InMemoryCache:
             self._store.pop(key, None)
             return None
         log.info("[cache] HIT %s", key[:80])
-        return e.value
+        return e
+
+    def get(self, key: str) -> Optional[Any]:
+        e = self.get_entry(key)
+        return e.value if e is not None else None
+
+    def entries(self) -> List[Tuple[str, CacheEntry]]:
+        """Instantané (clé, entrée) du cache, entrées expirées comprises (rapport mémoire)."""
+        return list(self._store.items())
 
-    def set(self, key: str, value: Any, ttl: int) -> None:
-        self._store[key] = CacheEntry(value=value, expires_at=time() + max(1, ttl))
+    @traced("cache.set")
+    def set(self, key: str, value: Any, ttl: int, compare: bool = False) -> CacheEntry:
+        """
+        compare=True : valeur identique à l'entrée en place → TTL prolongé, même version (ETag
+        stable). Comparaison profonde, réservée aux rafraîchissements d'une entrée encore
+        valide (préchauffage, recalcul du calendrier) ; ailleurs l'entrée est absente ou expirée.
+        """
+        expires_at = time() + max(1, ttl)
+        prev = self._store.get(key)
+        if compare and prev is not None and prev.value == value:
+            # contenu identique : on prolonge sans changer de version (ETag stable)
+            prev.expires_at = expires_at
+            log.info("[cache] SET %s (ttl=%ss, unchanged v%s)", key[:80], ttl, prev.version)
+            return prev
+        e = CacheEntry(value=value, expires_at=expires_at, version=next(self._versions))
+        self._store[key] = e
         log.info("[cache] SET %s (ttl=%ss)", key[:80], ttl)
+        return e
+
+    def clear(self) -> None:
+        self._store.clear()
 
     def touch(self, key: str, ttl: int) -> None:
         e = self._store.get(key)
@@ -59,15 +114,26 @@ class InMemoryCache:
 
 cache = InMemoryCache()
 
-def criteria_hash(criteria: Dict[str, Any]) -> str:
+def criteria_hash(criteria: Mapping[str, Any]) -> str:
     """
     Hash stable (sha1) d'un JSON *normalisé* (tri des clés, valeurs simples).
+    Pour un Criteria, le digest est déjà calculé : aucun json.dumps ici.
+    """
+    return Criteria(criteria).digest
+
+def entry_etag(key: str, entry: CacheEntry, variant: str = "") -> str:
+    """
+    ETag *fort* d'une entrée : (instance, clé, version). Change dès que la valeur change.
+    `variant` : représentation servie dérivée de l'entrée (ex: devise@version des taux).
     """
-    payload = json.dumps(criteria, sort_keys=True, separators=(",", ":"))
-    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    raw = f"{_INSTANCE_ID}|{key}|{entry.version}"
+    if variant:
+        raw += f"|{variant}"
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
 
-def cal_key(origin: str, destination: str, month: str, criteria: Dict[str, Any]) -> str:
-    return f"CAL:{origin.upper()}:{destination.upper()}:{month}:{criteria_hash(criteria)}"
+# Les prix stockés incluent les règles compagnies : leur version fait partie de la clé.
+def cal_key(origin: str, destination: str, month: str, criteria: Mapping[str, Any], rules: Optional[str] = None) -> str:
+    return f"CAL:{origin.upper()}:{destination.upper()}:{month}:{criteria_hash(criteria)}:r{rules or rules_version()}"
 
-def day_key(origin: str, destination: str, date: str, criteria: Dict[str, Any]) -> str:
-    return f"DAY:{origin.upper()}:{destination.upper()}:{date}:{criteria_hash(criteria)}"
\ No newline at end of file
+def day_key(origin: str, destination: str, date: str, criteria: Mapping[str, Any], rules: Optional[str] = None) -> str:
+    return f"DAY:{origin.upper()}:{destination.upper()}:{date}:{criteria_hash(criteria)}:r{rules or rules_version()}"
\ No newline at end of file
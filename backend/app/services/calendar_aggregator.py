@@ -1,18 +1,32 @@
 # backend/app/services/calendar_aggregator.py
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from datetime import date as dt_date
 import logging
+import threading
 
-from .cache import cache, day_key, cal_key, CACHE_TTL_DAY, CACHE_TTL_CALENDAR
+from ..core.tracing import span, traced
+from .cache import CacheEntry, cache, day_key, cal_key
+from .carrier_rules import RuleSet, apply_rules, carrier_rules
+from .fx import base_criteria
 from .normalize import sanitize_price, normalize_flight
-from .providers import build_providers  # même logique que /search
+from .popularity import popularity
+from .providers import build_providers
+from rules import carrier_mask, required_mask  # backend/rules.py
+from .results import best_offer
+from .subsumption import derive_from_superset
+from .ttl_policy import RESULT_EMPTY, RESULT_ERROR, RESULT_OK, days_until, ttl_policy, volatility
 
 log = logging.getLogger(__name__)
 
 # Instanciation (ordre: amadeus puis dummy si configuré ainsi)
 _PROVIDERS = build_providers()
 
+# appels provider en cours par clé DAY: (dédoublonnage des requêtes concurrentes)
+_inflight: Dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+_INFLIGHT_WAIT_S = 30.0
+
 
 def _days_in_month(year: int, month_1to12: int) -> int:
     if month_1to12 == 12:
@@ -24,40 +38,191 @@ def _pad2(n: int) -> str:
     return f"{n:02d}"
 
 
-def _first_non_empty_day_flights(origin: str, destination: str, date_ymd: str, criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _usable_flights(
+    raw: List[Dict[str, Any]], criteria: Dict[str, Any], ruleset: Optional[RuleSet],
+) -> List[Dict[str, Any]]:
+    """Offres brutes d'un provider → vols éligibles, normalisés, prix règles compagnies compris."""
+    # UM / animaux demandés : offres des compagnies inéligibles écartées avant toute normalisation
+    required = required_mask(criteria)
+    if required:
+        raw = [r for r in raw if carrier_mask(r.get("carrier") or r.get("compagnie")) & required == required]
+
+    results: List[Dict[str, Any]] = []
+    with span("normalize", offers=len(raw)):
+        for r in raw:
+            f = normalize_flight(r, criteria)
+            if f is None:
+                continue
+            prix_ok = sanitize_price(f.get("prix"))
+            if prix_ok is None:
+                continue
+            f["prix"] = prix_ok
+            results.append(f)
+
+    with span("rules"):
+        return apply_rules(results, criteria, ruleset)
+
+
+def _first_non_empty_day_flights(
+    origin: str,
+    destination: str,
+    date_ymd: str,
+    criteria: Dict[str, Any],
+    ruleset: Optional[RuleSet] = None,
+) -> Tuple[List[Dict[str, Any]], str]:
     """
-    Essaie les providers dans l'ordre jusqu'à obtenir une liste non vide, puis normalise/filtre.
-    Résultat trié par prix croissant.
+    Essaie les providers dans l'ordre jusqu'à obtenir au moins un vol *utilisable* : offres
+    filtrées (UM / animaux), normalisées et passées aux règles compagnies (prix total voyageurs
+    + frais, vols inéligibles retirés) avant de décider ; un provider dont tout est écarté
+    laisse la main au suivant.
+    Résultat trié par prix croissant, avec sa classe (ttl_policy) : ok | empty | error
+    (error = tous les providers ont échoué, ou un provider a échoué et un provider de repli
+    a répondu à sa place : réponse dégradée, gardée peu de temps pour réinterroger le premier).
+    Un provider signale un échec en levant (providers/base.py : ProviderError).
     """
-    raw: List[Dict[str, Any]] = []
+    results: List[Dict[str, Any]] = []
+    failed = 0
     for p in _PROVIDERS:
         try:
-            got = p.get_day_flights(origin, destination, date_ymd, criteria)  # type: ignore[attr-defined]
+            with span(f"provider.{getattr(p, 'name', '?')}"):
+                got = p.get_day_flights(origin, destination, date_ymd, criteria)  # type: ignore[attr-defined]
         except Exception as e:
-            log.warning("Provider %s a échoué (calendar): %s", getattr(p, "name", "?"), e)
-            got = []
+            log.warning("Provider %s a échoué: %s", getattr(p, "name", "?"), e)
+            failed += 1
+            continue
         if got:
-            raw = got
-            break
+            results = _usable_flights(got, criteria, ruleset)
+            if results:
+                break
 
-    if not raw:
-        return []
+    if not results:
+        return [], RESULT_ERROR if _PROVIDERS and failed == len(_PROVIDERS) else RESULT_EMPTY
+    results.sort(key=lambda x: x.get("prix", 10**9))
+    return results, RESULT_ERROR if failed else RESULT_OK
 
-    results: List[Dict[str, Any]] = []
-    for r in raw:
-        f = normalize_flight(r, criteria)
-        if f is None:
-            continue
-        prix_ok = sanitize_price(f.get("prix"))
-        if prix_ok is None:
-            continue
-        f["prix"] = prix_ok
-        results.append(f)
 
-    results.sort(key=lambda x: x.get("prix", 10**9))
-    return results
+def _day_ttl(origin: str, destination: str, date_ymd: str, criteria: Dict[str, Any], vkey: str, result: str) -> int:
+    """TTL d'une entrée DAY: fraîchement calculée (ttl_policy.py)."""
+    score = max(
+        popularity.estimate("day", origin, destination, date_ymd, criteria),
+        popularity.estimate("cal", origin, destination, date_ymd[:7], criteria),
+    )
+    return ttl_policy.day_ttl(days_until(date_ymd), result, score, volatility.volatility(vkey))
+
+
+def _calendar_ttl(month_ym: str) -> int:
+    first = max(dt_date.fromisoformat(month_ym + "-01"), dt_date.today())
+    return ttl_policy.calendar_ttl(days_until(first.isoformat()))
+
+
+def get_day_entry(
+    origin: str,
+    destination: str,
+    date_ymd: str,
+    criteria: Dict[str, Any],
+    sync_calendar: bool = True,
+    refresh: bool = False,
+) -> CacheEntry:
+    """
+    Entrée DAY: du jour (liste normalisée triée par prix), depuis le cache ou les providers.
+    Pipeline unique pour /search, /calendar et les tâches de fond.
+    Sur un appel provider, le jour correspondant d'un calendrier CAL: déjà en cache est
+    réaligné (sync_calendar=False quand c'est build_month lui-même qui appelle).
+    refresh=True : appel provider même si l'entrée est en cache (préchauffage avant expiration ;
+    contenu identique → même version, seul le TTL est prolongé).
+    Appels concurrents sur la même clé : un seul appel provider, les autres attendent son résultat.
+    Requête couverte par une requête plus large en cache : dérivée localement (subsumption.py).
+    Toujours en devise de base (fx.py) : la devise demandée est appliquée à la réponse.
+    """
+    criteria = base_criteria(criteria)
+    # un seul jeu de règles pour la clé et le calcul (rechargement concurrent possible)
+    ruleset = carrier_rules.current
+    dkey = day_key(origin, destination, date_ymd, criteria, ruleset.version)
+    entry = None if refresh else cache.get_entry(dkey)
+    if entry is not None:
+        return entry
+
+    with _inflight_lock:
+        done = _inflight.get(dkey)
+        leader = done is None
+        if leader:
+            done = _inflight[dkey] = threading.Event()
+    if not leader:
+        done.wait(_INFLIGHT_WAIT_S)
+        entry = cache.get_entry(dkey)
+        if entry is not None:
+            return entry
+        # l'appel en cours a échoué ou dépasse l'attente : on tente nous-mêmes
+
+    try:
+        # requête plus large déjà en cache (ex: direct=0 pour direct=1) → filtre local, pas d'appel
+        derived = None if refresh else derive_from_superset(origin, destination, date_ymd, criteria, ruleset.version)
+        if derived is not None:
+            flights, ttl = derived
+            entry = cache.set(dkey, flights, ttl)
+        else:
+            flights, result = _first_non_empty_day_flights(origin, destination, date_ymd, criteria, ruleset)
+            # volatilité suivie hors version des règles (même marché, autres frais)
+            vkey = dkey.rsplit(":r", 1)[0]
+            if result == RESULT_OK:
+                volatility.observe(vkey, flights[0]["prix"])
+            entry = cache.set(dkey, flights, _day_ttl(origin, destination, date_ymd, criteria, vkey, result),
+                              compare=refresh)
+    finally:
+        if leader:
+            with _inflight_lock:
+                _inflight.pop(dkey, None)
+            done.set()
+    if sync_calendar:
+        best = best_offer(entry)
+        update_month_cache_min_if_present(
+            origin, destination, date_ymd, criteria,
+            flights[0]["prix"] if flights else None,
+            best["prix"] if best else None,
+        )
+    return entry
+
+
+def month_days(month_ym: str) -> List[str]:
+    yy, mm = int(month_ym[:4]), int(month_ym[5:7])
+    return [f"{yy}-{_pad2(mm)}-{_pad2(d)}" for d in range(1, _days_in_month(yy, mm) + 1)]
 
 
+def warm_month(
+    origin: str,
+    destination: str,
+    month_ym: str,
+    criteria: Dict[str, Any],
+    allow_fetch: Callable[[], bool],
+    refresh_within: int,
+) -> Tuple[int, int, int]:
+    """
+    Préchauffe les entrées DAY: du mois (absentes ou expirant dans moins de `refresh_within` s)
+    puis recompose CAL: si tous les jours sont en cache (aucun appel provider de plus).
+    `allow_fetch()` est consulté avant chaque appel provider ; refus → arrêt, reste reporté.
+    Renvoie (appels provider, jours frais, jours du mois).
+    """
+    criteria = base_criteria(criteria)
+    days = month_days(month_ym)
+    fetched = fresh = 0
+    for date_key in days:
+        entry = cache.get_entry(day_key(origin, destination, date_key, criteria))
+        if entry is not None and entry.ttl_remaining() > refresh_within:
+            fresh += 1
+            continue
+        if not allow_fetch():
+            break
+        get_day_entry(origin, destination, date_key, criteria, refresh=True)
+        fetched += 1
+        fresh += 1
+    if fresh == len(days):
+        cal = cache.get_entry(cal_key(origin, destination, month_ym, criteria))
+        if fetched or cal is None or cal.ttl_remaining() <= refresh_within:
+            build_month(origin, destination, month_ym, criteria)
+    return fetched, fresh, len(days)
+
+
+@traced("build_month")
 def build_month(
     origin: str,
     destination: str,
@@ -69,6 +234,7 @@ def build_month(
     Construit le calendrier en *itérant sur chaque jour* et en prenant le min issu du provider jour.
     Utilise le cache jour pour éviter la tempête. Aucune valeur synthétique.
     Le contenu mis en cache pour chaque jour est la liste normalisée triée (cohérence /search).
+    "best" = prix du vol au meilleur score prix/durée/escales (front de Pareto du jour).
 
     Compat:
       - accepte month_ym="<YYYY-MM>" (nouveau)
@@ -80,8 +246,7 @@ def build_month(
     if not isinstance(month_ym, str) or len(month_ym) != 7 or month_ym[4] != "-":
         raise ValueError("build_month: paramètre 'month_ym' invalide (attendu 'YYYY-MM').")
 
-    if criteria is None:
-        criteria = {}
+    criteria = base_criteria(criteria or {})
 
     yy = int(month_ym[:4])
     mm = int(month_ym[5:7])
@@ -91,24 +256,22 @@ def build_month(
 
     for d in range(1, nb + 1):
         date_key = f"{yy}-{_pad2(mm)}-{_pad2(d)}"
-        dkey = day_key(origin, destination, date_key, criteria)
-
-        flights: Optional[List[Dict[str, Any]]] = cache.get(dkey)
-        if flights is None:
-            flights = _first_non_empty_day_flights(origin, destination, date_key, criteria)
-            cache.set(dkey, flights, CACHE_TTL_DAY)
+        entry = get_day_entry(origin, destination, date_key, criteria, sync_calendar=False)
+        flights = entry.value
 
         prices = [sanitize_price(f.get("prix")) for f in flights]
         prices = [p for p in prices if p is not None]
         min_price = min(prices) if prices else None
+        best = best_offer(entry)
 
         out[date_key] = {
             "prix": min_price,
             "disponible": bool(prices),
+            "best": best["prix"] if best else None,
         }
 
     ckey = cal_key(origin, destination, month_ym, criteria)
-    cache.set(ckey, out, CACHE_TTL_CALENDAR)
+    cache.set(ckey, out, _calendar_ttl(month_ym), compare=True)
     return out
 
 
@@ -118,6 +281,7 @@ def update_month_cache_min_if_present(
     date: str,      # YYYY-MM-DD
     criteria: Dict[str, Any],
     new_min: Optional[int],
+    new_best: Optional[int] = None,
 ) -> None:
     month = date[:7]
     ckey = cal_key(origin, destination, month, criteria)
@@ -126,7 +290,9 @@ def update_month_cache_min_if_present(
         return
     day = cal.get(date) or {}
     old = day.get("prix")
-    if new_min != old:
-        cal[date] = {"prix": new_min, "disponible": bool(new_min)}
-        cache.set(ckey, cal, CACHE_TTL_CALENDAR)
+    if new_min != old or new_best != day.get("best"):
+        # copie : l'entrée CAL: doit changer de version (ETag) si son contenu change
+        cal = dict(cal)
+        cal[date] = {"prix": new_min, "disponible": bool(new_min), "best": new_best}
+        cache.set(ckey, cal, _calendar_ttl(month))
         log.info("[calendar] CAL cache updated for %s (old=%s, new=%s)", date, old, new_min)
\ No newline at end of file
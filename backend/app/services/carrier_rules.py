@@ -0,0 +1,346 @@
+# backend/app/services/carrier_rules.py
+"""
+Règles compagnies (carriers.rules.json) appliquées côté serveur : frais UM, bagages,
+surcharges marque tarifaire (brandOverrides), tarifs enfants / bébés, remise résident.
+Même calcul que src/rules/applyRules.ts (le proxy Next ne ré-applique plus rien quand
+le backend renvoie déjà `rules`).
+
+- Le JSON est *compilé* au chargement : une table par compagnie (CompiledCarrier), overrides
+  indexés par (dimension, valeur), pourcentages ramenés en fractions.
+  Deux formats acceptés : { "version", "carriers": { "AF": {...} } } ou { "AF": {...} } ;
+  pourcentages en % (75) ou en fraction (0.75).
+- apply_rules() traite une liste de vols en une passe : tout ce qui ne dépend que des critères
+  est calculé une fois, les frais par (compagnie, segments) une fois par couple.
+- Rechargement à chaud : le fichier est relu s'il a changé (tâche de fond) et le RuleSet
+  remplacé d'un bloc (échange de référence) ; un JSON invalide garde l'ancien jeu.
+- RuleSet.version entre dans les clés DAY:/CAL: : une modification des règles ne sert jamais
+  de prix calculés avec les anciennes.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ..core.config import settings
+
+log = logging.getLogger(__name__)
+
+
+def _js_round(x: float) -> int:
+    # Math.round de applyRules.ts (0.5 → vers le haut), pas l'arrondi bancaire de round()
+    return int(math.floor(x + 0.5))
+
+
+def _clamp(n: float, lo: float, hi: float) -> float:
+    return max(lo, min(hi, n))
+
+
+def _fraction(v: Any, default: float) -> float:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return default
+    return f / 100.0 if f > 1.5 else f
+
+
+@dataclass(frozen=True)
+class CompiledCarrier:
+    um_mandatory_until: int = 12
+    um_allowed_until: int = 16
+    um_fee: int = 50
+    um_fee_per_segment: bool = True
+    cabin_included: int = 1
+    hold_included: int = 0
+    cabin_fee: int = 20
+    hold_fee: int = 30
+    bag_per_segment: bool = True
+    # ("fareType" | "cabin", valeur) → (cabine incluse, soute incluse) ; None = inchangé
+    overrides: Dict[Tuple[str, str], Tuple[Optional[int], Optional[int]]] = field(default_factory=dict)
+    child_pct: float = 0.75
+    infant_no_seat_pct: float = 0.1
+    infant_seat_pct: float = 0.75
+
+
+DEFAULT_CARRIER = CompiledCarrier()
+
+
+def _or(v: Any, default: Any) -> Any:
+    # opérateur `??` de applyRules.ts : seul null/undefined prend la valeur par défaut (0 est gardé)
+    return default if v is None else v
+
+
+def _num(v: Any) -> bool:
+    # `typeof v === "number"`
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _compile_carrier(raw: Mapping[str, Any]) -> CompiledCarrier:
+    """
+    Mêmes valeurs par défaut que applyRules.ts : un bloc absent (um, baggage, childPricing)
+    prend le bloc par défaut complet ; un bloc présent garde ses champs, les champs absents
+    valent `?? x` champ par champ (ex: um présent sans fee → frais 0, baggage sans perSegment → False).
+    """
+    d = DEFAULT_CARRIER
+    um = raw.get("um")
+    bag = raw.get("baggage")
+    child = raw.get("childPricing")
+    um = um if isinstance(um, dict) else {
+        "mandatoryUntilAge": d.um_mandatory_until, "allowedUntilAge": d.um_allowed_until,
+        "fee": {"fixed": d.um_fee, "perSegment": d.um_fee_per_segment},
+    }
+    bag = bag if isinstance(bag, dict) else {
+        "cabinIncluded": d.cabin_included, "holdIncluded": d.hold_included,
+        "cabinFee": d.cabin_fee, "holdFee": d.hold_fee, "perSegment": d.bag_per_segment,
+    }
+    child = child if isinstance(child, dict) else {}
+    fee = um.get("fee") if isinstance(um.get("fee"), dict) else {}
+
+    overrides: Dict[Tuple[str, str], Tuple[Optional[int], Optional[int]]] = {}
+    for key, ov in (bag.get("brandOverrides") or {}).items():
+        inc = (
+            ov.get("cabinIncluded") if _num(ov.get("cabinIncluded")) else None,
+            ov.get("holdIncluded") if _num(ov.get("holdIncluded")) else None,
+        )
+        dim, sep, value = str(key).partition("=")
+        if sep:
+            overrides[(dim, value.lower())] = inc
+        else:
+            # clé nue ("flex", "business") : testée sur fareType puis sur cabin (cf. applyRules.ts)
+            overrides.setdefault(("fareType", dim.lower()), inc)
+            overrides.setdefault(("cabin", dim.lower()), inc)
+
+    mandatory = max(0, int(_or(um.get("mandatoryUntilAge"), 0)))
+    return CompiledCarrier(
+        um_mandatory_until=mandatory,
+        um_allowed_until=max(mandatory, int(_or(um.get("allowedUntilAge"), mandatory))),
+        um_fee=_js_round(max(0, _or(fee.get("fixed"), 0))),
+        um_fee_per_segment=bool(fee.get("perSegment")),
+        cabin_included=_or(bag.get("cabinIncluded"), d.cabin_included),
+        hold_included=_or(bag.get("holdIncluded"), d.hold_included),
+        cabin_fee=_js_round(max(0, _or(bag.get("cabinFee"), d.cabin_fee))),
+        hold_fee=_js_round(max(0, _or(bag.get("holdFee"), d.hold_fee))),
+        bag_per_segment=bool(bag.get("perSegment")),
+        overrides=overrides,
+        child_pct=_clamp(_fraction(child.get("childPercentOfAdult"), d.child_pct), 0, 1.5),
+        infant_no_seat_pct=_clamp(_fraction(child.get("infantNoSeatPercent"), d.infant_no_seat_pct), 0, 1.0),
+        infant_seat_pct=_clamp(_fraction(child.get("infantSeatPercent"), d.infant_seat_pct), 0, 1.5),
+    )
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    version: str
+    carriers: Dict[str, CompiledCarrier]
+
+    def carrier(self, code: Optional[str]) -> CompiledCarrier:
+        return self.carriers.get((code or "").upper(), DEFAULT_CARRIER)
+
+
+EMPTY_RULES = RuleSet(version="0", carriers={})
+
+
+def compile_rules(raw: Mapping[str, Any], content: bytes = b"") -> RuleSet:
+    table = raw.get("carriers") if isinstance(raw.get("carriers"), dict) else raw
+    carriers = {
+        str(code).upper(): _compile_carrier(spec)
+        for code, spec in table.items()
+        if isinstance(spec, dict) and not str(code).startswith("$")
+    }
+    digest = hashlib.sha1(content or json.dumps(raw, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    return RuleSet(version=f"{raw.get('version', 0)}.{digest}", carriers=carriers)
+
+
+class CarrierRules:
+    """Jeu de règles courant + rechargement à chaud du fichier."""
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = Path(path) if path else None
+        self._current = EMPTY_RULES
+        self._stamp: Optional[Tuple[float, int]] = None
+        self._lock = threading.Lock()
+        self.reload_if_changed()
+
+    @property
+    def current(self) -> RuleSet:
+        return self._current
+
+    @property
+    def loaded(self) -> bool:
+        """False tant qu'aucun fichier valide n'a été lu (démarrage refusé, cf. main.py)."""
+        return self._current is not EMPTY_RULES
+
+    def reload_if_changed(self) -> bool:
+        """Relit le fichier si (mtime, taille) a changé ; True si le jeu a été remplacé."""
+        if self.path is None:
+            return False
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                if self._stamp is not None:
+                    log.warning("[rules] %s introuvable, règles conservées", self.path)
+                else:
+                    log.error("[rules] %s introuvable, aucune règle compagnie", self.path)
+                self._stamp = None
+                return False
+            stamp = (st.st_mtime, st.st_size)
+            if stamp == self._stamp:
+                return False
+            try:
+                content = self.path.read_bytes()
+                ruleset = compile_rules(json.loads(content), content)
+            except Exception as e:
+                log.error("[rules] %s invalide, règles conservées: %s", self.path, e)
+                self._stamp = stamp
+                return False
+            self._stamp = stamp
+            changed = ruleset.version != self._current.version
+            self._current = ruleset
+        if changed:
+            log.info("[rules] règles compagnies v%s (%d compagnies)", ruleset.version, len(ruleset.carriers))
+        return changed
+
+
+def _default_path() -> str:
+    # backend/carriers.rules.json : même contenu que src/rules/carriers.rules.json (proxy Next),
+    # livré avec le backend (l'image Docker ne contient que backend/)
+    return str(Path(__file__).resolve().parents[2] / "carriers.rules.json")
+
+
+carrier_rules = CarrierRules(settings.CARRIER_RULES_PATH or _default_path())
+
+
+def rules_version() -> str:
+    return carrier_rules.current.version
+
+
+def _csv_ints(v: Any) -> List[int]:
+    if isinstance(v, (list, tuple)):
+        items = v
+    else:
+        items = [p for p in str(v or "").split(",") if p.strip()]
+    out = []
+    for p in items:
+        try:
+            out.append(int(p))
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+def _segments(f: Mapping[str, Any]) -> int:
+    stops = f.get("escales")
+    return int(_clamp(stops + 1 if isinstance(stops, int) else 1, 1, 20))
+
+
+def apply_rules(
+    flights: Sequence[Dict[str, Any]],
+    criteria: Mapping[str, Any],
+    ruleset: Optional[RuleSet] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Prix total voyageurs + frais de la compagnie pour chaque vol (prix provider = tarif adulte).
+    Ajoute prix_base, currency et rules { surcharges, warnings, eligible, reasons } ;
+    les vols inéligibles (UM obligatoire non demandé) sont retirés, comme le faisait le proxy.
+    Aucune règle chargée : prix adulte inchangé et pas de `rules` (le proxy applique les siennes).
+    """
+    ruleset = ruleset or carrier_rules.current
+    if ruleset is EMPTY_RULES:
+        return [dict(f, prix_base=f["prix"]) for f in flights]
+
+    # --- ne dépend que des critères : une fois pour toute la liste ---
+    adults = int(_clamp(int(criteria.get("adults") or 1), 1, 9))
+    children = [a for a in _csv_ints(criteria.get("childrenAges")) if 2 <= a <= 11]
+    infants = int(_clamp(int(criteria.get("infants") or 0), 0, 3))
+    fare_type = str(criteria.get("fareType") or "").lower()
+    cabin = str(criteria.get("cabin") or "eco").lower()
+    bags_cabin = int(_clamp(int(criteria.get("bagsCabin") or 0), 0, 2))
+    bags_hold = int(_clamp(int(criteria.get("bagsSoute") or 0), 0, 2))
+    resident = bool(int(criteria.get("resident") or 0))
+    wants_um = bool(int(criteria.get("um") or 0))
+    currency = str(criteria.get("currency") or "EUR").upper()
+    pax = adults + len(children)  # bébés sans siège : pas de bagage
+    youngest = min(children) if children else None
+
+    # --- par (compagnie, segments) : frais fixes, éligibilité ---
+    fees: Dict[Tuple[str, int], Tuple[int, List[Dict[str, Any]], List[str], Optional[str]]] = {}
+
+    def carrier_fees(code: str, segments: int):
+        c = ruleset.carrier(code)
+        inc_cabin, inc_hold = c.cabin_included, c.hold_included
+        ov = c.overrides.get(("fareType", fare_type)) or c.overrides.get(("cabin", cabin))
+        if ov:
+            inc_cabin = inc_cabin if ov[0] is None else ov[0]
+            inc_hold = inc_hold if ov[1] is None else ov[1]
+        times = segments if c.bag_per_segment else 1
+        surcharges: List[Dict[str, Any]] = []
+        warnings: List[str] = []
+        extra = 0
+        extra_cabin = max(0, pax * bags_cabin - pax * max(0, inc_cabin))
+        if extra_cabin:
+            amount = c.cabin_fee * extra_cabin * times
+            extra += amount
+            surcharges.append({"code": "BAG_CABIN", "label": "Bagages cabine sup.", "amount": amount})
+        extra_hold = max(0, pax * bags_hold - pax * max(0, inc_hold))
+        if extra_hold:
+            amount = c.hold_fee * extra_hold * times
+            extra += amount
+            surcharges.append({"code": "BAG_HOLD", "label": "Bagages soute sup.", "amount": amount})
+        if wants_um:
+            if not children:
+                warnings.append("UM demandé mais aucun enfant éligible détecté.")
+            if c.um_fee > 0:
+                amount = c.um_fee * (segments if c.um_fee_per_segment else 1)
+                extra += amount
+                surcharges.append({"code": "UM", "label": "Service UM", "amount": amount})
+        reason = None
+        if youngest is not None and youngest < c.um_mandatory_until and not wants_um:
+            reason = f"UM obligatoire jusqu'à {c.um_mandatory_until} ans sur {code or '?'}, cochez l’option UM."
+        return extra, surcharges, warnings, reason
+
+    out: List[Dict[str, Any]] = []
+    for f in flights:
+        # compagnie inconnue du provider : "AF", comme le proxy Next avant applyRules.ts
+        code = str(f.get("compagnie") or "AF").upper()
+        segments = _segments(f)
+        k = (code, segments)
+        cf = fees.get(k)
+        if cf is None:
+            cf = fees[k] = carrier_fees(code, segments)
+        extra, bag_um, warnings, reason = cf
+        if reason is not None:
+            continue
+
+        c = ruleset.carrier(code)
+        base = f["prix"]
+        total = adults * base
+        surcharges: List[Dict[str, Any]] = []
+        if children:
+            amount = len(children) * _js_round(base * c.child_pct)
+            total += amount
+            surcharges.append({"code": "CHILD_ADJ", "label": "Tarif enfants", "amount": amount})
+        if infants:
+            amount = infants * _js_round(base * c.infant_no_seat_pct)
+            total += amount
+            surcharges.append({"code": "INFANT_ADJ", "label": "Tarif bébés", "amount": amount})
+        total += extra
+        surcharges.extend(bag_um)
+        if resident:
+            discount = -_js_round(total * 0.1)
+            total += discount
+            surcharges.append({"code": "RESIDENT_DISCOUNT", "label": "Réduction résident", "amount": discount})
+
+        g = dict(f)
+        g["prix_base"] = base
+        g["prix"] = max(0, _js_round(total))
+        g["currency"] = currency
+        g["rules"] = {"surcharges": surcharges, "warnings": list(warnings), "eligible": True, "reasons": []}
+        out.append(g)
+    return out
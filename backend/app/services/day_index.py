@@ -0,0 +1,174 @@
+# backend/app/services/day_index.py
+"""
+Index secondaires sur la liste normalisée d'un jour (entrée DAY: du cache).
+
+Chaque vol est un bit (son rang dans la liste). Pour chaque dimension numérique on garde
+les valeurs triées + les masques préfixes : une plage [lo, hi] se résout par deux bisect
+et un XOR d'entiers, sans parcourir les vols. Les compagnies sont des masques directs.
+Un filtre complet = intersection de masques (quelques microsecondes).
+
+L'index est construit une seule fois par version d'entrée (CacheEntry.derive("index", …)).
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute_of_day(iso: Any) -> Optional[int]:
+    # "2025-09-06T07:25:00.000Z" → 445
+    try:
+        return int(iso[11:13]) * 60 + int(iso[14:16])
+    except Exception:
+        return None
+
+
+def parse_hhmm(s: Optional[str]) -> Optional[int]:
+    """'07:30' | '7:30' | '0730' → minutes depuis minuit ; ValueError si invalide."""
+    if s is None or not str(s).strip():
+        return None
+    txt = str(s).strip()
+    if ":" in txt:
+        h, _, m = txt.partition(":")
+    elif len(txt) in (3, 4) and txt.isdigit():
+        h, m = txt[:-2], txt[-2:]
+    else:
+        raise ValueError(f"heure invalide: {s!r} (attendu HH:MM)")
+    hh, mm = int(h), int(m)
+    if not (0 <= hh <= 24 and 0 <= mm < 60) or hh * 60 + mm > MINUTES_PER_DAY:
+        raise ValueError(f"heure invalide: {s!r} (attendu HH:MM)")
+    return hh * 60 + mm
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Rangs des bits à 1, par ordre croissant."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@dataclass(frozen=True)
+class DayFilters:
+    """Filtres fins de /search (None = pas de contrainte). Heures en minutes depuis minuit."""
+    dep_from: Optional[int] = None
+    dep_to: Optional[int] = None
+    arr_from: Optional[int] = None
+    arr_to: Optional[int] = None
+    carriers: FrozenSet[str] = frozenset()
+    exclude_carriers: FrozenSet[str] = frozenset()
+    max_stops: Optional[int] = None
+    max_duration: Optional[int] = None
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+
+    def is_empty(self) -> bool:
+        return self == _NO_FILTERS
+
+    def cache_token(self) -> str:
+        """Représentation courte et stable (liée aux curseurs de pagination)."""
+        parts = [
+            self.dep_from, self.dep_to, self.arr_from, self.arr_to,
+            ",".join(sorted(self.carriers)), ",".join(sorted(self.exclude_carriers)),
+            self.max_stops, self.max_duration, self.min_price, self.max_price,
+        ]
+        return "|".join("" if p is None else str(p) for p in parts)
+
+
+_NO_FILTERS = DayFilters()
+
+
+def parse_carriers(csv: Optional[str]) -> FrozenSet[str]:
+    if not csv:
+        return frozenset()
+    return frozenset(c.strip().upper() for c in csv.split(",") if c.strip())
+
+
+class _RangeIndex:
+    """Valeurs triées + masques préfixes : plage de valeurs → masque en O(log n)."""
+    __slots__ = ("values", "prefix")
+
+    def __init__(self, pairs: Sequence[Tuple[int, int]]) -> None:
+        ordered = sorted(pairs)
+        self.values: List[int] = [v for v, _ in ordered]
+        self.prefix: List[int] = [0]
+        acc = 0
+        for _, rank in ordered:
+            acc |= 1 << rank
+            self.prefix.append(acc)
+
+    def between(self, lo: Optional[int], hi: Optional[int]) -> int:
+        i = bisect_left(self.values, lo) if lo is not None else 0
+        j = bisect_right(self.values, hi) if hi is not None else len(self.values)
+        if j <= i:
+            return 0
+        return self.prefix[j] ^ self.prefix[i]
+
+
+class DayIndex:
+    """Index secondaires d'une liste jour (voir docstring du module)."""
+
+    def __init__(self, flights: Sequence[Dict[str, Any]]) -> None:
+        self.size = len(flights)
+        self.all = (1 << self.size) - 1
+
+        dep: List[Tuple[int, int]] = []
+        arr: List[Tuple[int, int]] = []
+        dur: List[Tuple[int, int]] = []
+        stops: List[Tuple[int, int]] = []
+        price: List[Tuple[int, int]] = []
+        self.by_carrier: Dict[str, int] = {}
+
+        for i, f in enumerate(flights):
+            d = _minute_of_day(f.get("departISO"))
+            if d is not None:
+                dep.append((d, i))
+            a = _minute_of_day(f.get("arriveeISO"))
+            if a is not None:
+                arr.append((a, i))
+            if isinstance(f.get("duree_minutes"), int):
+                dur.append((f["duree_minutes"], i))
+            if isinstance(f.get("escales"), int):
+                stops.append((f["escales"], i))
+            if isinstance(f.get("prix"), int):
+                price.append((f["prix"], i))
+            code = str(f.get("compagnie") or "").upper()
+            self.by_carrier[code] = self.by_carrier.get(code, 0) | (1 << i)
+
+        self.departure = _RangeIndex(dep)
+        self.arrival = _RangeIndex(arr)
+        self.duration = _RangeIndex(dur)
+        self.stops = _RangeIndex(stops)
+        self.price = _RangeIndex(price)
+
+    @staticmethod
+    def _window(idx: _RangeIndex, lo: Optional[int], hi: Optional[int]) -> int:
+        # fenêtre horaire ; lo > hi = fenêtre qui passe minuit (ex: 22:00 → 02:00)
+        if lo is not None and hi is not None and lo > hi:
+            return idx.between(lo, None) | idx.between(None, hi)
+        return idx.between(lo, hi)
+
+    def select(self, f: DayFilters) -> int:
+        """Masque des vols qui satisfont tous les filtres."""
+        mask = self.all
+        if f.dep_from is not None or f.dep_to is not None:
+            mask &= self._window(self.departure, f.dep_from, f.dep_to)
+        if f.arr_from is not None or f.arr_to is not None:
+            mask &= self._window(self.arrival, f.arr_from, f.arr_to)
+        if f.max_duration is not None:
+            mask &= self.duration.between(None, f.max_duration)
+        if f.max_stops is not None:
+            mask &= self.stops.between(None, f.max_stops)
+        if f.min_price is not None or f.max_price is not None:
+            mask &= self.price.between(f.min_price, f.max_price)
+        if f.carriers:
+            inc = 0
+            for c in f.carriers:
+                inc |= self.by_carrier.get(c, 0)
+            mask &= inc
+        for c in f.exclude_carriers:
+            mask &= ~self.by_carrier.get(c, 0)
+        return mask
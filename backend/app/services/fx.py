@@ -0,0 +1,155 @@
+# backend/app/services/fx.py
+"""
+Conversion de devises locale : les offres sont demandées aux providers et mises en cache
+dans la devise de base (FX_BASE_CURRENCY) ; la devise demandée n'est appliquée qu'à la
+réponse, sur la page servie. Changer de devise ne coûte donc aucun appel provider.
+
+Table de taux = fichier JSON { "base", "asOf", "rates": { "GBP": 0.866, ... } }
+(taux = unités de devise pour 1 unité de base), relu à chaud s'il change (tâche de fond).
+Sa version est renvoyée avec les réponses converties et entre dans leur ETag.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ..core.config import settings
+from .normalize import Criteria
+
+log = logging.getLogger(__name__)
+
+BASE_CURRENCY = settings.FX_BASE_CURRENCY.upper()
+
+
+@dataclass(frozen=True)
+class FxTable:
+    base: str
+    rates: Dict[str, float]
+    version: str
+
+    def rate(self, currency: str) -> Optional[float]:
+        return 1.0 if currency == self.base else self.rates.get(currency)
+
+
+IDENTITY = FxTable(base=BASE_CURRENCY, rates={BASE_CURRENCY: 1.0}, version="0")
+
+
+class FxRates:
+    """Table courante + rechargement à chaud du fichier (échange de référence)."""
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = Path(path) if path else None
+        self._current = IDENTITY
+        self._stamp: Optional[Tuple[float, int]] = None
+        self._lock = threading.Lock()
+        self.reload_if_changed()
+
+    @property
+    def current(self) -> FxTable:
+        return self._current
+
+    def reload_if_changed(self) -> bool:
+        if self.path is None:
+            return False
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                log.warning("[fx] %s introuvable, conversions limitées à %s", self.path, BASE_CURRENCY)
+                return False
+            stamp = (st.st_mtime, st.st_size)
+            if stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            try:
+                content = self.path.read_bytes()
+                raw = json.loads(content)
+                if str(raw.get("base", "")).upper() != BASE_CURRENCY:
+                    raise ValueError(f"base {raw.get('base')!r} != {BASE_CURRENCY}")
+                rates = {str(k).upper(): float(v) for k, v in (raw.get("rates") or {}).items() if float(v) > 0}
+            except Exception as e:
+                log.error("[fx] %s invalide, taux conservés: %s", self.path, e)
+                return False
+            rates[BASE_CURRENCY] = 1.0
+            version = f"{raw.get('asOf', '')}.{hashlib.sha1(content).hexdigest()[:8]}"
+            self._current = FxTable(base=BASE_CURRENCY, rates=rates, version=version)
+        log.info("[fx] taux v%s (%d devises)", version, len(rates))
+        return True
+
+
+def _default_path() -> str:
+    return str(Path(__file__).resolve().parents[2] / "fx_rates.json")
+
+
+fx_rates = FxRates(settings.FX_RATES_PATH or _default_path())
+
+
+def resolve(currency: Optional[str]) -> Tuple[str, FxTable, float]:
+    """(devise, table courante, taux) d'une devise demandée ; ValueError si non supportée."""
+    table = fx_rates.current
+    cur = (currency or table.base).strip().upper()
+    rate = table.rate(cur)
+    if rate is None:
+        raise ValueError(f"devise {cur!r} non supportée ({', '.join(sorted(table.rates))})")
+    return cur, table, rate
+
+
+def base_criteria(criteria: Mapping[str, Any]) -> Criteria:
+    """
+    Critères ramenés à la devise de base (ce qui est demandé aux providers et mis en cache),
+    toujours en Criteria interné : les appelants peuvent passer un dict simple.
+    """
+    base = Criteria(criteria)
+    if str(base.get("currency") or BASE_CURRENCY).upper() == BASE_CURRENCY:
+        return base
+    return base.replace(currency=BASE_CURRENCY)
+
+
+def _round(x: float) -> int:
+    return int(math.floor(x + 0.5))
+
+
+def convert_amount(amount: Optional[int], rate: float) -> Optional[int]:
+    return None if amount is None else _round(amount * rate)
+
+
+def convert_flights(flights: Sequence[Dict[str, Any]], currency: str, rate: float) -> List[Dict[str, Any]]:
+    """Copie convertie d'une page de vols (prix, prix_base, montants des surcharges)."""
+    out: List[Dict[str, Any]] = []
+    for f in flights:
+        g = dict(f)
+        g["prix"] = _round(f["prix"] * rate)
+        if f.get("prix_base") is not None:
+            g["prix_base"] = _round(f["prix_base"] * rate)
+        g["currency"] = currency
+        rules = f.get("rules")
+        if rules and rules.get("surcharges"):
+            g["rules"] = dict(rules, surcharges=[dict(s, amount=_round(s["amount"] * rate)) for s in rules["surcharges"]])
+        out.append(g)
+    return out
+
+
+def convert_calendar(calendar: Mapping[str, Dict[str, Any]], rate: float) -> Dict[str, Dict[str, Any]]:
+    return {
+        day: dict(d, prix=convert_amount(d.get("prix"), rate), best=convert_amount(d.get("best"), rate))
+        for day, d in calendar.items()
+    }
+
+
+def to_base_bounds(lo: Optional[int], hi: Optional[int], rate: float) -> Tuple[Optional[int], Optional[int]]:
+    """Bornes de prix exprimées dans la devise demandée → bornes en devise de base (prix entiers)."""
+    return (
+        None if lo is None else math.ceil((lo - 0.5) / rate),
+        None if hi is None else math.floor((hi + 0.5) / rate),
+    )
+
+
+def fx_info(currency: str, table: FxTable) -> Dict[str, Any]:
+    return {"base": table.base, "currency": currency, "rate": table.rate(currency), "version": table.version}
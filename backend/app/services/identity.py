@@ -0,0 +1,162 @@
+# backend/app/services/identity.py
+"""
+Cache process-local email → identité (user id + profils + snapshot du profil par défaut).
+
+Les endpoints authentifiés (profiles, users, quote) n'ont besoin, dans le cas courant, que
+de ces informations : sur un HIT aucune requête SQL n'est faite.
+- TTL (settings.IDENTITY_CACHE_TTL) : borne la péremption entre workers, chaque process
+  ayant son propre cache ;
+- invalidation explicite par les handlers qui écrivent des profils (create/update/delete/default).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from time import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.user import User
+from ..models.traveler_profile import TravelerProfile
+
+log = logging.getLogger(__name__)
+
+
+def as_dict(v: Any) -> Dict[str, Any]:
+    """Normalize db JSON fields that might come back as str/None."""
+    if v is None:
+        return {}
+    if isinstance(v, dict):
+        return v
+    if isinstance(v, str):
+        try:
+            return json.loads(v)
+        except Exception:
+            return {}
+    return {}
+
+
+@dataclass(frozen=True)
+class ProfileSnapshot:
+    """Champs du profil utiles au pricing, figés (clé de mémoïsation avec la version)."""
+    version: str
+    student: bool = False
+    youth: bool = False
+    senior: bool = False
+    has_disability: bool = False
+    checked_bags: int = 0
+    cabin_bags: int = 0
+    pet_type: Optional[str] = None
+    has_discount_cards: bool = False
+
+
+NO_PROFILE = ProfileSnapshot(version="-")
+
+
+def snapshot_profile(prof: Optional[TravelerProfile]) -> ProfileSnapshot:
+    """Lit le profil (et re-parse ses colonnes JSON) une seule fois."""
+    if prof is None:
+        return NO_PROFILE
+    baggage = as_dict(getattr(prof, "baggage", None))
+    pet = as_dict(getattr(prof, "pet", None))
+    updated_at = getattr(prof, "updated_at", None)
+    return ProfileSnapshot(
+        version=f"{prof.id}@{updated_at.isoformat() if updated_at else ''}",
+        student=bool(getattr(prof, "student", False)),
+        youth=bool(getattr(prof, "youth", False)),
+        senior=bool(getattr(prof, "senior", False)),
+        has_disability=bool(getattr(prof, "has_disability", False)),
+        checked_bags=int(baggage.get("checked") or 0),
+        cabin_bags=int(baggage.get("cabin") or 0),
+        pet_type=pet.get("type"),
+        has_discount_cards=bool(getattr(prof, "discount_cards", None) or []),
+    )
+
+
+@dataclass(frozen=True)
+class Identity:
+    user_id: str
+    email: str
+    # (id, label, default_for_search), par created_at croissant
+    profiles: Tuple[Tuple[str, str, bool], ...]
+    default_profile: ProfileSnapshot
+
+
+class IdentityCache:
+    def __init__(self, ttl: int) -> None:
+        self.ttl = ttl
+        self._store: Dict[str, Tuple[Identity, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> Optional[Identity]:
+        with self._lock:
+            hit = self._store.get(email)
+            if hit is None:
+                return None
+            ident, expires_at = hit
+            if expires_at < time():
+                self._store.pop(email, None)
+                return None
+            return ident
+
+    def put(self, ident: Identity) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._store[ident.email] = (ident, time() + self.ttl)
+
+    def invalidate(self, email: str) -> None:
+        with self._lock:
+            self._store.pop(email, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+identities = IdentityCache(settings.IDENTITY_CACHE_TTL)
+
+
+async def _load(db: AsyncSession, email: str) -> Identity:
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
+    if not user:
+        # création "à la volée" si le user n'existe pas encore
+        user = User(email=email)
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+
+    profs = (
+        await db.execute(
+            select(TravelerProfile)
+            .where(TravelerProfile.user_id == user.id)
+            .order_by(TravelerProfile.created_at.asc())
+        )
+    ).scalars().all()
+    # Default profile (first created or explicit default)
+    default = next((p for p in profs if p.default_for_search), None)
+    return Identity(
+        user_id=user.id,
+        email=email,
+        profiles=tuple((p.id, p.label, bool(p.default_for_search)) for p in profs),
+        default_profile=snapshot_profile(default),
+    )
+
+
+async def get_identity(db: AsyncSession, email: str) -> Identity:
+    """Identité de l'utilisateur (auto-provisionné si besoin), servie depuis le cache si possible."""
+    ident = identities.get(email)
+    if ident is None:
+        ident = await _load(db, email)
+        identities.put(ident)
+    return ident
+
+
+def invalidate_identity(email: str) -> None:
+    """À appeler après toute écriture sur les profils de cet utilisateur."""
+    identities.invalidate(email)
@@ -0,0 +1,105 @@
+# backend/app/services/memory.py
+"""
+Rapport mémoire pour /api/admin/memory.
+
+- cache : taille profonde des entrées (valeur + vues dérivées : tris, index…) regroupée par
+  préfixe de clé (ex: profondeur 3 → "DAY:PAR:BCN"). Objets partagés (critères internés,
+  chaînes) comptés une seule fois, sur la première entrée qui les atteint.
+- tracemalloc : mémoire suivie par l'allocateur, principaux sites d'allocation, et croissance
+  depuis l'instantané précédent ; la part non attribuée au cache = suivie − cache.
+  tracemalloc démarre au premier appel (start=1) ou au lancement (TRACEMALLOC_FRAMES > 0) :
+  seules les allocations postérieures sont vues.
+"""
+from __future__ import annotations
+
+import gc
+import sys
+import threading
+import tracemalloc
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .cache import InMemoryCache
+
+_SKIP = (type, ModuleType, FunctionType, BuiltinFunctionType)
+
+_previous: Optional[tracemalloc.Snapshot] = None
+_lock = threading.Lock()
+
+
+def deep_size(obj: Any, seen: Set[int]) -> int:
+    """Octets atteignables depuis `obj` (gc.get_referents), hors objets déjà vus dans `seen`."""
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _SKIP):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        stack.extend(gc.get_referents(o))
+    return total
+
+
+def cache_by_prefix(cache: InMemoryCache, depth: int = 3, top: int = 20) -> Tuple[int, List[Dict[str, Any]]]:
+    """(octets totaux du cache, `top` préfixes les plus lourds) ; le total couvre tous les préfixes."""
+    groups: Dict[str, List[int]] = {}  # préfixe → [entrées, octets]
+    seen: Set[int] = set()
+    for key, entry in cache.entries():
+        prefix = ":".join(key.split(":")[:max(1, depth)])
+        g = groups.setdefault(prefix, [0, 0])
+        g[0] += 1
+        g[1] += sys.getsizeof(key) + deep_size(entry, seen)
+    total = sum(b for _, b in groups.values())
+    ranked = sorted(groups.items(), key=lambda kv: -kv[1][1])[:top]
+    return total, [{"prefix": p, "entries": n, "bytes": b} for p, (n, b) in ranked]
+
+
+def tracemalloc_report(start: bool, frames: int, top: int = 20) -> Dict[str, Any]:
+    global _previous
+    if not tracemalloc.is_tracing():
+        if not start:
+            return {"tracing": False}
+        tracemalloc.start(max(1, frames))
+        return {"tracing": True, "started": True}
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    with _lock:
+        previous, _previous = _previous, snapshot
+
+    def fmt(stat: Any) -> Dict[str, Any]:
+        frame = stat.traceback[0]
+        out = {"site": f"{frame.filename}:{frame.lineno}", "bytes": stat.size, "count": stat.count}
+        if hasattr(stat, "size_diff"):
+            out["bytesDiff"] = stat.size_diff
+        return out
+
+    report: Dict[str, Any] = {
+        "tracing": True,
+        "tracedBytes": current,
+        "peakBytes": peak,
+        "top": [fmt(s) for s in snapshot.statistics("lineno")[:top]],
+    }
+    if previous is not None:
+        report["growth"] = [fmt(s) for s in snapshot.compare_to(previous, "lineno")[:top] if s.size_diff > 0]
+    return report
+
+
+def memory_report(cache: InMemoryCache, depth: int, top: int, start: bool, frames: int) -> Dict[str, Any]:
+    total, by_prefix = cache_by_prefix(cache, depth, top)
+    report = {
+        "cache": {
+            "entries": len(cache.entries()),
+            "bytes": total,
+            "byPrefix": by_prefix,
+        },
+        "tracemalloc": tracemalloc_report(start, frames, top),
+    }
+    traced = report["tracemalloc"].get("tracedBytes")
+    if traced is not None:
+        report["tracemalloc"]["unattributedBytes"] = max(0, traced - report["cache"]["bytes"])
+    return report
@@ -3,10 +3,98 @@ from __future__ import annotations
 
 import hashlib
 import json
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+from ..core.tracing import traced
+from rules import ELIG_PETS, ELIG_UM, carrier_mask  # backend/rules.py
+
+T = TypeVar("T")
 
 # ---------- Criteria ----------
 
+_SCALARS = (str, int, float, bool, type(None))
+
+class Criteria(Mapping[str, Any]):
+    """
+    Critères normalisés *immuables* et *internés* : deux critères égaux partagent le même objet.
+    - forme canonique (JSON trié) et digest sha1 calculés une seule fois, à la création ;
+    - projections propres à chaque provider (seed dummy, paramètres Amadeus…) mémoïsées
+      sur l'instance via project().
+    S'utilise comme un dict en lecture seule (get, [], items…).
+    """
+    __slots__ = ("_data", "canonical", "digest", "_projections", "__weakref__")
+
+    _interned: "weakref.WeakValueDictionary[Any, Criteria]" = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __new__(cls, data: Mapping[str, Any]) -> "Criteria":
+        if isinstance(data, Criteria):
+            return data
+        items = dict(data)
+        ikey: Any = None
+        canonical = None
+        if all(type(v) in _SCALARS for v in items.values()):
+            # type compris : 1, True et 1.0 sont égaux en Python mais pas en JSON (digest)
+            ikey = tuple(sorted((k, type(v), v) for k, v in items.items()))
+        else:
+            # listes, tuples… : on interne sur la forme canonique
+            canonical = json.dumps(items, sort_keys=True, separators=(",", ":"))
+            ikey = canonical
+        with cls._lock:
+            found = cls._interned.get(ikey)
+            if found is not None:
+                return found
+            self = super().__new__(cls)
+            self._data = items
+            self.canonical = canonical or json.dumps(items, sort_keys=True, separators=(",", ":"))
+            self.digest = hashlib.sha1(self.canonical.encode("utf-8")).hexdigest()
+            self._projections = {}
+            cls._interned[ikey] = self
+            return self
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, Criteria):
+            return self.digest == other.digest
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return f"Criteria({self._data!r})"
+
+    def project(self, name: str, build: Callable[["Criteria"], T]) -> T:
+        """Projection mémoïsée (calculée au 1er appel pour ce nom, réutilisée ensuite)."""
+        try:
+            return self._projections[name]
+        except KeyError:
+            value = build(self)
+            self._projections[name] = value
+            return value
+
+    def replace(self, **changes: Any) -> "Criteria":
+        """Copie (internée) avec certains champs remplacés."""
+        data = dict(self._data)
+        data.update(changes)
+        return Criteria(data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._data)
+
+
 def _parse_csv_ints(s: Any) -> List[int]:
     if not s:
         return []
@@ -28,10 +116,11 @@ def _parse_csv_ints(s: Any) -> List[int]:
     return out
 
 
-def normalize_criteria(q: Dict[str, Any]) -> Dict[str, Any]:
+@traced("criteria")
+def normalize_criteria(q: Dict[str, Any]) -> Criteria:
     """
     Normalise/valide tous les critères supportés par le backend.
-    Retourne un dict stable (utilisé pour le hash du cache).
+    Retourne un Criteria interné (hash du cache pré-calculé).
     """
     out: Dict[str, Any] = {}
 
@@ -89,13 +178,24 @@ def normalize_criteria(q: Dict[str, Any]) -> Dict[str, Any]:
     if "sort" in q:
         out["sort"] = str(q.get("sort"))
 
-    return out
+    return Criteria(out)
+
+
+# paramètres critères de /search et /calendar (même dict → même Criteria → mêmes clés de cache)
+QUERY_CRITERIA_KEYS = (
+    "adults", "childrenAges", "infants", "um", "umAges", "pets",
+    "bagsSoute", "bagsCabin", "cabin", "direct", "fareType", "resident",
+)
+
+
+def criteria_from_query(query: Mapping[str, Any]) -> Criteria:
+    """Critères d'une requête stockée (alerte, recherche sauvegardée), comme les routes les construisent."""
+    return normalize_criteria({k: query.get(k) for k in QUERY_CRITERIA_KEYS})
 
 
-def criteria_hash(criteria: Dict[str, Any]) -> str:
-    """Hash stable (sha1) sur JSON trié."""
-    blob = json.dumps(criteria, sort_keys=True, separators=(",", ":")).encode("utf-8")
-    return hashlib.sha1(blob).hexdigest()
+def criteria_hash(criteria: Mapping[str, Any]) -> str:
+    """Hash stable (sha1) sur JSON trié (pré-calculé pour un Criteria)."""
+    return Criteria(criteria).digest
 
 
 # ---------- Flight normalization ----------
@@ -164,9 +264,10 @@ def normalize_flight(raw: Dict[str, Any], criteria: Dict[str, Any]) -> Optional[
         h, m = divmod(int(duration_min), 60)
         iso_dur = f"PT{h}H{m}M"
 
-    # Propager les flags demandés (UM/pets) – pas d’impact prix si non supporté provider
-    um_ok = True if int(criteria.get("um", 0)) == 1 else True
-    animal_ok = True if int(criteria.get("pets", 0)) == 1 else True
+    # Éligibilité UM / animaux de la compagnie (index bitmask de rules.py)
+    mask = carrier_mask(carrier)
+    um_ok = bool(mask & ELIG_UM)
+    animal_ok = bool(mask & ELIG_PETS)
 
     return {
         "prix": price,
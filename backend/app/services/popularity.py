@@ -0,0 +1,155 @@
+# backend/app/services/popularity.py
+"""
+Popularité récente des clés /calendar et /search, et préchauffage des plus demandées.
+
+- Count-min sketch (depth × width compteurs) : fréquence estimée de n'importe quelle clé en
+  mémoire constante, jamais sous-estimée ; décroissance multiplicative à chaque passage du
+  préchauffeur → « récent » plutôt que « depuis le démarrage ».
+- Candidats top-N : petit dictionnaire borné des clés dont l'estimation dépasse le plancher
+  courant (le sketch seul ne sait pas énumérer ses clés).
+- Préchauffeur : rafraîchit les top-N peu avant l'expiration de leurs entrées DAY:/CAL:,
+  dans la limite de son budget par passage et du budget partagé des tâches de fond.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+from datetime import date as dt_date
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from ..core.config import settings
+from .cache import cache, day_key
+from .fx import base_criteria
+from .normalize import Criteria
+from .quota import TokenBucket, background_quota
+
+log = logging.getLogger(__name__)
+
+# ("cal", origin, destination, "YYYY-MM", criteria) | ("day", origin, destination, "YYYY-MM-DD", criteria)
+Key = Tuple[str, str, str, str, Criteria]
+
+
+_PRIME = (1 << 61) - 1
+
+
+class CountMinSketch:
+    def __init__(self, width: int, depth: int) -> None:
+        self.width = max(16, int(width))
+        self.depth = max(1, int(depth))
+        self.rows: List[List[float]] = [[0.0] * self.width for _ in range(self.depth)]
+        # une fonction de hachage indépendante par ligne : (a·h + b) mod p mod width
+        rnd = random.Random(0x5EED)
+        self._ab = [(rnd.randrange(1, _PRIME), rnd.randrange(0, _PRIME)) for _ in range(self.depth)]
+
+    def _cells(self, key: Any) -> List[int]:
+        h = hash(key)
+        return [((a * h + b) % _PRIME) % self.width for a, b in self._ab]
+
+    def add(self, key: Any, n: float = 1.0) -> float:
+        """Incrémente et renvoie l'estimation (min des compteurs) de la clé."""
+        est = None
+        for row, c in zip(self.rows, self._cells(key)):
+            row[c] += n
+            est = row[c] if est is None else min(est, row[c])
+        return est or 0.0
+
+    def estimate(self, key: Any) -> float:
+        return min(row[c] for row, c in zip(self.rows, self._cells(key)))
+
+    def decay(self, factor: float) -> None:
+        for row in self.rows:
+            for c in range(self.width):
+                row[c] *= factor
+
+
+class PopularityTracker:
+    def __init__(self, width: int, depth: int, capacity: int) -> None:
+        self.sketch = CountMinSketch(width, depth)
+        self.capacity = max(1, int(capacity))
+        self._candidates: Dict[Key, float] = {}
+        self._floor = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(kind: str, origin: str, destination: str, period: str, criteria: Optional[Mapping[str, Any]]) -> Key:
+        # Criteria (hashable) quel que soit l'appelant : un dict simple n'est pas hashable
+        return (kind, origin.upper(), destination.upper(), period, Criteria(criteria or {}))
+
+    def record(self, kind: str, origin: str, destination: str, period: str, criteria: Optional[Mapping[str, Any]]) -> None:
+        key = self._key(kind, origin, destination, period, criteria)
+        with self._lock:
+            est = self.sketch.add(key)
+            if key in self._candidates or len(self._candidates) < self.capacity:
+                self._candidates[key] = est
+            elif est > self._floor:
+                coldest = min(self._candidates, key=self._candidates.__getitem__)
+                del self._candidates[coldest]
+                self._candidates[key] = est
+            else:
+                return
+            if len(self._candidates) >= self.capacity:
+                self._floor = min(self._candidates.values())
+
+    def estimate(self, kind: str, origin: str, destination: str, period: str, criteria: Optional[Mapping[str, Any]]) -> float:
+        return self.sketch.estimate(self._key(kind, origin, destination, period, criteria))
+
+    def top(self, n: int) -> List[Tuple[Key, float]]:
+        with self._lock:
+            ranked = sorted(self._candidates.items(), key=lambda kv: -kv[1])
+        return ranked[:n]
+
+    def decay(self, factor: float) -> None:
+        with self._lock:
+            self.sketch.decay(factor)
+            self._candidates = {k: v * factor for k, v in self._candidates.items() if v * factor >= 0.5}
+            self._floor = min(self._candidates.values()) if len(self._candidates) >= self.capacity else 0.0
+
+
+popularity = PopularityTracker(
+    settings.POPULARITY_SKETCH_WIDTH,
+    settings.POPULARITY_SKETCH_DEPTH,
+    4 * settings.PREFETCH_TOP_N,
+)
+
+
+def prefetch_popular(
+    tracker: PopularityTracker = popularity,
+    top_n: Optional[int] = None,
+    budget: Optional[int] = None,
+    quota: TokenBucket = background_quota,
+    today: Optional[dt_date] = None,
+) -> Dict[str, Any]:
+    """Rafraîchit les clés les plus demandées avant expiration ; puis fait décroître les compteurs."""
+    # import local : calendar_aggregator consulte la popularité pour ses TTL (ttl_policy.py)
+    from .calendar_aggregator import get_day_entry, warm_month
+
+    top_n = settings.PREFETCH_TOP_N if top_n is None else top_n
+    budget = settings.PREFETCH_BUDGET if budget is None else budget
+    within = settings.PREFETCH_REFRESH_WITHIN
+    today_iso = (today or dt_date.today()).isoformat()
+
+    calls = 0
+
+    def allow_fetch() -> bool:
+        nonlocal calls
+        if calls >= budget or not quota.try_acquire():
+            return False
+        calls += 1
+        return True
+
+    keys = tracker.top(top_n)
+    for (kind, origin, destination, period, criteria), _ in keys:
+        if period < today_iso[:len(period)]:
+            continue
+        if kind == "cal":
+            warm_month(origin, destination, period, criteria, allow_fetch, within)
+        else:
+            entry = cache.get_entry(day_key(origin, destination, period, base_criteria(criteria)))
+            if (entry is None or entry.ttl_remaining() <= within) and allow_fetch():
+                get_day_entry(origin, destination, period, criteria, refresh=True)
+
+    tracker.decay(settings.POPULARITY_DECAY)
+    report = {"keys": len(keys), "calls": calls}
+    log.info("[prefetch] %s", report)
+    return report
@@ -0,0 +1,49 @@
+# backend/app/services/quota.py
+"""
+Budget d'appels providers des tâches de fond (alertes, préchauffage…).
+
+Seau à jetons partagé par toutes les tâches : elles ne doivent jamais consommer le quota
+upstream (Amadeus) dont les recherches interactives ont besoin. Une entrée déjà en cache
+ne coûte rien ; seul un appel provider réel prend un jeton. Sans jeton, la tâche
+reporte le travail restant à son prochain passage.
+"""
+from __future__ import annotations
+
+import threading
+from time import monotonic
+
+from ..core.config import settings
+
+
+class TokenBucket:
+    def __init__(self, rate_per_s: float, capacity: int) -> None:
+        self.rate = max(0.0, float(rate_per_s))
+        self.capacity = max(0, int(capacity))
+        self._tokens = float(self.capacity)
+        self._stamp = monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def try_acquire(self, n: int = 1) -> bool:
+        """Prend n jetons si disponibles (jamais bloquant)."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= n:
+                self._tokens -= n
+                return True
+            return False
+
+    def available(self) -> int:
+        with self._lock:
+            self._refill()
+            return int(self._tokens)
+
+
+background_quota = TokenBucket(
+    settings.BACKGROUND_QUOTA_PER_MIN / 60.0,
+    settings.BACKGROUND_QUOTA_BURST,
+)
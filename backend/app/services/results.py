@@ -0,0 +1,239 @@
+# backend/app/services/results.py
+"""
+Vues triées / paginées sur la liste normalisée d'un jour (entrée DAY: du cache).
+
+- Les clés de tri et les ordres complets sont mémoïsés *sur l'entrée de cache*
+  (CacheEntry.derive) : un seul tri par (jour, critères, mode), réutilisé page après page.
+- 1re page sans ordre déjà calculé → top-K par tas (heapq.nsmallest), pas de tri complet.
+- Pagination par curseur opaque lié à la version de l'entrée (page stable même si
+  l'entrée est rafraîchie entre deux pages : curseur refusé plutôt que doublons/trous).
+- Filtres fins résolus par les index secondaires de l'entrée (day_index.DayIndex).
+- Mode "pareto" : ensemble non dominé sur (prix, durée, escales), mémoïsé sur l'entrée.
+"""
+from __future__ import annotations
+
+import base64
+import heapq
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.tracing import traced
+from .cache import CacheEntry
+from .day_index import DayFilters, DayIndex, iter_bits
+
+SORT_MODES = ("price", "duration", "departure", "stops", "best")
+DEFAULT_SORT = "price"
+_SORT_ALIASES = {"depart": "departure"}  # valeur envoyée par le front (SearchClient)
+
+# Pondération du score "best" (chaque terme est rapporté au meilleur de la journée)
+BEST_WEIGHTS = {"price": 0.6, "duration": 0.3, "stops": 0.1}
+
+_MISSING = 10**9
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def resolve_sort(sort: Optional[str]) -> str:
+    """Mode de tri connu, sinon tri prix (comportement historique)."""
+    s = (sort or "").strip().lower()
+    s = _SORT_ALIASES.get(s, s)
+    return s if s in SORT_MODES else DEFAULT_SORT
+
+
+def _num(v: Any) -> int:
+    return v if isinstance(v, int) else _MISSING
+
+
+def _build_keys(flights: Sequence[Dict[str, Any]], mode: str) -> List[Tuple[Any, ...]]:
+    """Clé de tri par vol ; l'index final garantit un ordre stable et total."""
+    if mode == "duration":
+        return [(_num(f.get("duree_minutes")), f["prix"], i) for i, f in enumerate(flights)]
+    if mode == "departure":
+        return [(f.get("departISO") or "~", f["prix"], i) for i, f in enumerate(flights)]
+    if mode == "stops":
+        return [(_num(f.get("escales")), f["prix"], i) for i, f in enumerate(flights)]
+    if mode == "best":
+        if not flights:
+            return []
+        min_price = max(1, min(f["prix"] for f in flights))
+        durations = [d for d in (f.get("duree_minutes") for f in flights) if isinstance(d, int) and d > 0]
+        min_dur = min(durations) if durations else 1
+        keys = []
+        for i, f in enumerate(flights):
+            d = f.get("duree_minutes")
+            score = (
+                BEST_WEIGHTS["price"] * f["prix"] / min_price
+                + BEST_WEIGHTS["duration"] * ((d if isinstance(d, int) and d > 0 else 2 * min_dur) / min_dur)
+                + BEST_WEIGHTS["stops"] * (f.get("escales") or 0)
+            )
+            keys.append((round(score, 6), f["prix"], i))
+        return keys
+    return [(f["prix"], i) for i, f in enumerate(flights)]
+
+
+def _keys(entry: CacheEntry, mode: str) -> List[Tuple[Any, ...]]:
+    return entry.derive(f"keys:{mode}", lambda flights: _build_keys(flights, mode))
+
+
+def _full_order(entry: CacheEntry, mode: str) -> List[int]:
+    def build(flights: Sequence[Dict[str, Any]]) -> List[int]:
+        if mode == DEFAULT_SORT:
+            # la liste DAY: est déjà triée par prix (pipeline jour)
+            return list(range(len(flights)))
+        keys = _keys(entry, mode)
+        return sorted(range(len(flights)), key=keys.__getitem__)
+
+    return entry.derive(f"order:{mode}", build)
+
+
+def _pareto_front(flights: Sequence[Dict[str, Any]], candidates: Sequence[int]) -> List[int]:
+    """
+    Vols non dominés sur (prix, durée, escales), tous minimisés. Valeur absente = pire.
+    Tri par (prix, durée, escales) puis balayage avec un Fenwick de min(durée) indexé par
+    le rang d'escales : O(n log n). Deux vols strictement identiques restent tous les deux.
+    """
+    pts = sorted(
+        (f["prix"], _num(f.get("duree_minutes")), _num(f.get("escales")), i)
+        for i, f in ((i, flights[i]) for i in candidates)
+    )
+    levels = sorted({s for _, _, s, _ in pts})
+    rank = {s: r + 1 for r, s in enumerate(levels)}
+    tree = [_MISSING + 1] * (len(levels) + 1)
+
+    def prefix_min(r: int) -> int:
+        m = _MISSING + 1
+        while r > 0:
+            m = min(m, tree[r])
+            r -= r & -r
+        return m
+
+    def update(r: int, d: int) -> None:
+        while r < len(tree):
+            tree[r] = min(tree[r], d)
+            r += r & -r
+
+    front: List[int] = []
+    k = 0
+    while k < len(pts):
+        # groupe de triplets identiques : dominé en bloc ou pas du tout
+        j = k
+        while j < len(pts) and pts[j][:3] == pts[k][:3]:
+            j += 1
+        _, d, s, _ = pts[k]
+        if prefix_min(rank[s]) > d:
+            front.extend(p[3] for p in pts[k:j])
+        update(rank[s], d)
+        k = j
+    front.sort()
+    return front
+
+
+def pareto_indices(entry: CacheEntry) -> List[int]:
+    """Front de Pareto de la journée complète (mémoïsé avec l'entrée DAY:)."""
+    return entry.derive("pareto", lambda flights: _pareto_front(flights, range(len(flights))))
+
+
+def best_offer(entry: CacheEntry) -> Optional[Dict[str, Any]]:
+    """
+    Vol au meilleur score "best" parmi le front de Pareto, None si jour vide.
+    Choisi sur le front et non sur toute la journée : le score compte une durée absente pour
+    2× la meilleure (un tel vol peut y battre un vol qui le domine), le front pour la pire.
+    """
+    if not entry.value:
+        return None
+    keys = _keys(entry, "best")
+    return entry.value[min(pareto_indices(entry), key=keys.__getitem__)]
+
+
+def day_index(entry: CacheEntry) -> DayIndex:
+    """Index secondaires de l'entrée, construits une fois par version."""
+    return entry.derive("index", DayIndex)
+
+
+def sorted_indices(
+    entry: CacheEntry,
+    mode: str,
+    offset: int,
+    limit: Optional[int],
+    mask: Optional[int] = None,
+) -> List[int]:
+    """
+    Indices (dans entry.value) de la tranche [offset, offset+limit) pour le mode donné,
+    restreints aux vols du masque `mask` si fourni.
+    Top-K par tas pour une 1re page quand l'ordre complet n'est pas encore connu.
+    """
+    n = len(entry.value)
+    order = entry.derived.get(f"order:{mode}")
+    if order is None and limit is not None and offset == 0 and mode != DEFAULT_SORT:
+        candidates = range(n) if mask is None else list(iter_bits(mask))
+        if limit < len(candidates):
+            keys = _keys(entry, mode)
+            return heapq.nsmallest(limit, candidates, key=keys.__getitem__)
+    if order is None:
+        order = _full_order(entry, mode)
+    if mask is not None:
+        order = [i for i in order if mask >> i & 1]
+    return order[offset:] if limit is None else order[offset:offset + limit]
+
+
+def encode_cursor(entry: CacheEntry, mode: str, offset: int, filters: str = "") -> str:
+    raw = json.dumps({"v": entry.version, "s": mode, "f": filters, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, entry: CacheEntry, mode: str, filters: str = "") -> int:
+    """Offset encodé dans le curseur ; InvalidCursor si illisible, autre tri/filtre ou entrée rafraîchie."""
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(cursor + pad).decode("utf-8"))
+        version, sort, offset = int(data["v"]), str(data["s"]), int(data["o"])
+        ftoken = str(data.get("f", ""))
+    except Exception:
+        raise InvalidCursor("curseur illisible")
+    if version != entry.version or sort != mode or ftoken != filters:
+        raise InvalidCursor("curseur expiré (résultats rafraîchis, tri ou filtres différents)")
+    if offset < 0:
+        raise InvalidCursor("curseur illisible")
+    return offset
+
+
+@traced("paginate")
+def paginate(
+    entry: CacheEntry,
+    sort: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    filters: Optional[DayFilters] = None,
+    pareto: bool = False,
+) -> Dict[str, Any]:
+    """
+    Page de résultats : { results, total, nextCursor } (total = après filtres).
+    Sans limit, cursor ni filtre : liste complète triée (réponse historique de /search).
+    pareto=True : restreint au front de Pareto (des vols filtrés, s'il y a des filtres).
+    """
+    mode = resolve_sort(sort)
+    flights = entry.value
+    mask: Optional[int] = None
+    ftoken = ""
+    if filters is not None and not filters.is_empty():
+        mask = day_index(entry).select(filters)
+        ftoken = filters.cache_token()
+    if pareto:
+        # front mémoïsé sans filtre ; avec filtres, recalculé sur le sous-ensemble (petit)
+        front = pareto_indices(entry) if mask is None else _pareto_front(flights, list(iter_bits(mask)))
+        mask = 0
+        for i in front:
+            mask |= 1 << i
+        ftoken = "pareto|" + ftoken
+    offset = decode_cursor(cursor, entry, mode, ftoken) if cursor else 0
+    idx = sorted_indices(entry, mode, offset, limit, mask)
+    total = len(flights) if mask is None else mask.bit_count()
+    end = offset + len(idx)
+    next_cursor = encode_cursor(entry, mode, end, ftoken) if limit is not None and end < total else None
+    return {
+        "results": [flights[i] for i in idx],
+        "total": total,
+        "nextCursor": next_cursor,
+    }
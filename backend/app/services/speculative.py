@@ -0,0 +1,151 @@
+# backend/app/services/speculative.py
+"""
+Préchargement spéculatif (opt-in : SPECULATIVE_PREFETCH) après un /calendar :
+- mois M servi → le mois M+1 est préchauffé (clic « mois suivant » fréquent) ;
+- calendrier servi depuis le cache → les DAY: des jours les moins chers (clic probable
+  vers /search) sont rafraîchis s'ils ont expiré entre-temps (TTL DAY: < TTL CAL:).
+
+Exécuté par un seul thread de fond en priorité minimale (nice 19 si le système le permet),
+file bornée et dédupliquée. Travail annulable : dès que le budget partagé des tâches de fond
+descend sous SPECULATIVE_QUOTA_RESERVE, la tâche en cours s'arrête avant son prochain appel
+provider et la file est vidée — le quota restant va au travail non spéculatif.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import deque
+from datetime import date as dt_date
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from ..core.config import settings
+from .cache import cache, day_key
+from .calendar_aggregator import get_day_entry, warm_month
+from .fx import base_criteria
+from .normalize import Criteria
+from .quota import TokenBucket, background_quota
+
+log = logging.getLogger(__name__)
+
+# ("month", origin, destination, "YYYY-MM", criteria) | ("day", origin, destination, "YYYY-MM-DD", criteria)
+Task = Tuple[str, str, str, str, Criteria]
+
+
+def next_month(month_ym: str) -> str:
+    yy, mm = int(month_ym[:4]), int(month_ym[5:7])
+    return f"{yy + 1}-01" if mm == 12 else f"{yy}-{mm + 1:02d}"
+
+
+def cheapest_days(calendar: Dict[str, Dict[str, Any]], n: int, today: Optional[str] = None) -> list:
+    """Les n jours (à venir) au prix le plus bas d'un calendrier CAL:."""
+    today = today or dt_date.today().isoformat()
+    priced = [(d["prix"], day) for day, d in calendar.items() if day >= today and d.get("prix")]
+    return [day for _, day in sorted(priced)[:n]]
+
+
+class SpeculativePrefetcher:
+    def __init__(self, quota: TokenBucket, reserve: int, max_pending: int) -> None:
+        self.quota = quota
+        self.reserve = reserve
+        self.max_pending = max_pending
+        self._queue: Deque[Task] = deque()
+        self._pending: Set[Task] = set()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._generation = 0
+        self.stats = {"queued": 0, "dropped": 0, "cancelled": 0, "calls": 0}
+
+    # --- côté requête (non bloquant) ---
+
+    def submit(self, task: Task) -> None:
+        with self._cond:
+            if task in self._pending:
+                return
+            if len(self._queue) >= self.max_pending:
+                self.stats["dropped"] += 1
+                return
+            self._queue.append(task)
+            self._pending.add(task)
+            self.stats["queued"] += 1
+            self._ensure_worker()
+            self._cond.notify()
+
+    def after_calendar(
+        self, origin: str, destination: str, month_ym: str, criteria: Criteria,
+        calendar: Dict[str, Dict[str, Any]], hit: bool,
+    ) -> None:
+        if not settings.SPECULATIVE_PREFETCH or self.scarce():
+            return
+        origin, destination = origin.upper(), destination.upper()
+        self.submit(("month", origin, destination, next_month(month_ym), criteria))
+        if hit:
+            for day in cheapest_days(calendar, settings.SPECULATIVE_DAYS):
+                self.submit(("day", origin, destination, day, criteria))
+
+    # --- annulation ---
+
+    def scarce(self) -> bool:
+        return self.quota.available() < self.reserve
+
+    def cancel(self) -> None:
+        """Vide la file ; la tâche en cours s'arrête avant son prochain appel provider."""
+        with self._cond:
+            self.stats["cancelled"] += len(self._queue)
+            self._queue.clear()
+            self._pending.clear()
+            self._generation += 1
+
+    # --- worker ---
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="speculative-prefetch", daemon=True)
+            self._thread.start()
+
+    def _loop(self) -> None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                task = self._queue.popleft()
+                self._pending.discard(task)
+                generation = self._generation
+            try:
+                self.run(task, generation)
+            except Exception:
+                log.exception("[speculative] %s a échoué", task[:4])
+
+    def _allow_fetch(self, generation: int) -> bool:
+        if generation != self._generation:
+            return False
+        if self.scarce():
+            self.cancel()
+            return False
+        if not self.quota.try_acquire():
+            return False
+        self.stats["calls"] += 1
+        return True
+
+    def run(self, task: Task, generation: Optional[int] = None) -> None:
+        generation = self._generation if generation is None else generation
+        kind, origin, destination, period, criteria = task
+        allow = lambda: self._allow_fetch(generation)  # noqa: E731
+        if kind == "month":
+            # jours absents seulement (refresh_within=0) : on ne double pas le préchauffeur
+            warm_month(origin, destination, period, criteria, allow, 0)
+        else:
+            entry = cache.get_entry(day_key(origin, destination, period, base_criteria(criteria)))
+            if entry is None and allow():
+                get_day_entry(origin, destination, period, criteria, refresh=True)
+
+
+speculative = SpeculativePrefetcher(
+    background_quota,
+    settings.SPECULATIVE_QUOTA_RESERVE,
+    settings.SPECULATIVE_MAX_PENDING,
+)
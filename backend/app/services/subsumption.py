@@ -0,0 +1,61 @@
+# backend/app/services/subsumption.py
+"""
+Subsomption de cache : une requête plus étroite servie en filtrant localement l'entrée DAY:
+d'une requête plus large déjà en cache (ex: direct=1 = vols à 0 escale de direct=0).
+
+Chaque provider déclare les critères qui ne font que *filtrer* ses offres sans changer les
+prix (`filter_only_criteria`) et, s'il tronque ses réponses, `max_results`. La dérivation
+n'a lieu que si tous les providers actifs déclarent le critère (on ne sait pas lequel a
+produit l'entrée) et si la liste large n'a pas pu être tronquée.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .cache import cache, day_key
+from .normalize import Criteria
+from .providers import build_providers
+
+# critère → (valeur de la requête large, condition sur un vol normalisé de la liste large)
+FILTER_CRITERIA: Dict[str, Tuple[Any, Callable[[Mapping[str, Any]], bool]]] = {
+    "direct": (0, lambda f: f.get("escales") == 0),
+}
+
+
+def _filter_only() -> frozenset:
+    providers = build_providers()
+    sets = [frozenset(getattr(p, "filter_only_criteria", ())) for p in providers]
+    return frozenset.intersection(*sets) if sets else frozenset()
+
+
+def _max_results() -> Optional[int]:
+    caps = [getattr(p, "max_results", None) for p in build_providers()]
+    caps = [c for c in caps if c]
+    return min(caps) if caps else None
+
+
+def derive_from_superset(
+    origin: str,
+    destination: str,
+    date_ymd: str,
+    criteria: Mapping[str, Any],
+    rules: Optional[str] = None,
+) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """(vols filtrés, TTL restant de l'entrée large) si une entrée large en cache couvre la requête."""
+    allowed = _filter_only()
+    narrowing = {
+        k: broad for k, (broad, _) in FILTER_CRITERIA.items()
+        if k in allowed and criteria.get(k) not in (None, broad)
+    }
+    if not narrowing:
+        return None
+    base = criteria if isinstance(criteria, Criteria) else Criteria(criteria)
+    entry = cache.get_entry(day_key(origin, destination, date_ymd, base.replace(**narrowing), rules))
+    if entry is None or entry.ttl_remaining() <= 0:
+        return None
+    cap = _max_results()
+    if cap is not None and len(entry.value) >= cap:
+        return None  # liste large peut-être tronquée : il manquerait des offres
+    keep = [FILTER_CRITERIA[k][1] for k in narrowing]
+    flights = [f for f in entry.value if all(p(f) for p in keep)]
+    return flights, entry.ttl_remaining()
@@ -0,0 +1,154 @@
+# backend/app/services/ttl_policy.py
+"""
+Politique de TTL des entrées DAY:/CAL: (au lieu de deux constantes globales).
+
+TTL d'un jour = base(proximité du départ) × facteur(popularité) × facteur(volatilité),
+puis plafonné selon la classe du résultat :
+- "ok"    : offres trouvées ;
+- "empty" : aucun provider n'a d'offre (ou toutes filtrées) → CACHE_TTL_EMPTY au plus ;
+- "error" : tous les providers ont échoué, ou un provider de repli a répondu à la place d'un
+  provider en échec (HTTP non-200, 429, transport) → cache court (CACHE_TTL_ERROR), pour ne
+  pas marteler un provider en panne sans figer une liste vide ou de repli pendant 15 min.
+
+Les bases suivent CACHE_TTL_DAY / CACHE_TTL_CALENDAR (l'échelle 1.0 = 15 min pour un départ
+à moins d'un mois) : un tarif à 9 mois bouge peu, celui de demain bouge vite.
+Volatilité = moyenne mobile de la variation relative du prix min entre deux appels provider.
+
+Fonctions pures (nombres en entrée) : rejouables hors serveur par
+benchmarks/sim_ttl_policy.py pour comparer les politiques sur un journal de requêtes.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from datetime import date as dt_date
+from typing import Optional, Tuple
+
+from ..core.config import settings
+from .cache import CACHE_TTL_CALENDAR, CACHE_TTL_DAY, CACHE_TTL_DAY_DEFAULT
+
+RESULT_OK = "ok"
+RESULT_EMPTY = "empty"
+RESULT_ERROR = "error"
+
+# (jours avant départ ≤ N, TTL à l'échelle 1.0) ; None = au-delà
+PROXIMITY_TTL: Tuple[Tuple[Optional[int], int], ...] = (
+    (1, 300),
+    (7, 600),
+    (30, 900),
+    (90, 1800),
+    (180, 3600),
+    (None, 7200),
+)
+
+
+def days_until(date_ymd: str, today: Optional[dt_date] = None) -> int:
+    """Jours avant `date_ymd` ; date illisible → 0 (TTL le plus court) plutôt qu'une exception
+    après l'appel provider, qui ferait perdre le résultat."""
+    try:
+        day = dt_date.fromisoformat(date_ymd)
+    except (TypeError, ValueError):
+        return 0
+    return (day - (today or dt_date.today())).days
+
+
+def proximity_ttl(days_out: int) -> int:
+    for limit, ttl in PROXIMITY_TTL:
+        if limit is None or days_out <= limit:
+            return ttl
+    return PROXIMITY_TTL[-1][1]
+
+
+def popularity_factor(score: float) -> float:
+    """Clé très demandée → plus fraîche (le rafraîchissement est amorti sur beaucoup de hits)."""
+    return min(1.25, max(0.6, 1.25 - 0.25 * math.log10(1.0 + max(0.0, score))))
+
+
+def volatility_factor(volatility: Optional[float]) -> float:
+    """Prix stable → TTL allongé (×1.5 max) ; prix qui bouge → raccourci (×0.25 min)."""
+    if volatility is None:
+        return 1.0
+    return min(1.5, max(0.25, 1.5 / (1.0 + 50.0 * volatility)))
+
+
+class TtlPolicy:
+    def __init__(
+        self,
+        mode: str,
+        day_ttl: int,
+        calendar_ttl: int,
+        error_ttl: int,
+        empty_ttl: int,
+        max_ttl: int,
+    ) -> None:
+        self.mode = mode
+        self.day_ttl_fixed = day_ttl
+        self.calendar_ttl_fixed = calendar_ttl
+        self.error_ttl = error_ttl
+        self.empty_ttl = empty_ttl
+        self.max_ttl = max_ttl
+        self._day_scale = day_ttl / CACHE_TTL_DAY_DEFAULT
+        self._cal_scale = calendar_ttl / CACHE_TTL_DAY_DEFAULT
+
+    def day_ttl(
+        self,
+        days_out: int,
+        result: str = RESULT_OK,
+        popularity: float = 0.0,
+        volatility: Optional[float] = None,
+    ) -> int:
+        if self.mode == "fixed":
+            return self.day_ttl_fixed
+        if result == RESULT_ERROR:
+            return self.error_ttl
+        ttl = proximity_ttl(days_out) * self._day_scale * popularity_factor(popularity)
+        if result == RESULT_EMPTY:
+            return int(min(ttl, self.empty_ttl))
+        ttl *= volatility_factor(volatility)
+        return int(max(self.error_ttl, min(self.max_ttl, ttl)))
+
+    def calendar_ttl(self, days_out: int) -> int:
+        """CAL: d'un mois ; `days_out` = premier jour encore à venir du mois."""
+        if self.mode == "fixed":
+            return self.calendar_ttl_fixed
+        return int(min(self.max_ttl, proximity_ttl(days_out) * self._cal_scale))
+
+
+class VolatilityTracker:
+    """Variation relative du prix min entre deux appels provider, par clé (LRU borné)."""
+
+    def __init__(self, capacity: int = 50000, alpha: float = 0.3) -> None:
+        self.capacity = capacity
+        self.alpha = alpha
+        self._state: "OrderedDict[str, Tuple[int, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, min_price: Optional[int]) -> None:
+        if not min_price:
+            return
+        with self._lock:
+            prev = self._state.pop(key, None)
+            vol: Optional[float] = None
+            if prev is not None:
+                last, old = prev
+                change = abs(min_price - last) / last
+                vol = change if old is None else (1 - self.alpha) * old + self.alpha * change
+            self._state[key] = (min_price, vol)
+            if len(self._state) > self.capacity:
+                self._state.popitem(last=False)
+
+    def volatility(self, key: str) -> Optional[float]:
+        state = self._state.get(key)
+        return state[1] if state else None
+
+
+ttl_policy = TtlPolicy(
+    settings.TTL_POLICY,
+    CACHE_TTL_DAY,
+    CACHE_TTL_CALENDAR,
+    settings.CACHE_TTL_ERROR,
+    settings.CACHE_TTL_EMPTY,
+    settings.CACHE_TTL_MAX,
+)
+volatility = VolatilityTracker()
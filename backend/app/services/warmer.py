@@ -0,0 +1,106 @@
+# backend/app/services/warmer.py
+"""
+Préchauffage du cache à partir des recherches sauvegardées (SavedSearch).
+
+SavedSearch.query = paramètres de /calendar ou /search :
+  { "origin": "PAR", "destination": "BCN", "month": "YYYY-MM" | "date": "YYYY-MM-DD", ...critères }
+
+À chaque passage (tâche de fond basse priorité) :
+- les recherches sont dédupliquées par (route, mois, hash des critères normalisés) ;
+- les mois les plus sauvegardés passent en premier, puis les plus proches ;
+- les entrées DAY: absentes ou proches de l'expiration sont rafraîchies, puis CAL: est
+  recomposé depuis le cache (calendar_aggregator.warm_month) ;
+- appels provider bornés par passage (WARMER_BUDGET) et par le budget partagé des tâches
+  de fond ; le passage renvoie la couverture atteinte (jours frais / jours visés).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date as dt_date
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.db import SessionLocal
+from ..models.saved_search import SavedSearch
+from .calendar_aggregator import warm_month
+from .normalize import Criteria, criteria_from_query
+from .quota import TokenBucket, background_quota
+
+log = logging.getLogger(__name__)
+
+MonthKey = Tuple[str, str, str, Criteria]
+
+
+def saved_search_month(query: Any) -> Optional[MonthKey]:
+    """(origin, destination, mois, critères normalisés) d'une recherche sauvegardée ; None si invalide."""
+    if not isinstance(query, dict):
+        return None
+    origin = str(query.get("origin") or "").strip().upper()
+    destination = str(query.get("destination") or "").strip().upper()
+    month = str(query.get("month") or query.get("date") or "").strip()[:7]
+    if len(origin) != 3 or len(destination) != 3:
+        return None
+    try:
+        dt_date.fromisoformat(month + "-01")
+    except ValueError:
+        return None
+    return origin, destination, month, criteria_from_query(query)
+
+
+def warm_saved_searches(
+    db: Session,
+    budget: Optional[int] = None,
+    quota: TokenBucket = background_quota,
+    today: Optional[dt_date] = None,
+) -> Dict[str, Any]:
+    """Un passage de préchauffage ; renvoie les compteurs et la couverture atteinte."""
+    budget = settings.WARMER_BUDGET if budget is None else budget
+    current = (today or dt_date.today()).isoformat()[:7]
+
+    counts: Dict[MonthKey, int] = {}
+    saved = 0
+    for (query,) in db.execute(select(SavedSearch.query)):
+        saved += 1
+        key = saved_search_month(query)
+        if key is not None and key[2] >= current:
+            counts[key] = counts.get(key, 0) + 1
+
+    calls = 0
+
+    def allow_fetch() -> bool:
+        nonlocal calls
+        if calls >= budget or not quota.try_acquire():
+            return False
+        calls += 1
+        return True
+
+    fresh_days = target_days = complete = 0
+    for (origin, destination, month, criteria), _ in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0][2])):
+        _, fresh, total = warm_month(
+            origin, destination, month, criteria, allow_fetch, settings.WARMER_REFRESH_WITHIN,
+        )
+        fresh_days += fresh
+        target_days += total
+        complete += fresh == total
+
+    report = {
+        "saved": saved,
+        "distinct": len(counts),
+        "complete": complete,
+        "calls": calls,
+        "coverage": round(fresh_days / target_days, 3) if target_days else 1.0,
+    }
+    log.info("[warmer] %s", report)
+    return report
+
+
+def run_saved_search_warmer() -> Dict[str, Any]:
+    """Point d'entrée de la tâche périodique (session dédiée)."""
+    db = SessionLocal()
+    try:
+        return warm_saved_searches(db)
+    finally:
+        db.close()
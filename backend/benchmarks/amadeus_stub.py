@@ -0,0 +1,374 @@
+# backend/benchmarks/amadeus_stub.py
+"""
+Doublure locale d'Amadeus pour les tests de charge (on ne martèle pas la vraie API).
+
+Sert les deux routes utilisées par providers/amadeus.py :
+  - POST /v1/security/oauth2/token        (client_credentials → access_token, expires_in)
+  - GET  /v2/shopping/flight-offers       (Bearer requis, sinon 401)
+et GET /_stats (compteurs, lus par benchmarks/load_test.py).
+
+Comportement réglable :
+  - latence : --latency / --token-latency, distributions
+      fixed:MS | uniform:MIN,MAX | normal:MOY,ECART | lognormal:MEDIANE,SIGMA | none
+  - erreurs : --error-rate (500) et --rate-429 (429 + Retry-After), tirés par requête ;
+    --max-rps : au-delà, 429 comme le quota par seconde d'Amadeus (0 = illimité)
+  - taille des réponses : --offers MIN-MAX offres par recherche (bornées par `max`),
+    --segments MAX escales+1 ; chaque offre porte ses travelerPricings (≈ 1,5 Ko par voyageur).
+
+Offres déterministes par requête (mêmes paramètres → même réponse) : le cache et les ETag
+de l'app se comportent comme avec la vraie API. nonStop, includedAirlineCodes, max et
+currencyCode sont respectés.
+
+Usage (depuis backend/) :
+    python -m benchmarks.amadeus_stub [--port 8765] [--latency lognormal:350,0.5] [--error-rate 0.01]
+                                      [--rate-429 0.02] [--max-rps 0] [--offers 20-50]
+puis l'app pointée dessus :
+    AMADEUS_BASE_URL=http://127.0.0.1:8765 AMADEUS_CLIENT_ID=load AMADEUS_CLIENT_SECRET=load \\
+    PROVIDERS=amadeus python -m uvicorn app.main:app --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from rules import RULES  # backend/rules.py : mêmes compagnies que les règles UM / animaux
+
+_CARRIERS = sorted(RULES)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """'lognormal:350,0.5' → tirage d'une latence en secondes."""
+    name, _, args = spec.partition(":")
+    name = name.strip().lower()
+    try:
+        vals = [float(x) for x in args.split(",") if x.strip()]
+        if name == "none":
+            return lambda rnd: 0.0
+        if name == "fixed":
+            ms, = vals
+            return lambda rnd: ms / 1000
+        if name == "uniform":
+            lo, hi = vals
+            return lambda rnd: rnd.uniform(lo, hi) / 1000
+        if name == "normal":
+            mu, sd = vals
+            return lambda rnd: max(0.0, rnd.gauss(mu, sd)) / 1000
+        if name == "lognormal":
+            median, sigma = vals
+            mu = math.log(median)
+            return lambda rnd: rnd.lognormvariate(mu, sigma) / 1000
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(
+        f"latence invalide '{spec}' (fixed:MS | uniform:MIN,MAX | normal:MOY,ECART | lognormal:MEDIANE,SIGMA | none)"
+    )
+
+
+def _latency_arg(spec: str) -> str:
+    parse_latency(spec)  # validation à la lecture des options
+    return spec
+
+
+def _parse_range(spec: str) -> Tuple[int, int]:
+    lo, _, hi = spec.partition("-")
+    try:
+        a, b = int(lo), int(hi or lo)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"intervalle invalide '{spec}' (ex: 20-50)")
+    if a < 0 or b < a:
+        raise argparse.ArgumentTypeError(f"intervalle invalide '{spec}' (ex: 20-50)")
+    return a, b
+
+
+class StubConfig:
+    def __init__(
+        self,
+        latency: str = "lognormal:350,0.5",
+        token_latency: str = "fixed:80",
+        error_rate: float = 0.0,
+        rate_429: float = 0.0,
+        max_rps: float = 0.0,
+        offers: Tuple[int, int] = (20, 50),
+        segments: int = 3,
+        token_ttl: int = 1799,
+        seed: int = 42,
+    ) -> None:
+        self.latency = parse_latency(latency)
+        self.token_latency = parse_latency(token_latency)
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.max_rps = max_rps
+        self.offers = offers
+        self.segments = max(1, segments)
+        self.token_ttl = token_ttl
+        self.seed = seed
+
+
+class StubState:
+    """Compteurs, jetons émis et fenêtre de débit, partagés par les threads du serveur."""
+
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self.stats: Counter = Counter()
+        self.tokens: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._rnd = random.Random(config.seed)
+        self._window = (0, 0)  # (seconde, requêtes dans cette seconde)
+
+    def draw(self) -> float:
+        with self._lock:
+            return self._rnd.random()
+
+    def latency(self, fn: Callable[[random.Random], float]) -> float:
+        with self._lock:
+            return fn(self._rnd)
+
+    def over_quota(self) -> bool:
+        if self.config.max_rps <= 0:
+            return False
+        sec = int(time.monotonic())
+        with self._lock:
+            start, n = self._window
+            n = n + 1 if start == sec else 1
+            self._window = (sec, n)
+        return n > self.config.max_rps
+
+    def count(self, *keys: str, ms: float = 0.0) -> None:
+        with self._lock:
+            for k in keys:
+                self.stats[k] += 1
+            if ms:
+                self.stats["latency_ms_total"] += int(ms)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def issue_token(self) -> str:
+        token = uuid.uuid4().hex
+        with self._lock:
+            self.tokens[token] = time.time() + self.config.token_ttl
+        return token
+
+    def token_ok(self, token: str) -> bool:
+        with self._lock:
+            exp = self.tokens.get(token)
+        return exp is not None and exp > time.time()
+
+
+def _duration(minutes: int) -> str:
+    h, m = divmod(minutes, 60)
+    return f"PT{h}H{m}M" if m else f"PT{h}H"
+
+
+def build_offers(params: Dict[str, str], config: StubConfig) -> Dict[str, Any]:
+    """Réponse Flight Offers Search v2 (sous-ensemble lu par l'app + travelerPricings), déterministe."""
+    origin = params.get("originLocationCode", "XXX")
+    destination = params.get("destinationLocationCode", "YYY")
+    day = params.get("departureDate", "2025-01-01")
+    currency = params.get("currencyCode", "EUR")
+    adults, children, infants = (int(params.get(k) or 0) for k in ("adults", "children", "infants"))
+    non_stop = params.get("nonStop", "").lower() == "true"
+    cabin = params.get("travelClass", "ECONOMY")
+    carriers = [c for c in params.get("includedAirlineCodes", "").split(",") if c] or _CARRIERS
+
+    key = "|".join([origin, destination, day, str(adults), str(children), str(infants), str(non_stop), cabin,
+                    ",".join(carriers), currency])
+    rnd = random.Random(zlib.crc32(key.encode()) ^ config.seed)
+    lo, hi = config.offers
+    count = min(rnd.randint(lo, hi), int(params.get("max") or hi))
+    base_day = datetime.fromisoformat(day)
+    travelers = [("ADULT", 1.0)] * adults + [("CHILD", 0.75)] * children + [("HELD_INFANT", 0.1)] * infants
+
+    data: List[Dict[str, Any]] = []
+    for i in range(count):
+        carrier = rnd.choice(carriers)
+        n_segs = 1 if non_stop else rnd.randint(1, config.segments)
+        dep = base_day + timedelta(minutes=rnd.randint(6 * 60, 22 * 60))
+        segments, t = [], dep
+        for s in range(n_segs):
+            flight_min = rnd.randint(55, 240)
+            arr = t + timedelta(minutes=flight_min)
+            segments.append({
+                "departure": {"iataCode": origin if s == 0 else f"X{s:02d}", "at": t.isoformat(timespec="seconds")},
+                "arrival": {"iataCode": destination if s == n_segs - 1 else f"X{s + 1:02d}",
+                            "at": arr.isoformat(timespec="seconds")},
+                "carrierCode": carrier,
+                "number": str(rnd.randint(100, 9999)),
+                "aircraft": {"code": rnd.choice(["320", "321", "319", "738", "77W"])},
+                "duration": _duration(flight_min),
+                "id": str(s + 1),
+                "numberOfStops": 0,
+            })
+            t = arr + timedelta(minutes=rnd.randint(45, 180))
+        total_min = int((datetime.fromisoformat(segments[-1]["arrival"]["at"]) - dep).total_seconds() // 60)
+        unit = round(rnd.uniform(35, 420) * (1.0 + 0.15 * (n_segs == 1)), 2)
+        pricings = [{
+            "travelerId": str(n + 1),
+            "fareOption": "STANDARD",
+            "travelerType": ttype,
+            "price": {"currency": currency, "total": f"{unit * factor:.2f}", "base": f"{unit * factor * 0.8:.2f}"},
+            "fareDetailsBySegment": [{
+                "segmentId": seg["id"], "cabin": cabin, "fareBasis": f"{carrier}{rnd.randint(1000, 9999)}",
+                "class": rnd.choice("YBMHKLQTVX"), "includedCheckedBags": {"quantity": rnd.randint(0, 1)},
+            } for seg in segments],
+        } for n, (ttype, factor) in enumerate(travelers or [("ADULT", 1.0)])]
+        grand = sum(float(p["price"]["total"]) for p in pricings)
+        data.append({
+            "type": "flight-offer",
+            "id": str(i + 1),
+            "source": "GDS",
+            "oneWay": True,
+            "numberOfBookableSeats": rnd.randint(1, 9),
+            "itineraries": [{"duration": _duration(total_min), "segments": segments}],
+            "price": {"currency": currency, "total": f"{grand:.2f}", "base": f"{grand * 0.8:.2f}",
+                      "grandTotal": f"{grand:.2f}"},
+            "validatingAirlineCodes": [carrier],
+            "travelerPricings": pricings,
+        })
+    return {"meta": {"count": len(data)}, "data": data}
+
+
+def _amadeus_error(status: int, code: int, title: str) -> Dict[str, Any]:
+    return {"errors": [{"status": status, "code": code, "title": title}]}
+
+
+def make_handler(state: StubState) -> type:
+    config = state.config
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive si le client réutilise ses connexions
+        # en-têtes puis corps en deux écritures : sans TCP_NODELAY, +40 ms (Nagle / ACK retardé)
+        disable_nagle_algorithm = True
+        server_version = "AmadeusStub/1.0"
+
+        def log_message(self, fmt: str, *args: Any) -> None:  # silencieux : pas d'E/S console sous charge
+            return
+
+        def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            raw = json.dumps(body, separators=(",", ":")).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/vnd.amadeus+json")
+            self.send_header("Content-Length", str(len(raw)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def _faults(self) -> bool:
+            """429 / 500 injectés ; True si une réponse d'erreur a été envoyée."""
+            if state.over_quota() or state.draw() < config.rate_429:
+                state.count("status_429")
+                self._send(429, _amadeus_error(429, 38194, "Too many requests"), {"Retry-After": "1"})
+                return True
+            if state.draw() < config.error_rate:
+                state.count("status_500")
+                self._send(500, _amadeus_error(500, 141, "SYSTEM ERROR HAS OCCURRED"))
+                return True
+            return False
+
+        def do_POST(self) -> None:
+            path = urlsplit(self.path).path
+            length = int(self.headers.get("Content-Length") or 0)
+            form = parse_qs(self.rfile.read(length).decode()) if length else {}
+            if path != "/v1/security/oauth2/token":
+                self._send(404, _amadeus_error(404, 38196, "Resource not found"))
+                return
+            delay = state.latency(config.token_latency)
+            time.sleep(delay)
+            state.count("token", ms=delay * 1000)
+            if (form.get("grant_type") or [""])[0] != "client_credentials":
+                self._send(400, {"error": "unsupported_grant_type"})
+                return
+            if self._faults():
+                return
+            self._send(200, {
+                "type": "amadeusOAuth2Token", "token_type": "Bearer",
+                "access_token": state.issue_token(), "expires_in": config.token_ttl, "state": "approved",
+            })
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            if url.path == "/_stats":
+                self._send(200, state.snapshot())
+                return
+            if url.path != "/v2/shopping/flight-offers":
+                self._send(404, _amadeus_error(404, 38196, "Resource not found"))
+                return
+            auth = self.headers.get("Authorization") or ""
+            if not auth.startswith("Bearer ") or not state.token_ok(auth[7:]):
+                state.count("status_401")
+                self._send(401, _amadeus_error(401, 38190, "Invalid access token"))
+                return
+            delay = state.latency(config.latency)
+            time.sleep(delay)
+            state.count("offers", ms=delay * 1000)
+            if self._faults():
+                return
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            state.count("status_200")
+            self._send(200, build_offers(params, config))
+
+    return Handler
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # rafales de connexions des workers sans refus
+
+
+def start(config: StubConfig, host: str = "127.0.0.1", port: int = 8765) -> StubServer:
+    """
+    Démarre la doublure dans un thread ; `server.shutdown()` pour l'arrêter.
+    `server.state.config` reste modifiable à chaud (taux d'erreur…) ; port 0 = port libre.
+    """
+    state = StubState(config)
+    server = StubServer((host, port), make_handler(state))
+    server.state = state  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, name="amadeus-stub", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=_latency_arg, default="lognormal:350,0.5", help="latence flight-offers")
+    ap.add_argument("--token-latency", type=_latency_arg, default="fixed:80", help="latence du token OAuth2")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="part de réponses 500")
+    ap.add_argument("--rate-429", type=float, default=0.0, help="part de réponses 429")
+    ap.add_argument("--max-rps", type=float, default=0.0, help="quota de requêtes/s (0 = illimité)")
+    ap.add_argument("--offers", type=_parse_range, default=(20, 50), help="offres par recherche, MIN-MAX")
+    ap.add_argument("--segments", type=int, default=3, help="segments max par offre")
+    ap.add_argument("--token-ttl", type=int, default=1799)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    config = StubConfig(
+        latency=args.latency, token_latency=args.token_latency, error_rate=args.error_rate,
+        rate_429=args.rate_429, max_rps=args.max_rps, offers=args.offers, segments=args.segments,
+        token_ttl=args.token_ttl, seed=args.seed,
+    )
+    server = StubServer((args.host, args.port), make_handler(StubState(config)))
+    print(f"doublure Amadeus sur http://{args.host}:{args.port} (Ctrl-C pour arrêter)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# backend/benchmarks/bench_jwt_cache.py
+"""
+Micro-benchmark : coût par requête de decode_bearer_token avec / sans cache des JWT vérifiés.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_jwt_cache [--tokens 50] [--rounds 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import timeit
+
+from jose import jwt
+
+from app.core.config import settings
+from app.core.security import decode_bearer_token, token_cache
+
+
+def _tokens(n: int) -> list:
+    now = int(time.time())
+    return [
+        jwt.encode(
+            {"sub": f"user{i}@example.com", "email": f"user{i}@example.com", "iat": now, "exp": now + 3600},
+            settings.AUTH_JWT_SECRET,
+            algorithm=settings.AUTH_JWT_ALG,
+        )
+        for i in range(n)
+    ]
+
+
+def _per_call_us(fn, rounds: int) -> float:
+    # meilleur de 5 répétitions, en microsecondes par appel
+    return min(timeit.repeat(fn, number=rounds, repeat=5)) / rounds * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tokens", type=int, default=50, help="nb de tokens distincts en rotation")
+    ap.add_argument("--rounds", type=int, default=20000, help="appels par mesure")
+    args = ap.parse_args()
+
+    tokens = _tokens(args.tokens)
+    state = {"i": 0}
+
+    def one_call() -> None:
+        state["i"] = (state["i"] + 1) % len(tokens)
+        decode_bearer_token(tokens[state["i"]])
+
+    def uncached() -> None:
+        token_cache.clear()
+        one_call()
+
+    cold = _per_call_us(uncached, max(1, args.rounds // 10))
+    token_cache.clear()
+    for t in tokens:
+        decode_bearer_token(t)
+    warm = _per_call_us(one_call, args.rounds)
+
+    print(f"decode_bearer_token sans cache : {cold:8.2f} µs/appel")
+    print(f"decode_bearer_token avec cache : {warm:8.2f} µs/appel")
+    print(f"gain                           : x{cold / warm:.1f} ({cold - warm:.2f} µs économisées par requête)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# backend/benchmarks/bench_tracing.py
+"""
+Micro-benchmark : surcoût de l'instrumentation (core/tracing.py), objectif < 1 % quand
+l'échantillonnage est coupé.
+
+1. Requête /calendar servie depuis le cache (cas le plus court, donc le plus défavorable en
+   proportion), appel ASGI direct sans client HTTP, instrumentation coupée → temps de référence.
+2. Cycle de vie de l'instrumentation d'une telle requête mesuré isolément (ouverture de la
+   trace, spans criteria / cache.get / encode, en-tête Server-Timing), sans et avec
+   échantillonnage → surcoût en µs, rapporté au temps de référence.
+   (Mesurer la différence de bout en bout noierait 1 % dans le bruit de l'ordonnanceur.)
+3. span() hors requête (tâches de fond) : coût au-delà d'un appel de fonction vide.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_tracing [--rounds 500]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+import timeit
+from urllib.parse import urlencode
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import Trace, _current, span
+from app.main import app
+
+PARAMS = {"origin": "PAR", "destination": "BCN", "month": "2031-06"}
+
+
+async def _request() -> None:
+    # appel ASGI direct (sans client HTTP) : seul le coût de l'app est mesuré
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/calendar", "raw_path": b"/calendar", "root_path": "",
+        "query_string": urlencode(PARAMS).encode(), "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    await app(scope, receive, send)
+
+
+async def _burst(rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        await _request()
+    return (time.perf_counter() - t0) / rounds * 1e6
+
+
+def _lifecycle(sampled: bool):
+    """Ce que l'instrumentation ajoute à un /calendar HIT, hors travail de la requête."""
+    headers = [(b"host", b"bench")]
+
+    def run() -> None:
+        trace = Trace("0" * 32, True) if sampled else tracing._start_trace(headers)
+        token = _current.set(trace)
+        start = time.perf_counter_ns()
+        for name in ("criteria", "cache.get", "encode"):
+            with span(name):
+                pass
+        value = trace.server_timing(time.perf_counter_ns() - start).encode("latin-1")
+        message = dict({"type": "http.response.start", "headers": headers}, headers=headers + [(b"server-timing", value)])
+        _current.reset(token)
+        if sampled:
+            tracing.to_otlp([trace])  # sérialisation faite par le thread d'export
+        return message
+
+    return run
+
+
+def _per_call_us(fn, rounds: int) -> float:
+    # meilleur de 5 répétitions, en microsecondes par appel
+    return min(timeit.repeat(fn, number=rounds, repeat=5)) / rounds * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=500, help="requêtes par mesure")
+    args = ap.parse_args()
+    logging.disable(logging.INFO)
+
+    asyncio.run(_request())  # remplit DAY:/CAL:
+    saved = settings.SERVER_TIMING
+    settings.SERVER_TIMING = False
+    request = min(asyncio.run(_burst(args.rounds)) for _ in range(5))
+    settings.SERVER_TIMING = saved
+
+    timing = _per_call_us(_lifecycle(False), 20000)
+    sampled = _per_call_us(_lifecycle(True), 20000)
+
+    def outside() -> None:
+        with span("cache.get"):
+            pass
+
+    def bare() -> None:
+        pass
+
+    n = 200000
+    noop = (min(timeit.repeat(outside, number=n, repeat=5)) - min(timeit.repeat(bare, number=n, repeat=5))) / n * 1e9
+
+    print(f"/calendar (HIT) sans instrumentation     : {request:8.1f} µs/requête")
+    print(f"+ Server-Timing (échantillonnage coupé)  : {timing:8.2f} µs/requête ({100 * timing / request:.2f} %)")
+    print(f"+ spans échantillonnés (export OTLP)     : {sampled:8.2f} µs/requête ({100 * sampled / request:.2f} %)")
+    print(f"span() hors requête (tâches de fond)     : {noop:8.1f} ns/appel (au-delà d'un appel vide)")
+
+
+if __name__ == "__main__":
+    main()
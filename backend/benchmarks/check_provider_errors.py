@@ -0,0 +1,94 @@
+# backend/benchmarks/check_provider_errors.py
+"""
+Vérifie le chemin « panne provider » de bout en bout, sur la doublure Amadeus locale
+(benchmarks/amadeus_stub.py, démarrée dans un thread sur un port libre) :
+
+- HTTP 500, 429 (avec Retry-After) et erreur de transport → providers.amadeus lève ProviderError
+  (au lieu de renvoyer [] comme un jour sans vol) ;
+- get_day_entry avec PROVIDERS=amadeus,dummy : réponse normale → TTL adaptatif ;
+  Amadeus en échec → offres du repli dummy gardées au plus CACHE_TTL_ERROR (classe "error").
+
+Code de sortie 1 au premier contrôle en échec.
+
+Usage (depuis backend/) :
+    python -m benchmarks.check_provider_errors
+"""
+from __future__ import annotations
+
+import os
+import sys
+from datetime import date as dt_date, timedelta
+from typing import Callable, List, Tuple
+
+from benchmarks.amadeus_stub import StubConfig, start
+
+# doublure sur un port libre, avant tout import de l'app (providers lus au chargement)
+_server = start(StubConfig(latency="none", token_latency="none"), port=0)
+os.environ.update(
+    PROVIDERS="amadeus,dummy",
+    AMADEUS_BASE_URL=f"http://127.0.0.1:{_server.server_address[1]}",
+    AMADEUS_CLIENT_ID="check",
+    AMADEUS_CLIENT_SECRET="check",
+    TTL_POLICY="adaptive",
+)
+
+from app.core.config import settings  # noqa: E402
+from app.services.calendar_aggregator import get_day_entry  # noqa: E402
+from providers import amadeus  # noqa: E402
+from providers.base import ProviderError  # noqa: E402
+
+
+def _day(offset: int) -> str:
+    return (dt_date.today() + timedelta(days=offset)).isoformat()
+
+
+def _raises(status: object, retry_after: object = None) -> Callable[[], Tuple[bool, str]]:
+    def check() -> Tuple[bool, str]:
+        try:
+            got = amadeus.get_day_flights("PAR", "BCN", _day(20), {"adults": 1})
+        except ProviderError as e:
+            ok = e.status == status and (retry_after is None or e.retry_after == retry_after)
+            return ok, f"ProviderError status={e.status} retry_after={e.retry_after}"
+        return False, f"pas d'exception ({len(got)} offres)"
+    return check
+
+
+def main() -> None:
+    config = _server.state.config  # type: ignore[attr-defined]
+    results: List[Tuple[str, bool, str]] = []
+
+    def run(name: str, check: Callable[[], Tuple[bool, str]]) -> None:
+        ok, detail = check()
+        results.append((name, ok, detail))
+        print(f"{'ok ' if ok else 'KO '} {name:<46} {detail}")
+
+    def healthy() -> Tuple[bool, str]:
+        entry = get_day_entry("PAR", "BCN", _day(30), {"adults": 1})
+        ttl = entry.ttl_remaining()
+        return bool(entry.value) and ttl > settings.CACHE_TTL_ERROR, f"{len(entry.value)} offres, TTL {ttl:.0f} s"
+
+    def degraded() -> Tuple[bool, str]:
+        entry = get_day_entry("PAR", "BCN", _day(31), {"adults": 1})
+        ttl = entry.ttl_remaining()
+        return bool(entry.value) and ttl <= settings.CACHE_TTL_ERROR, \
+            f"{len(entry.value)} offres (repli dummy), TTL {ttl:.0f} s"
+
+    run("réponse normale → TTL adaptatif", healthy)
+    config.error_rate = 1.0
+    run("HTTP 500 → ProviderError", _raises(500))
+    run("Amadeus en 500, repli dummy → TTL court", degraded)
+    config.error_rate, config.rate_429 = 0.0, 1.0
+    run("HTTP 429 → ProviderError + Retry-After", _raises(429, 1.0))
+    config.rate_429 = 0.0
+    _server.shutdown()
+    _server.server_close()
+    run("transport (connexion refusée) → ProviderError", _raises(None))
+
+    failed = [name for name, ok, _ in results if not ok]
+    print(f"\n{len(results) - len(failed)}/{len(results)} contrôles ok")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
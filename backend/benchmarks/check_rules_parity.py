@@ -0,0 +1,88 @@
+# backend/benchmarks/check_rules_parity.py
+"""
+Parité app/services/carrier_rules.py ↔ src/rules/applyRules.ts (ancien calcul du proxy Next).
+
+Rejoue benchmarks/fixtures/carrier_rules_parity.json : résultats de applyRules.ts (total,
+surcharges, avertissements, éligibilité) pour les règles livrées (backend/carriers.rules.json,
+identique à src/rules/carriers.rules.json) et un jeu partiel (blocs et champs absents → valeurs
+par défaut du TS), sur plusieurs compagnies, nombres de segments et compositions voyageurs.
+Code de sortie 1 au premier écart listé.
+
+Usage (depuis backend/) :
+    python -m benchmarks.check_rules_parity [--fixtures benchmarks/fixtures/carrier_rules_parity.json] [-v]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+from app.services.carrier_rules import RuleSet, apply_rules, carrier_rules, compile_rules
+
+_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "carrier_rules_parity.json")
+
+
+def _criteria(c: Dict[str, Any]) -> Dict[str, Any]:
+    """Critères TS → paramètres de requête tels que le backend les reçoit."""
+    out: Dict[str, Any] = {
+        "adults": c["adults"], "infants": c["infants"], "cabin": c["cabin"], "fareType": c["fareType"],
+        "bagsCabin": c["bagsCabin"], "bagsSoute": c["bagsSoute"], "currency": c["currency"],
+        "resident": int(c["resident"]), "um": int(c["um"]),
+    }
+    if c["childrenAges"]:
+        out["childrenAges"] = ",".join(str(a) for a in c["childrenAges"])
+    return out
+
+
+def check(path: str, verbose: bool = False) -> List[str]:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    rulesets: Dict[str, RuleSet] = {"shipped": carrier_rules.current}
+    for name, raw in data["rules"].items():
+        rulesets[name] = compile_rules(raw)
+
+    failures: List[str] = []
+    for case in data["cases"]:
+        criteria = data["criteria"][case["criteria"]]
+        flight = {"prix": case["baseFare"], "compagnie": case["carrier"], "escales": case["segments"] - 1}
+        got = apply_rules([flight], _criteria(criteria), rulesets[case["rules"]])
+        label = f"{case['rules']}:{case['carrier'] or '∅'} seg={case['segments']} critères#{case['criteria']}"
+        if not case["eligible"]:
+            ok = not got
+            detail = "vol retiré attendu (inéligible)" if not ok else ""
+        elif not got:
+            ok, detail = False, "vol retiré, éligible côté TS"
+        else:
+            g = got[0]
+            surcharges = [[s["code"], s["amount"]] for s in g["rules"]["surcharges"]]
+            ok = g["prix"] == case["total"] and surcharges == case["surcharges"] and g["rules"]["warnings"] == case["warnings"]
+            detail = f"TS total={case['total']} {case['surcharges']} ; backend prix={g['prix']} {surcharges}"
+        if not ok:
+            failures.append(f"{label} : {detail}")
+        elif verbose:
+            print(f"ok  {label}")
+    return failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--fixtures", default=_FIXTURES)
+    ap.add_argument("-v", dest="verbose", action="store_true")
+    args = ap.parse_args()
+
+    if not carrier_rules.loaded:
+        sys.exit(f"règles compagnies non chargées : {carrier_rules.path}")
+    failures = check(args.fixtures, args.verbose)
+    with open(args.fixtures, encoding="utf-8") as fh:
+        total = len(json.load(fh)["cases"])
+    for f in failures:
+        print(f"ÉCART {f}")
+    print(f"{total - len(failures)}/{total} cas identiques à applyRules.ts")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
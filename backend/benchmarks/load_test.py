@@ -0,0 +1,309 @@
+# backend/benchmarks/load_test.py
+"""
+Test de charge : trafic mixte /search + /calendar à concurrence donnée, latences p50/p95/p99
+et débit, pour dimensionner workers uvicorn et threadpool.
+
+Cible : une app déjà lancée (--url), de préférence sur la doublure Amadeus
+(benchmarks/amadeus_stub.py, jamais la vraie API), ou --spawn N qui lance elle-même la doublure
+et `uvicorn app.main:app --workers N` pointé dessus, puis les arrête.
+
+Trafic : routes tirées en loi de Zipf (--routes), départs à J+1..J+--horizon (surtout à court
+terme), 1 ou 2 adultes, direct une fois sur cinq ; /calendar sur le mois du départ tiré.
+Chaque thread client garde sa connexion (requests.Session). Les --warmup premières secondes
+ne sont pas comptées. Avec la doublure, ses compteurs (appels flight-offers, 429, 500) sont
+relevés avant / après ; les erreurs amont injectées sont résumées à part : le provider les lève
+(ProviderError) et l'app sert le jour concerné en 200 — vide ou repli — avec un TTL court
+(CACHE_TTL_ERROR), elles n'apparaissent donc pas dans les statuts côté client.
+
+Usage (depuis backend/) :
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 [--concurrency 32] [--duration 60]
+                                   [--mix search=0.7,calendar=0.3] [--stub-url http://127.0.0.1:8765]
+    python -m benchmarks.load_test --spawn 4 --concurrency 32 --duration 60 \\
+                                   --stub-args "--latency lognormal:350,0.5 --rate-429 0.02"
+    python -m benchmarks.load_test ... --json resultats.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from datetime import date as dt_date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+_AIRPORTS = ["PAR", "BCN", "LON", "MAD", "ROM", "LIS", "BER", "AMS", "NCE", "MRS", "TLS", "BOD",
+             "NAP", "ATH", "DUB", "PRG", "VIE", "OPO", "PMI", "AGP", "FCO", "MXP", "BRU", "CPH"]
+
+Sample = Tuple[str, float, int]  # (endpoint, latence ms, statut HTTP ; 0 = exception client)
+
+
+def _parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("search", "calendar"):
+            raise argparse.ArgumentTypeError(f"endpoint inconnu '{name}' (search|calendar)")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"poids invalide dans '{part}'")
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("mix vide")
+    return mix
+
+
+class Traffic:
+    """Générateur de requêtes (une instance par thread client : pas de verrou)."""
+
+    def __init__(self, seed: int, routes: int, horizon: int, mix: Dict[str, float]) -> None:
+        self.rnd = random.Random(seed)
+        pairs = [(a, b) for a in _AIRPORTS for b in _AIRPORTS if a != b]
+        random.Random(0).shuffle(pairs)  # mêmes routes pour tous les threads
+        self.pairs = pairs[:routes]
+        self.weights = [1.0 / (i + 1) for i in range(len(self.pairs))]  # Zipf s=1
+        self.horizon = max(1, horizon)
+        self.kinds = list(mix)
+        self.kind_weights = [mix[k] for k in self.kinds]
+
+    def next(self) -> Tuple[str, str, Dict[str, Any]]:
+        rnd = self.rnd
+        origin, destination = rnd.choices(self.pairs, self.weights)[0]
+        days_out = 1 + min(self.horizon - 1, int(rnd.expovariate(1 / 30.0)))
+        day = dt_date.today() + timedelta(days=days_out)
+        params: Dict[str, Any] = {"origin": origin, "destination": destination}
+        if rnd.random() < 0.25:
+            params["adults"] = 2
+        if rnd.random() < 0.2:
+            params["direct"] = 1
+        kind = rnd.choices(self.kinds, self.kind_weights)[0]
+        if kind == "calendar":
+            params["month"] = day.strftime("%Y-%m")
+            return kind, "/calendar", params
+        params["date"] = day.isoformat()
+        return kind, "/search", params
+
+
+def _client(
+    base_url: str, traffic: Traffic, start_at: float, stop_at: float, budget: Optional[List[int]],
+    lock: threading.Lock, out: List[Sample], timeout: float,
+) -> None:
+    session = requests.Session()
+    samples: List[Sample] = []
+    while True:
+        if budget is not None:
+            with lock:
+                if budget[0] <= 0:
+                    break
+                budget[0] -= 1
+        if time.perf_counter() >= stop_at:
+            break
+        kind, path, params = traffic.next()
+        t0 = time.perf_counter()
+        try:
+            status = session.get(base_url + path, params=params, timeout=timeout).status_code
+        except requests.RequestException:
+            status = 0
+        if t0 >= start_at:
+            samples.append((kind, (time.perf_counter() - t0) * 1000, status))
+    session.close()
+    with lock:
+        out.extend(samples)
+
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    """Rang le plus proche (q dans [0, 100])."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(q / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Dict[str, Any]]:
+    groups: Dict[str, List[Sample]] = {"total": samples}
+    for s in samples:
+        groups.setdefault(s[0], []).append(s)
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, group in groups.items():
+        lat = sorted(s[1] for s in group)
+        statuses: Dict[str, int] = {}
+        for s in group:
+            statuses[str(s[2])] = statuses.get(str(s[2]), 0) + 1
+        out[name] = {
+            "requests": len(group),
+            "rps": len(group) / elapsed if elapsed > 0 else 0.0,
+            "errors": sum(1 for s in group if not 200 <= s[2] < 400),
+            "p50_ms": percentile(lat, 50),
+            "p95_ms": percentile(lat, 95),
+            "p99_ms": percentile(lat, 99),
+            "max_ms": lat[-1] if lat else 0.0,
+            "statuses": statuses,
+        }
+    return out
+
+
+def _stub_stats(stub_url: Optional[str]) -> Dict[str, int]:
+    if not stub_url:
+        return {}
+    try:
+        return requests.get(stub_url.rstrip("/") + "/_stats", timeout=5).json()
+    except requests.RequestException:
+        return {}
+
+
+def upstream_errors(upstream: Dict[str, int]) -> Dict[str, Any]:
+    """Erreurs injectées par la doublure (token + flight-offers) rapportées aux appels reçus."""
+    calls = upstream.get("offers", 0) + upstream.get("token", 0)
+    by_status = {k: upstream.get(k, 0) for k in ("status_429", "status_500", "status_401")}
+    errors = by_status["status_429"] + by_status["status_500"]
+    return {"calls": calls, "errors": errors, "rate": errors / calls if calls else 0.0, **by_status}
+
+
+def _wait_up(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"processus arrêté au démarrage (code {proc.returncode}) : {' '.join(proc.args)}")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise SystemExit(f"{url} ne répond pas après {timeout:.0f} s")
+
+
+def spawn(workers: int, app_port: int, stub_port: int, stub_args: str) -> List[subprocess.Popen]:
+    """Doublure Amadeus + uvicorn --workers N pointé dessus (sous-processus, depuis backend/)."""
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.amadeus_stub", "--port", str(stub_port), *shlex.split(stub_args)],
+    )
+    _wait_up(stub_url + "/_stats", stub)
+    env = dict(
+        os.environ,
+        PROVIDERS="amadeus",
+        AMADEUS_BASE_URL=stub_url,
+        AMADEUS_CLIENT_ID="load-test",  # jamais les vraies clés vers la doublure
+        AMADEUS_CLIENT_SECRET="load-test",
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(app_port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        _wait_up(f"http://127.0.0.1:{app_port}/api/ping", app)
+    except SystemExit:
+        stub.terminate()
+        raise
+    return [app, stub]
+
+
+def run(
+    base_url: str, concurrency: int, duration: float, warmup: float, requests_total: Optional[int],
+    mix: Dict[str, float], routes: int, horizon: int, seed: int, timeout: float,
+) -> Tuple[List[Sample], float]:
+    lock = threading.Lock()
+    samples: List[Sample] = []
+    budget = [requests_total] if requests_total else None
+    t0 = time.perf_counter()
+    if budget is not None:  # --requests : ni limite de durée ni échauffement
+        start_at, stop_at = t0, float("inf")
+    else:
+        start_at = t0 + warmup
+        stop_at = start_at + duration
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(base_url.rstrip("/"), Traffic(seed + i, routes, horizon, mix), start_at, stop_at, budget,
+                  lock, samples, timeout),
+            name=f"load-{i}", daemon=True,
+        )
+        for i in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start_at
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://127.0.0.1:8000", help="app à charger (ignoré avec --spawn)")
+    ap.add_argument("--concurrency", type=int, default=16, help="clients simultanés (threads)")
+    ap.add_argument("--duration", type=float, default=30.0, help="secondes mesurées")
+    ap.add_argument("--warmup", type=float, default=5.0, help="secondes non comptées au début")
+    ap.add_argument("--requests", type=int, help="nb total de requêtes (remplace --duration/--warmup)")
+    ap.add_argument("--mix", type=_parse_mix, default=_parse_mix("search=0.7,calendar=0.3"))
+    ap.add_argument("--routes", type=int, default=30)
+    ap.add_argument("--horizon", type=int, default=180, help="départ au plus tard à J+N")
+    ap.add_argument("--timeout", type=float, default=60.0, help="timeout client par requête (s)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--stub-url", help="doublure Amadeus dont relever les compteurs")
+    ap.add_argument("--spawn", type=int, metavar="WORKERS", help="lance doublure + uvicorn --workers N")
+    ap.add_argument("--app-port", type=int, default=8800)
+    ap.add_argument("--stub-port", type=int, default=8765)
+    ap.add_argument("--stub-args", default="", help="options de benchmarks.amadeus_stub (avec --spawn)")
+    ap.add_argument("--json", help="écrit le résumé (JSON)")
+    args = ap.parse_args()
+
+    procs: List[subprocess.Popen] = []
+    base_url, stub_url = args.url, args.stub_url
+    if args.spawn:
+        procs = spawn(args.spawn, args.app_port, args.stub_port, args.stub_args)
+        base_url, stub_url = f"http://127.0.0.1:{args.app_port}", f"http://127.0.0.1:{args.stub_port}"
+    try:
+        before = _stub_stats(stub_url)
+        samples, elapsed = run(
+            base_url, args.concurrency, args.duration, args.warmup, args.requests, args.mix,
+            args.routes, args.horizon, args.seed, args.timeout,
+        )
+        after = _stub_stats(stub_url)
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.wait(10)
+
+    summary = summarize(samples, elapsed)
+    upstream = {k: after.get(k, 0) - before.get(k, 0) for k in sorted(after)} if after else {}
+    upstream_err = upstream_errors(upstream) if upstream else {}
+
+    print(f"{base_url} — concurrence {args.concurrency}, {elapsed:.1f} s mesurées"
+          + (f", {args.spawn} worker(s)" if args.spawn else ""))
+    print(f"{'endpoint':<10} {'requêtes':>9} {'req/s':>8} {'erreurs':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}")
+    for name in ("search", "calendar", "total"):
+        r = summary.get(name)
+        if r is None:
+            continue
+        print(f"{name:<10} {r['requests']:>9} {r['rps']:>8.1f} {r['errors']:>8} {r['p50_ms']:>9.1f} "
+              f"{r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f}")
+    if summary["total"]["errors"]:
+        print(f"statuts : {summary['total']['statuses']}  (0 = exception client : timeout, connexion)")
+    if upstream:
+        print("doublure Amadeus : " + ", ".join(f"{k}={v}" for k, v in upstream.items() if k != "latency_ms_total"))
+        e = upstream_err
+        print(f"erreurs amont : {e['errors']}/{e['calls']} appels ({e['rate']:.1%}) — 429={e['status_429']}, "
+              f"500={e['status_500']}, 401={e['status_401']} ; ProviderError côté app, jours en TTL court")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({
+                "url": base_url, "concurrency": args.concurrency, "workers": args.spawn,
+                "elapsed_s": elapsed, "mix": args.mix, "results": summary, "upstream": upstream, "upstream_errors": upstream_err,
+            }, fh, indent=2)
+        print(f"→ {args.json}")
+
+
+if __name__ == "__main__":
+    main()
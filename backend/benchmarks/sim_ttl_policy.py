@@ -0,0 +1,197 @@
+# backend/benchmarks/sim_ttl_policy.py
+"""
+Simulation : appels provider et fraîcheur servie selon la politique de TTL des entrées DAY:
+("fixed" = CACHE_TTL_DAY partout, "adaptive" = app/services/ttl_policy.py).
+
+Rejoue un journal de requêtes /search (JSONL, une requête par ligne) :
+    {"t": 1735689600.0, "origin": "PAR", "destination": "BCN", "date": "2025-03-14"}
+ou, sans --log, un journal synthétique (routes en loi de Zipf, départs de J+0 à J+300).
+
+Les réponses provider sont simulées (marché synthétique, graine fixe) : prix qui bouge d'autant
+plus souvent que le départ est proche, pannes provider avec une probabilité --error-rate.
+Horloge virtuelle : 200 000 requêtes (une journée) se rejouent en une vingtaine de secondes.
+
+Usage (depuis backend/) :
+    python -m benchmarks.sim_ttl_policy [--requests 200000] [--hours 24] [--routes 100] [--error-rate 0.02]
+    python -m benchmarks.sim_ttl_policy --log requetes.jsonl
+    python -m benchmarks.sim_ttl_policy --write-log requetes.jsonl   # journal synthétique
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import zlib
+from datetime import date as dt_date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.cache import CACHE_TTL_CALENDAR, CACHE_TTL_DAY
+from app.services.popularity import PopularityTracker
+from app.services.ttl_policy import RESULT_EMPTY, RESULT_ERROR, RESULT_OK, TtlPolicy, VolatilityTracker
+
+Request = Tuple[float, str, str, str]  # (t, origin, destination, date)
+
+_START = datetime(2025, 1, 6, tzinfo=timezone.utc).timestamp()
+_AIRPORTS = ["PAR", "BCN", "LON", "MAD", "ROM", "LIS", "BER", "AMS", "NCE", "MRS", "TLS", "BOD",
+             "NAP", "ATH", "DUB", "PRG", "VIE", "OPO", "PMI", "AGP", "FCO", "MXP", "BRU", "CPH"]
+
+
+def synthetic_log(n: int, hours: float, routes: int, seed: int) -> List[Request]:
+    rnd = random.Random(seed)
+    pairs = [(a, b) for a in _AIRPORTS for b in _AIRPORTS if a != b]
+    rnd.shuffle(pairs)
+    pairs = pairs[:routes]
+    weights = [1.0 / (i + 1) for i in range(len(pairs))]  # Zipf s=1
+    span = hours * 3600.0
+    out: List[Request] = []
+    for t in sorted(rnd.uniform(0, span) for _ in range(n)):
+        origin, destination = rnd.choices(pairs, weights)[0]
+        # départs : beaucoup à court terme, longue traîne jusqu'à ~10 mois
+        days_out = min(300, int(rnd.expovariate(1 / 45.0)))
+        today = datetime.fromtimestamp(_START + t, timezone.utc).date()
+        out.append((_START + t, origin, destination, (today + timedelta(days=days_out)).isoformat()))
+    return out
+
+
+def read_log(path: str) -> Iterator[Request]:
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            r = json.loads(line)
+            yield float(r["t"]), r["origin"].upper(), r["destination"].upper(), r["date"]
+
+
+class Market:
+    """Prix « vrai » par (route, jour) : marche aléatoire à sauts poissonniens, déterministe par clé."""
+
+    def __init__(self, seed: int, error_rate: float) -> None:
+        self.seed = seed
+        self.error_rate = error_rate
+        self._rnd = random.Random(seed ^ 0xFA11)
+        self._state: Dict[str, Tuple[float, int, random.Random]] = {}
+
+    @staticmethod
+    def change_rate(days_out: int) -> float:
+        """Changements de prix par heure : ~2/h la veille, ~1/jour à 6 mois et au-delà."""
+        return max(1 / 24.0, 2.0 * math.exp(-days_out / 20.0))
+
+    def price(self, key: str, t: float, days_out: int) -> int:
+        last_t, price, rnd = self._state.get(key) or (t, 0, random.Random(f"{self.seed}:{key}"))
+        if not price:
+            price = rnd.randint(40, 400)
+        lam = self.change_rate(days_out) / 3600.0
+        while True:
+            last_t += rnd.expovariate(lam)
+            if last_t > t:
+                break  # prochain saut après t (sans mémoire : on repartira de t)
+            price = max(20, int(price * rnd.uniform(0.85, 1.15)))
+        self._state[key] = (t, price, rnd)
+        return price
+
+    def call(self, key: str, t: float, days_out: int) -> Tuple[str, Optional[int]]:
+        if self._rnd.random() < self.error_rate:
+            return RESULT_ERROR, None
+        if zlib.crc32(f"{self.seed}:{key}".encode()) % 50 == 0:
+            return RESULT_EMPTY, None  # route sans vol ce jour-là
+        return RESULT_OK, self.price(key, t, days_out)
+
+
+def simulate(name: str, policy: TtlPolicy, requests: Iterable[Request], seed: int, error_rate: float) -> Dict[str, float]:
+    market = Market(seed, error_rate)
+    pop = PopularityTracker(settings.POPULARITY_SKETCH_WIDTH, settings.POPULARITY_SKETCH_DEPTH, 4 * settings.PREFETCH_TOP_N)
+    vol = VolatilityTracker()
+    cache: Dict[str, Tuple[float, str, Optional[int]]] = {}
+    next_decay = None
+    n = calls = hits = stale = errors_served = 0
+    ttl_sum = 0.0
+
+    for t, origin, destination, day in requests:
+        n += 1
+        if next_decay is None:
+            next_decay = t + settings.PREFETCH_INTERVAL
+        while t >= next_decay:
+            pop.decay(settings.POPULARITY_DECAY)
+            next_decay += settings.PREFETCH_INTERVAL
+        today = datetime.fromtimestamp(t, timezone.utc).date()
+        days_out = (dt_date.fromisoformat(day) - today).days
+        key = f"{origin}:{destination}:{day}"
+        pop.record("day", origin, destination, day, None)
+
+        cached = cache.get(key)
+        if cached is not None and cached[0] > t:
+            hits += 1
+            _, result, price = cached
+            if result == RESULT_ERROR:
+                errors_served += 1
+            elif result == RESULT_OK and price != market.price(key, t, days_out):
+                stale += 1
+            continue
+
+        calls += 1
+        result, price = market.call(key, t, days_out)
+        if result == RESULT_OK:
+            vol.observe(key, price)
+        else:
+            errors_served += result == RESULT_ERROR
+        ttl = policy.day_ttl(days_out, result, pop.estimate("day", origin, destination, day, None), vol.volatility(key))
+        ttl_sum += ttl
+        cache[key] = (t + ttl, result, price)
+
+    return {
+        "policy": name,
+        "requests": n,
+        "calls": calls,
+        "hit_ratio": hits / n if n else 0.0,
+        "stale_pct": 100.0 * stale / hits if hits else 0.0,
+        "errors_served": errors_served,
+        "mean_ttl": ttl_sum / calls if calls else 0.0,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--log", help="journal JSONL à rejouer (sinon journal synthétique)")
+    ap.add_argument("--write-log", help="écrit le journal synthétique puis s'arrête")
+    ap.add_argument("--requests", type=int, default=200000)
+    ap.add_argument("--hours", type=float, default=24.0)
+    ap.add_argument("--routes", type=int, default=100)
+    ap.add_argument("--error-rate", type=float, default=0.02, help="probabilité d'échec d'un appel provider")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    if args.log:
+        requests = list(read_log(args.log))
+    else:
+        requests = synthetic_log(args.requests, args.hours, args.routes, args.seed)
+    if args.write_log:
+        with open(args.write_log, "w", encoding="utf-8") as fh:
+            for t, o, d, day in requests:
+                fh.write(json.dumps({"t": t, "origin": o, "destination": d, "date": day}) + "\n")
+        print(f"{len(requests)} requêtes écrites dans {args.write_log}")
+        return
+
+    common = dict(
+        day_ttl=CACHE_TTL_DAY, calendar_ttl=CACHE_TTL_CALENDAR, error_ttl=settings.CACHE_TTL_ERROR,
+        empty_ttl=settings.CACHE_TTL_EMPTY, max_ttl=settings.CACHE_TTL_MAX,
+    )
+    rows = [
+        simulate(mode, TtlPolicy(mode, **common), requests, args.seed, args.error_rate)
+        for mode in ("fixed", "adaptive")
+    ]
+
+    print(f"{'politique':<10} {'requêtes':>9} {'appels':>8} {'hit %':>7} {'hits périmés %':>15} "
+          f"{'erreurs servies':>16} {'TTL moyen s':>12}")
+    for r in rows:
+        print(f"{r['policy']:<10} {r['requests']:>9} {r['calls']:>8} {100 * r['hit_ratio']:>7.1f} "
+              f"{r['stale_pct']:>15.1f} {r['errors_served']:>16} {r['mean_ttl']:>12.0f}")
+    base, new = rows
+    if base["calls"]:
+        print(f"appels provider : {new['calls'] - base['calls']:+d} ({100 * (new['calls'] / base['calls'] - 1):+.1f} %)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+# backend/benchmarks/suite.py
+"""
+Suite de benchmarks des chemins chauds du backend, hors ligne (provider dummy uniquement),
+avec baselines JSON et détection de régressions.
+
+Couvre : normalize_criteria / normalize_flight / sanitize_price, providers.dummy.get_day_flights,
+InMemoryCache get/set sous contention (1, 4, 8 threads), build_month à froid et à chaud,
+/search et /calendar de bout en bout (TestClient FastAPI, cache froid et chaud).
+
+Usage (depuis backend/) :
+    python -m benchmarks.suite run [-k cache] [--quick] [--out resultats.json]
+    python -m benchmarks.suite run --save-baseline            # → benchmarks/baselines/local.json
+    python -m benchmarks.suite compare [--baseline benchmarks/baselines/local.json]
+                                       [--current resultats.json] [--threshold 0.2] [--metric min]
+                                       [--raw]
+
+`compare` sans --current relance la suite ; code de sortie 1 si une régression dépasse le seuil
+(temps par opération > baseline × (1 + seuil)). Une charge de calibration fixe, intercalée entre
+les répétitions de chaque benchmark, ramène les temps à la vitesse machine de la baseline
+(--raw : temps bruts) ; les écarts entre machines
+différentes restent approximatifs : régénérer une baseline locale avant de comparer
+(baselines/reference.json = machine d'origine, utilisée par défaut tant que local.json n'existe pas).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("PROVIDERS", "dummy")  # hors ligne, avant tout import de l'app
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services.cache import InMemoryCache, cache  # noqa: E402
+from app.services.calendar_aggregator import build_month  # noqa: E402
+from app.services.normalize import normalize_criteria, normalize_flight, sanitize_price  # noqa: E402
+from providers import dummy  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# nom → (fabrique de l'opération mesurée, appels par mesure)
+Bench = Callable[[], Callable[[], Any]]
+BENCHMARKS: Dict[str, Tuple[Bench, int]] = {}
+
+
+def bench(name: str, number: int) -> Callable[[Bench], Bench]:
+    def deco(fn: Bench) -> Bench:
+        BENCHMARKS[name] = (fn, number)
+        return fn
+    return deco
+
+
+def _queries(n: int) -> List[Dict[str, Any]]:
+    cabins = ["", "eco", "premium", "business"]
+    return [
+        {"adults": 1 + i % 3, "childrenAges": "5,9" if i % 4 == 0 else None, "infants": i % 2,
+         "cabin": cabins[i % 4], "direct": i % 2, "bagsSoute": i % 3, "pets": int(i % 7 == 0)}
+        for i in range(n)
+    ]
+
+
+def _rotate(items: List[Any]) -> Callable[[], Any]:
+    state = {"i": -1}
+
+    def nxt() -> Any:
+        state["i"] = (state["i"] + 1) % len(items)
+        return items[state["i"]]
+    return nxt
+
+
+# ---------------------------------------------------------------------------
+# Normalisation
+# ---------------------------------------------------------------------------
+
+@bench("normalize.criteria", number=2000)
+def _normalize_criteria():
+    nxt = _rotate(_queries(64))
+    return lambda: normalize_criteria(nxt())
+
+
+@bench("normalize.flight", number=2000)
+def _normalize_flight():
+    criteria = normalize_criteria({})
+    raws = dummy.get_day_flights("PAR", "BCN", "2031-06-12", criteria)
+    nxt = _rotate(raws)
+    return lambda: normalize_flight(nxt(), criteria)
+
+
+@bench("normalize.sanitize_price", number=20000)
+def _sanitize_price():
+    nxt = _rotate([129, 87.4, "212.50", 0, -3, float("nan"), None, "n/a", 1e4])
+    return lambda: sanitize_price(nxt())
+
+
+# ---------------------------------------------------------------------------
+# Provider dummy
+# ---------------------------------------------------------------------------
+
+@bench("provider.dummy.get_day_flights", number=500)
+def _dummy_day():
+    criteria = normalize_criteria({"adults": 2, "cabin": "eco"})
+    nxt = _rotate([f"2031-{m:02d}-{d:02d}" for m in range(1, 13) for d in range(1, 29)])
+    return lambda: dummy.get_day_flights("PAR", "BCN", nxt(), criteria)
+
+
+# ---------------------------------------------------------------------------
+# Cache mémoire sous contention : temps par opération (get ×4 / set ×1) tous threads confondus
+# ---------------------------------------------------------------------------
+
+def _contention(threads: int, ops: int = 20000) -> Callable[[], Any]:
+    local = InMemoryCache()
+    keys = [f"DAY:PAR:BCN:2031-06-{d:02d}:bench" for d in range(1, 29)]
+    for k in keys:
+        local.set(k, [k], 600)
+    per_thread = ops // threads
+
+    def worker(offset: int) -> None:
+        for i in range(per_thread):
+            k = keys[(offset + i) % len(keys)]
+            if i % 5 == 4:
+                local.set(k, [k, i % 3], 600)
+            else:
+                local.get_entry(k)
+
+    def run() -> None:
+        pool = [threading.Thread(target=worker, args=(t * 7,)) for t in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+    # une mesure = `ops` opérations ; normalisé par opération au moment du rapport
+    run.ops = per_thread * threads  # type: ignore[attr-defined]
+    return run
+
+
+for _n in (1, 4, 8):
+    BENCHMARKS[f"cache.contention.t{_n}"] = ((lambda n=_n: _contention(n)), 1)
+
+
+# ---------------------------------------------------------------------------
+# build_month
+# ---------------------------------------------------------------------------
+
+@bench("build_month.cold", number=5)
+def _build_month_cold():
+    criteria = normalize_criteria({})
+
+    def run() -> None:
+        cache.clear()
+        build_month("PAR", "BCN", "2031-06", criteria)
+    return run
+
+
+@bench("build_month.warm", number=50)
+def _build_month_warm():
+    criteria = normalize_criteria({})
+    cache.clear()
+    build_month("PAR", "BCN", "2031-06", criteria)
+    return lambda: build_month("PAR", "BCN", "2031-06", criteria)
+
+
+# ---------------------------------------------------------------------------
+# Bout en bout (TestClient : routage, validation, sérialisation, middlewares)
+# ---------------------------------------------------------------------------
+
+_client: Optional[TestClient] = None
+
+
+def _http() -> TestClient:
+    global _client
+    if _client is None:
+        _client = TestClient(app)  # sans `with` : ni init_db ni tâches de fond
+    return _client
+
+
+def _get(path: str, params: Dict[str, Any]) -> None:
+    r = _http().get(path, params=params)
+    if r.status_code != 200:
+        raise RuntimeError(f"{path} → HTTP {r.status_code}: {r.text[:200]}")
+
+
+@bench("e2e.search.cold", number=50)
+def _search_cold():
+    nxt = _rotate([f"2031-07-{d:02d}" for d in range(1, 29)])
+
+    def run() -> None:
+        cache.clear()
+        _get("/search", {"origin": "PAR", "destination": "BCN", "date": nxt(), "limit": 20})
+    return run
+
+
+@bench("e2e.search.warm", number=300)
+def _search_warm():
+    params = {"origin": "PAR", "destination": "BCN", "date": "2031-07-14", "limit": 20, "sort": "best"}
+    _get("/search", params)
+    return lambda: _get("/search", params)
+
+
+@bench("e2e.calendar.cold", number=5)
+def _calendar_cold():
+    def run() -> None:
+        cache.clear()
+        _get("/calendar", {"origin": "PAR", "destination": "LIS", "month": "2031-08"})
+    return run
+
+
+@bench("e2e.calendar.warm", number=300)
+def _calendar_warm():
+    params = {"origin": "PAR", "destination": "LIS", "month": "2031-08"}
+    _get("/calendar", params)
+    return lambda: _get("/calendar", params)
+
+
+# ---------------------------------------------------------------------------
+# Exécution, baselines, comparaison
+# ---------------------------------------------------------------------------
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _calibration() -> None:
+    """Charge fixe en pur Python (dicts, chaînes, appels) : vitesse de la machine au moment de la mesure."""
+    d: Dict[str, int] = {}
+    for i in range(400):
+        k = f"k{i % 97}"
+        d[k] = d.get(k, 0) + len(k)
+    sorted(d.items())
+
+
+def run_suite(pattern: str = "", repeat: int = 7, quick: bool = False) -> Dict[str, Any]:
+    logging.disable(logging.INFO)  # le cache journalise chaque HIT/MISS : hors mesure
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, (factory, number) in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        number = max(1, number // 10) if quick else number
+        op = factory()
+        op()  # échauffement
+        # calibration intercalée entre les répétitions : même état de la machine que la mesure
+        times, calib = [], []
+        for _ in range(repeat):
+            calib.append(timeit.timeit(_calibration, number=50) / 50 * 1e6)
+            times.append(timeit.timeit(op, number=number))
+        ops = number * getattr(op, "ops", 1)
+        per_op = [t / ops * 1e6 for t in times]
+        results[name] = {
+            "min_us": round(min(per_op), 3),
+            "median_us": round(statistics.median(per_op), 3),
+            "calibration_us": round(min(calib), 3),
+            "ops": ops,
+            "repeat": repeat,
+        }
+        print(f"{name:<34} {results[name]['median_us']:>12.2f} µs  (min {results[name]['min_us']:.2f})", flush=True)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, metric: str, pattern: str = "",
+    normalize: bool = True,
+) -> List[str]:
+    """
+    Affiche la comparaison ; renvoie les noms des benchmarks en régression.
+    Temps actuels ramenés à la vitesse machine de la baseline (rapport des calibrations
+    mesurées à côté de chaque benchmark) : une machine partagée plus lente au moment de la
+    mesure n'est pas une régression du code. normalize=False : temps bruts.
+    """
+    key = f"{metric}_us"
+    regressions: List[str] = []
+    print(f"{'benchmark':<34} {'baseline':>12} {'actuel':>12} {'écart':>9}")
+    for name, raw in current["results"].items():
+        base = baseline["results"].get(name)
+        scale = 1.0
+        if normalize and base is not None and base.get("calibration_us") and raw.get("calibration_us"):
+            scale = base["calibration_us"] / raw["calibration_us"]
+        cur = {key: raw[key] * scale}
+        if base is None:
+            print(f"{name:<34} {'—':>12} {cur[key]:>12.2f} {'nouveau':>9}")
+            continue
+        delta = cur[key] / base[key] - 1 if base[key] else 0.0
+        flag = ""
+        if delta > threshold:
+            flag = "  RÉGRESSION"
+            regressions.append(name)
+        elif delta < -threshold:
+            flag = "  amélioration"
+        print(f"{name:<34} {base[key]:>12.2f} {cur[key]:>12.2f} {100 * delta:>+8.1f}%{flag}")
+    for name in sorted(baseline["results"].keys() - current["results"].keys()):
+        if pattern and pattern not in name:
+            continue
+        print(f"{name:<34} {baseline['results'][name][key]:>12.2f} {'—':>12} {'absent':>9}")
+    return regressions
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _baseline_path(path: Optional[str]) -> str:
+    """--baseline explicite, sinon local.json (run --save-baseline), sinon reference.json livrée."""
+    if path:
+        if not os.path.exists(path):
+            sys.exit(f"baseline introuvable : {path}")
+        return path
+    local = os.path.join(BASELINE_DIR, "local.json")
+    if os.path.exists(local):
+        return local
+    reference = os.path.join(BASELINE_DIR, "reference.json")
+    print(f"pas de baseline locale ({local}) : comparaison à {reference} (autre machine, écarts approximatifs ;"
+          " `run --save-baseline` pour en créer une)")
+    return reference
+
+
+def _save(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+    print(f"→ {path}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    def common(p: argparse.ArgumentParser) -> None:
+        p.add_argument("-k", dest="pattern", default="", help="ne lancer que les benchmarks contenant ce texte")
+        p.add_argument("--repeat", type=int, default=7)
+        p.add_argument("--quick", action="store_true", help="10× moins d'appels par mesure")
+
+    run_p = sub.add_parser("run", help="lance la suite")
+    common(run_p)
+    run_p.add_argument("--out", help="écrit les résultats (JSON)")
+    run_p.add_argument("--save-baseline", nargs="?", const="local", metavar="NOM",
+                       help="écrit benchmarks/baselines/NOM.json (défaut: local)")
+
+    cmp_p = sub.add_parser("compare", help="compare à une baseline ; code 1 si régression")
+    common(cmp_p)
+    cmp_p.add_argument("--baseline", help="défaut : baselines/local.json s'il existe, sinon baselines/reference.json")
+    cmp_p.add_argument("--current", help="résultats déjà mesurés (sinon la suite est relancée)")
+    cmp_p.add_argument("--threshold", type=float, default=0.2, help="écart toléré (0.2 = +20 %%)")
+    cmp_p.add_argument("--metric", choices=("min", "median"), default="min")
+    cmp_p.add_argument("--raw", action="store_true", help="sans normalisation par la calibration")
+
+    args = ap.parse_args()
+    if args.cmd == "run":
+        data = run_suite(args.pattern, args.repeat, args.quick)
+        if args.out:
+            _save(args.out, data)
+        if args.save_baseline:
+            _save(os.path.join(BASELINE_DIR, f"{args.save_baseline}.json"), data)
+        return
+
+    baseline = _load(_baseline_path(args.baseline))
+    current = _load(args.current) if args.current else run_suite(args.pattern, args.repeat, args.quick)
+    print()
+    regressions = compare(baseline, current, args.threshold, args.metric, args.pattern, not args.raw)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) > {100 * args.threshold:.0f} % : {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\naucune régression > {100 * args.threshold:.0f} %")
+
+
+if __name__ == "__main__":
+    main()
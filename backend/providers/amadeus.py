@@ -8,12 +8,18 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
+from app.core.tracing import span
+from .base import ProviderError, project_criteria
+from rules import eligible_carriers, required_mask
+
 logger = logging.getLogger("amadeus")
 
 # ====== Config & OAuth ======
 
 _AMADEUS_ENV = (os.getenv("AMADEUS_ENV") or "sandbox").lower().strip()
 _BASE_URL = "https://api.amadeus.com" if _AMADEUS_ENV.startswith("prod") else "https://test.api.amadeus.com"
+# AMADEUS_BASE_URL : autre serveur (ex: doublure locale benchmarks/amadeus_stub.py pour les tests de charge)
+_BASE_URL = (os.getenv("AMADEUS_BASE_URL") or _BASE_URL).rstrip("/")
 
 _CLIENT_ID = os.getenv("AMADEUS_CLIENT_ID") or ""
 _CLIENT_SECRET = os.getenv("AMADEUS_CLIENT_SECRET") or ""
@@ -25,13 +31,25 @@ _token_cache: Dict[str, Any] = {
 }
 _TOKEN_TTL_FALLBACK = 20 * 60  # 20 minutes si la réponse ne précise pas
 
+_MAX_OFFERS = 50  # offres par recherche (paramètre `max`)
+
 
 def _now() -> float:
     return time.time()
 
 
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    try:
+        return float(resp.headers.get("Retry-After") or "")
+    except ValueError:
+        return None
+
+
 def _get_access_token() -> Optional[str]:
-    """Récupère un token OAuth2 client_credentials, avec cache mémoire."""
+    """
+    Récupère un token OAuth2 client_credentials, avec cache mémoire.
+    None si le provider est inactif (pas de clés) ; ProviderError si Amadeus refuse ou ne répond pas.
+    """
     # Pas de clés → provider désactivé
     if not _CLIENT_ID or not _CLIENT_SECRET:
         logger.info("amadeus: client_id/secret manquants → provider inactif")
@@ -51,18 +69,23 @@ def _get_access_token() -> Optional[str]:
             },
             timeout=10,
         )
-        if resp.status_code != 200:
-            logger.warning("amadeus: échec token (%s) %s", resp.status_code, resp.text[:300])
-            return None
-        data = resp.json()
-        token = data.get("access_token")
-        expires_in = int(data.get("expires_in") or _TOKEN_TTL_FALLBACK)
-        _token_cache["access_token"] = token
-        _token_cache["expires_at"] = _now() + max(60, min(expires_in, 3600 * 2))  # 1h–2h
-        return token
-    except Exception as e:
+    except requests.RequestException as e:
         logger.warning("amadeus: exception token: %s", e)
-        return None
+        raise ProviderError("amadeus", f"token: {e}") from e
+    if resp.status_code != 200:
+        logger.warning("amadeus: échec token (%s) %s", resp.status_code, resp.text[:300])
+        raise ProviderError("amadeus", f"token HTTP {resp.status_code}", resp.status_code, _retry_after(resp))
+    try:
+        data = resp.json()
+    except ValueError as e:
+        raise ProviderError("amadeus", "token: réponse illisible", resp.status_code) from e
+    token = data.get("access_token")
+    if not token:
+        raise ProviderError("amadeus", "token absent de la réponse", resp.status_code)
+    expires_in = int(data.get("expires_in") or _TOKEN_TTL_FALLBACK)
+    _token_cache["access_token"] = token
+    _token_cache["expires_at"] = _now() + max(60, min(expires_in, 3600 * 2))  # 1h–2h
+    return token
 
 
 # ====== Utils parsing ======
@@ -115,18 +138,8 @@ def _map_cabin_to_travel_class(cabin: Optional[str]) -> Optional[str]:
     return None
 
 
-# ====== Public API ======
-
-def get_day_flights(origin: str, destination: str, date: str, criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """
-    Appelle Amadeus Flight Offers Search v2 pour un aller simple.
-    Retourne une liste de FlightRaw minimaliste, prête pour normalize_flight().
-    Si pas de clés ou erreur → [] (le caller fera fallback dummy).
-    """
-    token = _get_access_token()
-    if not token:
-        return []
-
+def _criteria_params(criteria: Dict[str, Any]) -> Dict[str, Any]:
+    """Partie des paramètres Flight Offers Search qui ne dépend que des critères."""
     adults = int(criteria.get("adults") or 1)
     # childrenAges → compter ages in [2..11]
     children_ages = _parse_csv_ints(criteria.get("childrenAges"))
@@ -136,103 +149,138 @@ def get_day_flights(origin: str, destination: str, date: str, criteria: Dict[str
     cabin = _map_cabin_to_travel_class(criteria.get("cabin"))
     currency = (criteria.get("currency") or "EUR").upper()
 
-    payload: Dict[str, Any] = {
-        "originLocationCode": origin.upper(),
-        "destinationLocationCode": destination.upper(),
-        "departureDate": date,  # YYYY-MM-DD
+    params: Dict[str, Any] = {
         "adults": max(0, adults),
         "children": max(0, children),
         "infants": max(0, infants),
         "currencyCode": currency,
         "oneWay": True,
-        "max": 50,
+        "max": _MAX_OFFERS,
     }
     if direct:
-        payload["nonStop"] = True
+        params["nonStop"] = True
     if cabin:
-        payload["travelClass"] = cabin
+        params["travelClass"] = cabin
+    # UM / animaux : seules les compagnies éligibles (rules.py) sont demandées à Amadeus
+    required = required_mask(criteria)
+    if required:
+        params["includedAirlineCodes"] = ",".join(eligible_carriers(required))
+    return params
+
+
+
+# ====== Public API ======
+
+def get_day_flights(origin: str, destination: str, date: str, criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Appelle Amadeus Flight Offers Search v2 pour un aller simple.
+    Retourne une liste de FlightRaw minimaliste, prête pour normalize_flight().
+    Pas de clés → [] ; HTTP non-200 (429, 5xx…), transport ou JSON illisible → ProviderError
+    (l'agrégateur passe au provider suivant et met le jour en cache négatif court).
+    """
+    with span("amadeus.token"):
+        token = _get_access_token()
+    if not token:
+        return []
+
+    params = project_criteria(criteria, "amadeus.params", _criteria_params)
+    payload: Dict[str, Any] = {
+        "originLocationCode": origin.upper(),
+        "destinationLocationCode": destination.upper(),
+        "departureDate": date,  # YYYY-MM-DD
+        **params,
+    }
+    adults, children, infants = params["adults"], params["children"], params["infants"]
+    direct = bool(params.get("nonStop"))
+    cabin = params.get("travelClass")
 
     url = f"{_BASE_URL}/v2/shopping/flight-offers"
     t0 = time.time()
     try:
         # La version GET accepte les mêmes paramètres simples
-        resp = requests.get(url, headers={"Authorization": f"Bearer {token}"}, params=payload, timeout=15)
-        elapsed = (time.time() - t0) * 1000
-        if resp.status_code != 200:
-            logger.warning("amadeus: %s → HTTP %s (%d ms) %s", url, resp.status_code, int(elapsed), resp.text[:240])
-            return []
+        with span("amadeus.http"):
+            resp = requests.get(url, headers={"Authorization": f"Bearer {token}"}, params=payload, timeout=15)
+    except requests.RequestException as e:
+        logger.warning("amadeus: exception GET %s → %s", url, e)
+        raise ProviderError("amadeus", str(e)) from e
+    elapsed = (time.time() - t0) * 1000
+    if resp.status_code == 401:
+        _token_cache["access_token"] = None  # token révoqué / expiré côté Amadeus : redemandé au prochain appel
+    if resp.status_code != 200:
+        logger.warning("amadeus: %s → HTTP %s (%d ms) %s", url, resp.status_code, int(elapsed), resp.text[:240])
+        raise ProviderError("amadeus", f"HTTP {resp.status_code}", resp.status_code, _retry_after(resp))
+    try:
         data = resp.json() or {}
-        offers = data.get("data") or []
-        results: List[Dict[str, Any]] = []
-
-        for off in offers:
-            # Prix
-            price = _safe_float((off.get("price") or {}).get("grandTotal"))
-            if not price or price <= 0:
-                continue
-
-            itineraries = off.get("itineraries") or []
-            if not itineraries:
-                continue
-            it0 = itineraries[0]
-            segs = it0.get("segments") or []
-            if not segs:
-                continue
-
-            dep_iso = _iso_from_segment(segs[0], "departure")
-            arr_iso = _iso_from_segment(segs[-1], "arrival")
-            duration_min = _parse_duration_iso8601(it0.get("duration"))
-            nb_stops = max(0, len(segs) - 1)
-
-            # compagnie: marketingCarrierCode si présent, sinon carrierCode du 1er seg
-            carrier = (
-                segs[0].get("marketingCarrierCode")
-                or segs[0].get("carrierCode")
-                or (off.get("validatingAirlineCodes") or [None])[0]
-            )
-
-            if not dep_iso or not arr_iso or not duration_min:
-                continue
-
-            results.append(
-                {
-                    "price_total": float(price),
-                    "carrier": carrier,
-                    "nb_stops": nb_stops,
-                    "dep_iso": dep_iso,
-                    "arr_iso": arr_iso,
-                    "duration_minutes": duration_min,
-                }
-            )
-
-        if results:
-            try:
-                min_price = min(r["price_total"] for r in results)
-            except Exception:
-                min_price = None
-        else:
-            min_price = None
+    except ValueError as e:
+        raise ProviderError("amadeus", "réponse illisible", resp.status_code) from e
+
+    offers = data.get("data") or []
+    results: List[Dict[str, Any]] = []
+
+    for off in offers:
+        # Prix
+        price = _safe_float((off.get("price") or {}).get("grandTotal"))
+        if not price or price <= 0:
+            continue
+
+        itineraries = off.get("itineraries") or []
+        if not itineraries:
+            continue
+        it0 = itineraries[0]
+        segs = it0.get("segments") or []
+        if not segs:
+            continue
+
+        dep_iso = _iso_from_segment(segs[0], "departure")
+        arr_iso = _iso_from_segment(segs[-1], "arrival")
+        duration_min = _parse_duration_iso8601(it0.get("duration"))
+        nb_stops = max(0, len(segs) - 1)
 
-        logger.info(
-            "amadeus day OK: %s-%s %s adult=%s child=%s infant=%s direct=%s cabin=%s → %d offres (min=%s) in %d ms",
-            origin,
-            destination,
-            date,
-            adults,
-            children,
-            infants,
-            int(direct),
-            cabin or "-",
-            len(results),
-            f"{min_price:.0f}" if isinstance(min_price, (int, float)) else "n/a",
-            int(elapsed),
+        # compagnie: marketingCarrierCode si présent, sinon carrierCode du 1er seg
+        carrier = (
+            segs[0].get("marketingCarrierCode")
+            or segs[0].get("carrierCode")
+            or (off.get("validatingAirlineCodes") or [None])[0]
         )
 
-        return results
+        if not dep_iso or not arr_iso or not duration_min:
+            continue
 
-    except Exception as e:
-        logger.warning("amadeus: exception GET %s → %s", url, e)
-        return []
+        results.append(
+            {
+                "price_total": float(price),
+                "carrier": carrier,
+                "nb_stops": nb_stops,
+                "dep_iso": dep_iso,
+                "arr_iso": arr_iso,
+                "duration_minutes": duration_min,
+            }
+        )
+
+    if results:
+        try:
+            min_price = min(r["price_total"] for r in results)
+        except Exception:
+            min_price = None
+    else:
+        min_price = None
+
+    logger.info(
+        "amadeus day OK: %s-%s %s adult=%s child=%s infant=%s direct=%s cabin=%s → %d offres (min=%s) in %d ms",
+        origin,
+        destination,
+        date,
+        adults,
+        children,
+        infants,
+        int(direct),
+        cabin or "-",
+        len(results),
+        f"{min_price:.0f}" if isinstance(min_price, (int, float)) else "n/a",
+        int(elapsed),
+    )
+
+    return results
 
 
 # ====== Small helpers ======
@@ -278,6 +326,9 @@ class AmadeusProvider:
     Fin adaptateur OO pour coller à l’interface du loader.
     """
     name = "amadeus"
+    # nonStop ne fait que filtrer les offres (mêmes prix) ; réponses tronquées à `max`
+    filter_only_criteria = frozenset({"direct"})
+    max_results = _MAX_OFFERS
 
     def get_day_flights(self, origin: str, destination: str, date: str, criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
         return get_day_flights(origin, destination, date, criteria)
\ No newline at end of file
@@ -1,6 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
 
 @dataclass
 class FlightResult:
@@ -17,9 +19,34 @@ class FlightResult:
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+class ProviderError(Exception):
+    """
+    Échec d'appel provider (HTTP non-200, transport, réponse illisible), levé par get_day_flights
+    au lieu de renvoyer [] : l'agrégateur distingue ainsi une panne d'un jour sans vol
+    (cache négatif court, cf. app/services/ttl_policy.py).
+    """
+
+    def __init__(self, provider: str, message: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None) -> None:
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status = status
+        self.retry_after = retry_after
+
+
 class ProviderBase:
     name: str = "base"
     async def calendar(self, origin: str, destination: str, month: str) -> Dict[str, Dict[str, Any]]:
         return {}
     async def search(self, origin: str, destination: str, date: str) -> List[FlightResult]:
         return []
+
+
+def project_criteria(criteria: Dict[str, Any], name: str, build: Callable[[Dict[str, Any]], T]) -> T:
+    """
+    Projection des critères propre à un provider (seed, paramètres d'API…).
+    Avec un Criteria interné (app.services.normalize), calculée une seule fois par critères ;
+    avec un dict brut, recalculée à chaque appel.
+    """
+    project = getattr(criteria, "project", None)
+    return project(name, build) if project is not None else build(criteria)
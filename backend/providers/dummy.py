@@ -9,6 +9,8 @@ from __future__ import annotations
 from typing import Any, Dict, List
 import hashlib
 
+from .base import project_criteria
+
 def _hash_int(*parts: str) -> int:
     base = "|".join(parts).encode("utf-8")
     h = hashlib.sha1(base).hexdigest()
@@ -96,20 +98,23 @@ def _iso(date: str, h: int, m: int) -> str:
 
 COMPANIES = ["AF", "VY", "U2", "IB", "TO", "HV", "V7", "TO", "HV"]
 
+def _criteria_str(criteria: Dict[str, Any]) -> str:
+    crit_items = sorted((str(k), str(v)) for k, v in (criteria or {}).items())
+    return "&".join([f"{k}={v}" for k, v in crit_items])
+
 def get_day_flights(origin: str, destination: str, date: str, criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Retourne une liste de vols *bruts* (pour normalisation ensuite).
     Déterministe : même (O,D,date,criteria) -> mêmes vols/prix.
     """
-    crit_items = sorted((str(k), str(v)) for k, v in (criteria or {}).items())
-    crit_str = "&".join([f"{k}={v}" for k, v in crit_items])
+    crit_str = project_criteria(criteria, "dummy.criteria_str", _criteria_str)
     seed = _hash_int(origin.upper(), destination.upper(), date, crit_str)
 
     # Nombre de vols "naturels" pour ce jour (de 5 à 10), déterministe
     n_flights = 5 + int(_lcg_float01(seed + 7) * 6)
 
     out: List[Dict[str, Any]] = []
-    price_mul = _criteria_multiplier(criteria)
+    price_mul = project_criteria(criteria, "dummy.price_mul", _criteria_multiplier)
 
     for i in range(n_flights):
         s = seed + i * 97
@@ -151,6 +156,8 @@ class DummyProvider:
     Fin adaptateur OO pour coller à l’interface du loader.
     """
     name = "dummy"
+    # direct=1 change les prix du dummy (×1.07) : aucun critère n'est un simple filtre
+    filter_only_criteria = frozenset()
 
     def get_day_flights(self, origin: str, destination: str, date: str, criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
         return get_day_flights(origin, destination, date, criteria)
\ No newline at end of file
@@ -17,4 +17,43 @@ RULES = {
 
 def get_rules(airline_code: str):
     # Valeur par défaut conservatrice
-    return RULES.get(airline_code, {"um_ok": False, "animal_ok": False})
\ No newline at end of file
+    return RULES.get(airline_code, {"um_ok": False, "animal_ok": False})
+
+# ---------- Index d'éligibilité (bitmask par compagnie) ----------
+# Calculé une fois depuis RULES : un vol est éligible si (masque compagnie & requis) == requis.
+
+ELIG_UM = 1 << 0       # accepte les mineurs non accompagnés
+ELIG_PETS = 1 << 1     # accepte les animaux
+
+_FLAG_BITS = {"um_ok": ELIG_UM, "animal_ok": ELIG_PETS}
+
+
+def _mask(rule) -> int:
+    m = 0
+    for flag, bit in _FLAG_BITS.items():
+        if rule.get(flag):
+            m |= bit
+    return m
+
+
+ELIGIBILITY = {code: _mask(rule) for code, rule in RULES.items()}
+DEFAULT_ELIGIBILITY = _mask(get_rules(""))
+
+
+def carrier_mask(airline_code) -> int:
+    return ELIGIBILITY.get(str(airline_code or "").upper(), DEFAULT_ELIGIBILITY)
+
+
+def required_mask(criteria) -> int:
+    """Bits exigés par les critères (um=1, pets=1)."""
+    m = 0
+    if str(criteria.get("um", 0)) in ("1", "true", "True"):
+        m |= ELIG_UM
+    if str(criteria.get("pets", 0)) in ("1", "true", "True"):
+        m |= ELIG_PETS
+    return m
+
+
+def eligible_carriers(required: int):
+    """Compagnies connues compatibles (triées) ; les inconnues ne le sont jamais si required != 0."""
+    return sorted(code for code, m in ELIGIBILITY.items() if m & required == required)
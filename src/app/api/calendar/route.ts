@@ -12,13 +12,14 @@ function getApiBase() {
   ).replace(/\/+$/, "");
 }
 
-async function fetchWithTimeout(url: string, timeoutMs = 25000) {
+async function fetchWithTimeout(url: string, timeoutMs = 25000, headers?: HeadersInit) {
   const controller = new AbortController();
   const id = setTimeout(() => controller.abort(), timeoutMs);
   try {
     const res = await fetch(url, {
       cache: "no-store",
       signal: controller.signal,
+      headers,
     });
     return res;
   } finally {
@@ -26,6 +27,13 @@ async function fetchWithTimeout(url: string, timeoutMs = 25000) {
   }
 }
 
+// Validateurs HTTP du backend (ETag + max-age) relayés tels quels au navigateur
+function passValidators(upstream: Response): Record<string, string> {
+  const etag = upstream.headers.get("etag");
+  const cacheControl = upstream.headers.get("cache-control");
+  return etag && cacheControl ? { ETag: etag, "Cache-Control": cacheControl } : { "Cache-Control": "no-store" };
+}
+
 async function warmUp(apiBase: string) {
   try {
     await fetchWithTimeout(`${apiBase}/ping`, 8000);
@@ -84,10 +92,18 @@ export async function GET(req: Request) {
       `&resident=${encodeURIComponent(resident)}` +
       `&currency=${encodeURIComponent(currency)}`;
 
-    let upstream = await fetchWithTimeout(url, 25000);
-    if (!upstream.ok) {
+    // requête conditionnelle : le backend répond 304 sans recalcul si rien n'a changé
+    const ifNoneMatch = req.headers.get("if-none-match");
+    const condHeaders = ifNoneMatch ? { "If-None-Match": ifNoneMatch } : undefined;
+
+    let upstream = await fetchWithTimeout(url, 25000, condHeaders);
+    if (!upstream.ok && upstream.status !== 304) {
       await new Promise((r) => setTimeout(r, 1200));
-      upstream = await fetchWithTimeout(url, 25000);
+      upstream = await fetchWithTimeout(url, 25000, condHeaders);
+    }
+
+    if (upstream.status === 304) {
+      return new NextResponse(null, { status: 304, headers: passValidators(upstream) });
     }
 
     if (!upstream.ok) {
@@ -106,7 +122,7 @@ export async function GET(req: Request) {
 
     return NextResponse.json(
       { calendar },
-      { headers: { "Cache-Control": "no-store" } }
+      { headers: passValidators(upstream) }
     );
   } catch (e: any) {
     return NextResponse.json(
@@ -13,13 +13,14 @@ function getApiBase() {
   ).replace(/\/+$/, "");
 }
 
-async function fetchWithTimeout(url: string, timeoutMs = 25000) {
+async function fetchWithTimeout(url: string, timeoutMs = 25000, headers?: HeadersInit) {
   const controller = new AbortController();
   const id = setTimeout(() => controller.abort(), timeoutMs);
   try {
     const res = await fetch(url, {
       cache: "no-store",
       signal: controller.signal,
+      headers,
     });
     return res;
   } finally {
@@ -27,6 +28,17 @@ async function fetchWithTimeout(url: string, timeoutMs = 25000) {
   }
 }
 
+// Validateurs HTTP du backend (ETag + max-age) relayés au navigateur. Le corps renvoyé est
+// réécrit ici (JSON re-sérialisé, résultats filtrés/complétés) : pas l'octet près de celui du
+// backend, donc ETag *faible* (W/) — même contenu pour un même ETag backend, et le backend
+// compare If-None-Match en faible, le 304 conditionnel marche toujours
+function passValidators(upstream: Response): Record<string, string> {
+  const etag = upstream.headers.get("etag");
+  const cacheControl = upstream.headers.get("cache-control");
+  if (!etag || !cacheControl) return { "Cache-Control": "no-store" };
+  return { ETag: etag.startsWith("W/") ? etag : `W/${etag}`, "Cache-Control": cacheControl };
+}
+
 async function warmUp(apiBase: string) {
   try {
     await fetchWithTimeout(`${apiBase}/ping`, 8000);
@@ -91,12 +103,19 @@ export async function GET(req: Request) {
       `&resident=${resident ? "1" : "0"}` +
       `&currency=${currency}`;
 
-    // 1er essai
-    let upstream = await fetchWithTimeout(upstreamUrl, 25000);
+    // 1er essai — requête conditionnelle : le backend répond 304 sans recalcul si rien n'a changé
+    const ifNoneMatch = req.headers.get("if-none-match");
+    const condHeaders = ifNoneMatch ? { "If-None-Match": ifNoneMatch } : undefined;
+
+    let upstream = await fetchWithTimeout(upstreamUrl, 25000, condHeaders);
     // 2e essai si besoin (cold start)
-    if (!upstream.ok) {
+    if (!upstream.ok && upstream.status !== 304) {
       await new Promise((r) => setTimeout(r, 1200));
-      upstream = await fetchWithTimeout(upstreamUrl, 25000);
+      upstream = await fetchWithTimeout(upstreamUrl, 25000, condHeaders);
+    }
+
+    if (upstream.status === 304) {
+      return new NextResponse(null, { status: 304, headers: passValidators(upstream) });
     }
 
     if (!upstream.ok) {
@@ -125,6 +144,9 @@ export async function GET(req: Request) {
     };
 
     const results = rawResults.map((r: any) => {
+      // Règles déjà appliquées par le backend (services/carrier_rules.py) : rien à refaire
+      if (r?.rules) return r;
+
       // Essayer de deviner marketing carrier et segments
       const segments = Array.isArray(r?.vols) ? r.vols.length : (typeof r?.escales === "number" ? Math.max(1, r.escales + 1) : 1);
       const carrierCode =
@@ -163,7 +185,7 @@ export async function GET(req: Request) {
 
     return NextResponse.json(
       { results: filtered },
-      { headers: { "Cache-Control": "no-store" } }
+      { headers: passValidators(upstream) }
     );
   } catch (e: any) {
     return NextResponse.json(